@@ -0,0 +1,71 @@
+# app/api/responses.py
+"""
+JSON responses serialized by pydantic-core, skipping FastAPI's response path.
+
+When an endpoint returns plain data, FastAPI validates it against the
+``response_model`` (in the threadpool, for sync endpoints), dumps it to
+Python objects and then ``json.dumps`` the result. ``render`` instead
+serializes the data once, straight to bytes, with a ``TypeAdapter``
+compiled per schema on first use, and returns the finished ``Response``.
+Endpoints keep declaring ``response_model`` for the OpenAPI docs.
+
+ETag helpers for conditional GETs live here too.
+"""
+
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+_adapters: Dict[Any, TypeAdapter] = {}
+_adapters_lock = threading.Lock()
+
+# Headers of a new Response that must not be copied onto another one
+_BODY_HEADERS = {"content-length", "content-type"}
+
+
+def adapter(schema: Any) -> TypeAdapter:
+    """The compiled ``TypeAdapter`` for ``schema`` (built once)."""
+    compiled = _adapters.get(schema)
+    if compiled is None:
+        with _adapters_lock:
+            compiled = _adapters.setdefault(schema, TypeAdapter(schema))
+    return compiled
+
+
+def render(
+    schema: Any,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+    response: Optional[Response] = None,
+) -> Response:
+    """
+    Serialize ``content`` as ``schema`` into a JSON ``Response``. Headers
+    set on an injected ``response`` parameter (ignored by FastAPI once the
+    endpoint returns its own Response) are carried over.
+    """
+    rendered = Response(adapter(schema).dump_json(content), status_code, headers, media_type="application/json")
+    if response is not None:
+        rendered.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers if name.decode() not in _BODY_HEADERS
+        )
+    return rendered
+
+
+def etag(body: bytes) -> str:
+    """Strong ETag of a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], tag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``tag`` (weak comparison, as RFC 9110 asks)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == tag:
+            return True
+    return False
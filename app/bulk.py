@@ -0,0 +1,97 @@
+# app/bulk.py
+"""
+Offline bulk import/export against the storage configured in settings.
+
+Opens the account service the API would (``ACCOUNT_BACKEND``,
+``DATABASE_URL``, ``WAL_DIR``) and loads a CSV/NDJSON file into it, or
+writes its whole ledger to one, in constant memory (layout in
+``app/services/bulk.py``). Run it while the API is stopped: the API holds
+the same journal/database. For a running or sharded deployment use
+``POST /import`` and ``GET /export`` instead.
+
+Usage:
+    python -m app.bulk import ledger.csv
+    python -m app.bulk export --format ndjson ledger.ndjson
+    python -m app.bulk export - | gzip > ledger.ndjson.gz
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+from typing import BinaryIO, Iterator
+
+from app.core.config import settings
+from app.db.journal import Journal
+from app.models.money import set_scale
+from app.repositories.account_repository import build_repository
+from app.services.account_service import AccountService
+from app.services.bulk import FORMATS, export_ledger, import_stream
+
+BLOCK_SIZE = 1 << 20
+
+
+def open_service() -> AccountService:
+    if settings.SHARD_COUNT > 1:
+        raise SystemExit("Sharded deployments: use POST /import and GET /export on a running worker")
+    if not settings.WAL_DIR and settings.ACCOUNT_BACKEND == "memory":
+        raise SystemExit("Nothing would persist: set WAL_DIR or ACCOUNT_BACKEND=sqlite")
+    if settings.WAL_DIR and settings.ACCOUNT_BACKEND != "memory":
+        raise SystemExit("WAL_DIR journals the in-memory backend only: unset it with ACCOUNT_BACKEND=sqlite")
+    set_scale(settings.CURRENCY_SCALE)
+    return AccountService(
+        journal=Journal(
+            settings.WAL_DIR, fsync=settings.WAL_FSYNC, snapshot_every=settings.SNAPSHOT_EVERY
+        ) if settings.WAL_DIR else None,
+        repository=build_repository(settings.ACCOUNT_BACKEND, str(settings.DATABASE_URL)),
+    )
+
+
+def _blocks(stream: BinaryIO) -> Iterator[bytes]:
+    while block := stream.read(BLOCK_SIZE):
+        yield block
+
+
+def _guess_format(path: str, default: str) -> str:
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return extension if extension in FORMATS else default
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("path", help="file to read/write, - for stdin/stdout")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension, else ndjson")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    format = args.format or _guess_format(args.path, "ndjson")
+
+    service = open_service()
+    try:
+        start = time.perf_counter()
+        if args.command == "import":
+            with open(args.path, "rb") if args.path != "-" else nullcontext(sys.stdin.buffer) as stream:
+                report = import_stream(
+                    service, _blocks(stream), format,
+                    chunk_size=args.chunk_size, max_errors=settings.IMPORT_MAX_ERRORS,
+                )
+            service.snapshot()  # restart from the snapshot, not by replaying the import
+            for line, error in report.errors:
+                print(f"line {line}: {error}", file=sys.stderr)
+            print(json.dumps({
+                "lines": report.lines, "accounts": report.accounts, "transactions": report.transactions,
+                "rejected": report.rejected, "seconds": round(time.perf_counter() - start, 3),
+            }), file=sys.stderr)
+        else:
+            with open(args.path, "w", encoding="utf-8", newline="") if args.path != "-" else nullcontext(sys.stdout) as out:
+                for block in export_ledger(service, format, chunk_size=args.chunk_size):
+                    out.write(block)
+            print(f"exported in {time.perf_counter() - start:.3f}s", file=sys.stderr)
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
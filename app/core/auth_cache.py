@@ -0,0 +1,115 @@
+# app/core/auth_cache.py
+"""
+Caches for the authentication dependency path.
+
+``TokenCache`` remembers JWTs that already passed signature verification,
+so repeated requests with the same bearer token skip ``jwt.decode``.
+Entries are evicted at the token's ``exp`` claim (or after ``ttl``
+seconds, whichever comes first) and least-recently-used entries are
+dropped when the cache is full.
+
+``UserCache`` memoizes the user principal built for a username and must
+be invalidated whenever that user changes (e.g. is disabled).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TokenCache:
+    """Bounded LRU of verified token -> subject, expiring at ``exp``."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[str]:
+        """Return the cached subject of a still-valid token, or None."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            subject, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return subject
+
+    def put(self, token: str, subject: str, exp: float) -> None:
+        """Cache a verified token until its ``exp`` (POSIX seconds)."""
+        if self.maxsize <= 0:
+            return
+        expires_at = exp if self.ttl is None else min(exp, self._clock() + self.ttl)
+        with self._lock:
+            self._entries[token] = (subject, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_subject(self, subject: str) -> None:
+        """Forget every token issued to ``subject``."""
+        with self._lock:
+            for token in [t for t, (s, _) in self._entries.items() if s == subject]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class UserCache(Generic[T]):
+    """Memoizes ``loader(username)``; call ``invalidate`` when a user changes."""
+
+    def __init__(self, loader: Callable[[str], Optional[T]], maxsize: int = 10_000):
+        self._loader = loader
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, T]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str) -> Optional[T]:
+        with self._lock:
+            user = self._entries.get(username)
+            if user is not None:
+                self._entries.move_to_end(username)
+                self.hits += 1
+                return user
+            self.misses += 1
+        user = self._loader(username)
+        if user is not None and self.maxsize > 0:
+            with self._lock:
+                self._entries[username] = user
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, username: str) -> None:
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,228 @@
+# app/core/idempotency.py
+"""
+Idempotency-Key support for the mutating account endpoints.
+
+A client that times out and retries ``POST /accounts/{id}/deposit`` (or
+withdraw/transfer) with the same ``Idempotency-Key`` header gets the
+response of the first execution instead of moving the money again.
+
+``IdempotencyStore`` coordinates executions: the first request with a key
+runs the operation, concurrent duplicates wait for it to finish (instead
+of running it too) and later duplicates are answered from the backend
+until the entry expires. Each key is bound to a fingerprint of the request
+it was first used with; reusing it for a different request is an error.
+
+Completed responses live in a pluggable ``IdempotencyBackend``:
+
+  * ``MemoryIdempotencyBackend``: bounded LRU with a TTL (the default);
+  * ``SqliteIdempotencyBackend``: a table in a SQLite database, so
+    responses survive restarts and are shared by processes using the file.
+
+In-flight tracking is per process: with several workers on a shared
+backend a duplicate that lands on another worker while the first request
+is still running is not held back.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.exceptions import IdempotencyKeyInFlightError, IdempotencyKeyMismatchError
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    """Outcome of the first execution for a key: status code and JSON body."""
+    fingerprint: str
+    status_code: int
+    body: Any
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable digest of the request parts a key is bound to (JSON-serializable)."""
+    data = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class IdempotencyBackend(ABC):
+    """Storage for completed responses; ``get`` must not return expired entries."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[StoredResponse]:
+        """The response stored for ``key``, or None if there is none or it expired."""
+
+    @abstractmethod
+    def put(self, key: str, response: StoredResponse, ttl: float) -> None:
+        """Store ``response`` for ``key`` for ``ttl`` seconds."""
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryIdempotencyBackend(IdempotencyBackend):
+    """Bounded LRU of key -> response, each entry expiring ``ttl`` seconds after ``put``."""
+
+    def __init__(self, maxsize: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[StoredResponse, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: StoredResponse, ttl: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (response, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteIdempotencyBackend(IdempotencyBackend):
+    """Responses in an ``idempotency_keys`` table; expired rows are purged every ``purge_every`` puts."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS idempotency_keys (
+        key         TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        status_code INTEGER NOT NULL,
+        body        TEXT NOT NULL,
+        expires_at  REAL NOT NULL
+    )
+    """
+
+    def __init__(self, database_url: str = "sqlite://", pool_size: int = 4, purge_every: int = 1_000):
+        from app.db.sqlite import ConnectionPool, sqlite_path
+
+        self._pool = ConnectionPool(sqlite_path(database_url), size=pool_size)
+        self.purge_every = purge_every
+        self._puts = 0
+        with self._pool.connection() as conn:
+            conn.execute(self.SCHEMA)
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT fingerprint, status_code, body FROM idempotency_keys WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredResponse(row[0], row[1], json.loads(row[2]))
+
+    def put(self, key: str, response: StoredResponse, ttl: float) -> None:
+        now = time.time()
+        self._puts += 1
+        with self._pool.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, status_code, body, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response.fingerprint, response.status_code, json.dumps(response.body), now + ttl),
+            )
+            if self._puts % self.purge_every == 0:
+                conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+def build_idempotency_backend(
+    backend: str = "memory", database_url: str = "sqlite://", maxsize: int = 100_000
+) -> IdempotencyBackend:
+    """Create the backend named by ``backend`` ("memory" or "sqlite")."""
+    if backend == "memory":
+        return MemoryIdempotencyBackend(maxsize=maxsize)
+    if backend == "sqlite":
+        return SqliteIdempotencyBackend(database_url)
+    raise ValueError(f"Unknown idempotency backend: {backend}")
+
+
+class _InFlight:
+    __slots__ = ("fingerprint", "done", "response")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.response: Optional[StoredResponse] = None
+
+
+class IdempotencyStore:
+    """Runs each (key, request) once and replays its response to duplicates."""
+
+    def __init__(self, backend: Optional[IdempotencyBackend] = None, ttl: float = 86_400.0, wait_timeout: float = 30.0):
+        self.backend = backend if backend is not None else MemoryIdempotencyBackend()
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self._inflight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+
+    def execute(
+        self, key: str, fingerprint: str, operation: Callable[[], StoredResponse]
+    ) -> Tuple[StoredResponse, bool]:
+        """
+        Return ``(response, replayed)``. ``operation`` runs only when no
+        response is stored or in flight for ``key``; if it raises, nothing
+        is stored and the next request with the key runs it again.
+        """
+        while True:
+            stored = self.backend.get(key)
+            if stored is None:
+                with self._lock:
+                    pending = self._inflight.get(key)
+                    if pending is None:
+                        # Re-check under the lock: the owner stores before it un-registers
+                        stored = self.backend.get(key)
+                        if stored is None:
+                            mine = self._inflight[key] = _InFlight(fingerprint)
+                            break
+            if stored is not None:
+                return self._check(stored, fingerprint), True
+            if pending.fingerprint != fingerprint:
+                raise IdempotencyKeyMismatchError("Idempotency-Key was already used for a different request")
+            if not pending.done.wait(self.wait_timeout):
+                raise IdempotencyKeyInFlightError("A request with this Idempotency-Key is still being processed")
+            if pending.response is not None:
+                return pending.response, True
+            # The first execution failed without a response: take over
+
+        try:
+            response = operation()
+            self.backend.put(key, response, self.ttl)
+            mine.response = response
+            return response, False
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            mine.done.set()
+
+    @staticmethod
+    def _check(stored: StoredResponse, fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise IdempotencyKeyMismatchError("Idempotency-Key was already used for a different request")
+        return stored
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def close(self) -> None:
+        self.backend.close()
@@ -1,32 +1,93 @@
 # app/core/security.py
 """
 Security utilities: password hashing, JWT creation and verification.
+
+passlib and jose are imported on first use rather than at module import,
+which keeps ``import app.main`` (and every test run) fast. bcrypt is
+deliberately slow, so async code must verify passwords through
+``password_hasher``, which runs them on a small bounded thread pool
+instead of the event loop.
 """
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
-
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
 from app.core.config import settings
+from app.exceptions import InvalidTokenError, PasswordHasherBusyError
 
-# Password hashing with bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=None)
+def _pwd_context():
+    # Password hashing with bcrypt
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash from plain text."""
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop on at most ``workers`` threads.
+
+    At most ``max_pending`` verifications may be queued or running; beyond
+    that ``verify`` fails fast with PasswordHasherBusyError instead of
+    letting a login flood build an unbounded backlog.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 256):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        if self._pending >= self.max_pending:
+            raise PasswordHasherBusyError("Too many concurrent logins, retry later")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), verify_password, plain_password, hashed_password
+            )
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
 
 
 def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
     """Create JWT access token with subject (username)."""
+    from jose import jwt
+
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
@@ -36,4 +97,14 @@ def create_access_token(subject: str | Any, expires_delta: timedelta | None = No
 
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verify a JWT and return its claims; raises InvalidTokenError."""
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError as e:
+        raise InvalidTokenError(str(e))
@@ -0,0 +1,100 @@
+# app/db/batching.py
+"""
+Write coalescing for SQLite: many callers, one writer thread, few commits.
+
+Callers submit a unit of work (a function that runs statements on a
+connection) and block until it is committed. A single writer thread drains
+everything queued at that moment and applies it inside one transaction, so
+under load one commit covers many requests instead of one each. No timer
+is involved: batches grow naturally while the previous commit is running.
+"""
+
+import queue
+import sqlite3
+import threading
+from typing import Callable, List, Optional
+
+from app.db.sqlite import ConnectionPool
+
+Work = Callable[[sqlite3.Connection], None]
+
+
+class _Pending:
+    __slots__ = ("work", "done", "error")
+
+    def __init__(self, work: Work):
+        self.work = work
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+_STOP = object()
+
+
+class BatchWriter:
+    """Background thread applying submitted work in batched transactions."""
+
+    def __init__(self, pool: ConnectionPool, max_batch: int = 512):
+        self._pool = pool
+        self.max_batch = max_batch
+        self.commits = 0  # number of transactions committed (for benchmarks)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="sqlite-batch-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, work: Work) -> None:
+        """Run ``work`` in the next batch and wait for its commit; re-raises its error."""
+        pending = _Pending(work)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: List[_Pending]) -> None:
+        with self._pool.connection() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for pending in batch:
+                    pending.work(conn)
+                conn.execute("COMMIT")
+                self.commits += 1
+            except Exception as e:
+                conn.execute("ROLLBACK")
+                if len(batch) == 1:
+                    batch[0].error = e
+                    batch[0].done.set()
+                    return
+                failed = e
+            else:
+                failed = None
+        if failed is not None:
+            # One bad unit must not fail its neighbours: retry them one by one
+            for pending in batch:
+                self._commit([pending])
+            return
+        for pending in batch:
+            pending.done.set()
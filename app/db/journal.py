@@ -0,0 +1,75 @@
+# app/db/journal.py
+"""
+Durability for the in-memory account service: WAL + periodic snapshots.
+
+Every state change is appended to the write-ahead log before the service
+call returns. Every ``snapshot_every`` events the full account state is
+written as a snapshot and the log segments it covers are deleted, so a
+restart loads the snapshot and replays only the log tail.
+
+Cold ledger blocks (``app.db.segments``) live under ``segments/``; a
+snapshot refers to them instead of copying their rows. Rows frozen after
+the latest snapshot are still in it or in the log, so segment files no
+snapshot refers to are deleted on recovery.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from app.db.segments import SegmentStore, referenced_segments
+from app.db.snapshot import SnapshotStore
+from app.db.wal import WriteAheadLog
+from app.models.account import Account
+
+
+class Journal:
+    """Write-ahead log and snapshot store living under one directory."""
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        fsync: bool = True,
+        snapshot_every: int = 100_000,
+    ):
+        self.directory = Path(directory)
+        self.wal = WriteAheadLog(self.directory / "wal", fsync=fsync)
+        self.segments = SegmentStore(self.directory / "segments", fsync=fsync)
+        self.snapshots = SnapshotStore(self.directory / "snapshots", segments=self.segments)
+        self.snapshot_every = snapshot_every
+        # Events since the last snapshot are counted by LSN, which the WAL
+        # assigns under its append lock: record() runs on many threads at once
+        self._snapshot_lsn = self.wal.last_lsn
+
+    def record(self, event: Dict[str, Any]) -> int:
+        """Append an event and wait until it (and its commit group) is durable."""
+        lsn = self.wal.append(event)
+        self.wal.commit(lsn)
+        return lsn
+
+    def snapshot_due(self) -> bool:
+        return self.snapshot_every > 0 and self.wal.last_lsn - self._snapshot_lsn >= self.snapshot_every
+
+    def snapshot(self, accounts: Iterable[Account]) -> None:
+        """
+        Persist ``accounts`` as of the last appended event.
+
+        The caller must ensure no mutation runs concurrently, otherwise the
+        snapshot would not match the LSN it is labelled with.
+        """
+        self.wal.rotate()
+        lsn = self.wal.last_lsn
+        self.snapshots.write(lsn, accounts)
+        self.wal.truncate_before(lsn)
+        self._snapshot_lsn = lsn
+
+    def recover(self) -> Tuple[List[Account], Iterator[Dict[str, Any]]]:
+        """Return the snapshot's accounts and an iterator over the events after it."""
+        latest = self.snapshots.load_latest()
+        lsn, accounts = latest if latest else (0, [])
+        self.segments.retain(referenced_segments(acc.transactions for acc in accounts))
+        return accounts, self.wal.replay(after_lsn=lsn)
+
+    def close(self) -> None:
+        self.wal.close()
+        self.segments.close()
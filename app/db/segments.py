@@ -0,0 +1,264 @@
+# app/db/segments.py
+"""
+Immutable, compressed segment files holding the cold tier of ledgers.
+
+Compaction (``app.services.compaction``) freezes the oldest rows of many
+ledgers at once into one segment file: a short magic header followed by
+one *block* per ledger, each block being its three columns compressed
+separately with zlib. Timestamps (µs-rounded, see ``Ledger.record``) are
+stored as deltas of integer microseconds, which compress far better than
+raw float64; a column that does not round-trip exactly keeps the raw
+bytes instead.
+
+A segment is written to a temporary name, fsynced and renamed, then
+memory-mapped read-only. A ``ColdBlock`` is the ledger-side handle to one
+block: its zone map (row count, net flow, amount and timestamp ranges)
+is in memory, so balances and range queries skip blocks they cannot
+match, and the columns are decompressed only when read, through a small
+LRU cache shared by the store. Snapshots persist a block as its
+``BlockRef`` (segment name, offsets and zone map) and reopen it on load.
+"""
+
+import mmap
+import os
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Sequence
+
+from app.models.ledger import DEPOSIT, ColumnSet
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".seg"
+MAGIC = b"LSEG0001"
+
+TS_RAW = 0       # float64 bytes
+TS_DELTA_US = 1  # int64 deltas of microseconds
+
+
+class BlockRef(NamedTuple):
+    """Where one cold block lives and what it holds (stored in snapshots)."""
+    segment: str
+    offset: int
+    amounts_size: int
+    types_size: int
+    timestamps_size: int
+    ts_codec: int
+    rows: int
+    net: int
+    min_amount: int
+    max_amount: int
+    min_ts: float
+    max_ts: float
+
+
+class ColdBlock:
+    """Rows of one ledger frozen into a segment; columns decompressed on demand."""
+
+    __slots__ = ("ref", "segment", "rows", "net", "min_amount", "max_amount", "min_ts", "max_ts")
+
+    def __init__(self, ref: BlockRef, segment: "Segment"):
+        self.ref = ref
+        self.segment = segment
+        self.rows, self.net = ref.rows, ref.net
+        self.min_amount, self.max_amount = ref.min_amount, ref.max_amount
+        self.min_ts, self.max_ts = ref.min_ts, ref.max_ts
+
+    def columns(self) -> ColumnSet:
+        """The block's ``(amounts, types, timestamps)``; treat them as read-only."""
+        return self.segment.store.cached(self)
+
+    def nbytes(self) -> int:
+        """Compressed size on disk."""
+        return self.ref.amounts_size + self.ref.types_size + self.ref.timestamps_size
+
+    def __repr__(self) -> str:
+        return f"ColdBlock({self.ref.segment}@{self.ref.offset}, {self.rows} rows)"
+
+
+class Segment:
+    """One memory-mapped segment file."""
+
+    def __init__(self, store: "SegmentStore", path: Path):
+        self.store = store
+        self.name = path.name
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a ledger segment: {path}")
+
+    def decode(self, ref: BlockRef) -> ColumnSet:
+        start = ref.offset
+        chunks = []
+        for size in (ref.amounts_size, ref.types_size, ref.timestamps_size):
+            chunks.append(zlib.decompress(self._map[start:start + size]))
+            start += size
+        amounts, types, timestamps = array("q"), array("b"), array("d")
+        amounts.frombytes(chunks[0])
+        types.frombytes(chunks[1])
+        if ref.ts_codec == TS_DELTA_US:
+            import numpy as np  # only once there is a cold tier
+
+            micros = np.cumsum(np.frombuffer(chunks[2], dtype=np.int64))
+            timestamps.frombytes((micros / 1_000_000).tobytes())
+        else:
+            timestamps.frombytes(chunks[2])
+        if not len(amounts) == len(types) == len(timestamps) == ref.rows:
+            raise ValueError(f"Corrupt cold block {ref.segment}@{ref.offset}")
+        return amounts, types, timestamps
+
+    def close(self) -> None:
+        self._map.close()
+
+
+class SegmentWriter:
+    """Appends compressed blocks to a new segment; ``close`` publishes it."""
+
+    def __init__(self, store: "SegmentStore", name: str):
+        self._store = store
+        self._name = name
+        self._tmp = store.directory / (name + ".tmp")
+        self._file = open(self._tmp, "wb")
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+        self._refs: List[BlockRef] = []
+
+    @property
+    def size(self) -> int:
+        return self._offset
+
+    def add(self, columns: ColumnSet) -> BlockRef:
+        import numpy as np
+
+        amounts, types, timestamps = columns
+        if not len(amounts) == len(types) == len(timestamps) > 0:
+            raise ValueError("A cold block needs equally long, non-empty columns")
+        a = np.frombuffer(amounts, dtype=np.int64)
+        t = np.frombuffer(types, dtype=np.int8)
+        ts = np.frombuffer(timestamps, dtype=np.float64)
+        micros = np.rint(ts * 1_000_000).astype(np.int64)
+        if np.array_equal(micros / 1_000_000, ts):
+            codec, ts_bytes = TS_DELTA_US, np.diff(micros, prepend=0).tobytes()
+        else:
+            codec, ts_bytes = TS_RAW, ts.tobytes()
+        chunks = [zlib.compress(amounts.tobytes()), zlib.compress(types.tobytes()), zlib.compress(ts_bytes)]
+        net = int(a.sum()) - 2 * int(a[t != DEPOSIT].sum())
+        ref = BlockRef(
+            self._name, self._offset, *map(len, chunks), codec, len(a), net,
+            int(a.min()), int(a.max()), float(ts.min()), float(ts.max()),
+        )
+        for chunk in chunks:
+            self._file.write(chunk)
+        self._offset += sum(map(len, chunks))
+        self._refs.append(ref)
+        return ref
+
+    def close(self) -> List[ColdBlock]:
+        """Make the segment durable and return its blocks, in ``add`` order."""
+        if not self._refs:
+            self.abort()
+            return []
+        self._file.flush()
+        if self._store.fsync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self._store.directory / self._name)
+        if self._store.fsync:
+            _fsync_directory(self._store.directory)
+        segment = self._store.open(self._name)
+        return [ColdBlock(ref, segment) for ref in self._refs]
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class SegmentStore:
+    """Segment files in ``directory`` plus the cache of decompressed blocks."""
+
+    def __init__(self, directory: str | os.PathLike, fsync: bool = True, cache_blocks: int = 64):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.cache_blocks = cache_blocks
+        self._segments: Dict[str, Segment] = {}
+        self._cache: "OrderedDict[BlockRef, ColumnSet]" = OrderedDict()
+        self._lock = threading.Lock()
+        names = self.names()
+        self._next = int(names[-1][len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1 if names else 1
+
+    def names(self) -> List[str]:
+        return sorted(path.name for path in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+    def writer(self) -> SegmentWriter:
+        with self._lock:
+            name = f"{SEGMENT_PREFIX}{self._next:012d}{SEGMENT_SUFFIX}"
+            self._next += 1
+        return SegmentWriter(self, name)
+
+    def open(self, name: str) -> Segment:
+        with self._lock:
+            segment = self._segments.get(name)
+            if segment is None:
+                segment = self._segments[name] = Segment(self, self.directory / name)
+            return segment
+
+    def block(self, ref: Sequence) -> ColdBlock:
+        """Reopen a block from its (possibly JSON-decoded) ``BlockRef``."""
+        ref = BlockRef(*ref)
+        return ColdBlock(ref, self.open(ref.segment))
+
+    def cached(self, block: ColdBlock) -> ColumnSet:
+        ref = block.ref
+        with self._lock:
+            columns = self._cache.get(ref)
+            if columns is not None:
+                self._cache.move_to_end(ref)
+                return columns
+        columns = block.segment.decode(ref)  # outside the lock: readers of other blocks go on
+        with self._lock:
+            self._cache[ref] = columns
+            while len(self._cache) > self.cache_blocks:
+                self._cache.popitem(last=False)
+        return columns
+
+    def retain(self, names: Iterable[str]) -> List[str]:
+        """
+        Delete segment files (and leftover temporaries) not in ``names``,
+        e.g. written by a compaction no snapshot recorded before a crash.
+        Returns the deleted names.
+        """
+        keep = set(names)
+        deleted = []
+        for path in self.directory.iterdir():
+            unused = path.name.endswith(".tmp") or (path.name.startswith(SEGMENT_PREFIX) and path.name not in keep)
+            if unused and path.name not in self._segments:
+                path.unlink()
+                deleted.append(path.name)
+        return sorted(deleted)
+
+    def disk_bytes(self) -> int:
+        return sum((self.directory / name).stat().st_size for name in self.names())
+
+    def close(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+
+
+def _fsync_directory(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def referenced_segments(ledgers: Iterable) -> List[str]:
+    """Names of the segments the cold blocks of ``ledgers`` live in."""
+    return sorted({block.ref.segment for ledger in ledgers for block in ledger.cold})
@@ -0,0 +1,133 @@
+# app/db/sqlite.py
+"""
+SQLite plumbing: URL parsing, schema, and a thread-safe connection pool.
+
+FastAPI runs plain ``def`` endpoints in a threadpool, so connections are
+opened with ``check_same_thread=False`` and handed out one thread at a
+time by ``ConnectionPool``. Every connection runs in WAL mode, and keeps a
+statement cache so the constant SQL strings used by the repository are
+prepared once per connection and reused.
+
+Money columns hold integer minor units (``app.models.money``). Databases
+created before that (``user_version`` 0, REAL columns in major units) are
+migrated in place when the pool opens them, as are version 2 databases,
+which lack the ``owner`` column (their accounts keep no owner).
+"""
+
+import queue
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+
+from app.models.money import minor_per_major
+
+SCHEMA_VERSION = 3  # 2: balance/amount are INTEGER minor units; 3: accounts.owner
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id      TEXT PRIMARY KEY,
+    balance INTEGER NOT NULL,
+    owner   TEXT
+);
+
+CREATE INDEX IF NOT EXISTS ix_accounts_owner ON accounts(owner);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id         INTEGER PRIMARY KEY,
+    account_id TEXT NOT NULL REFERENCES accounts(id),
+    amount     INTEGER NOT NULL,
+    type       TEXT NOT NULL,
+    timestamp  REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_transactions_account_timestamp
+    ON transactions(account_id, timestamp);
+"""
+
+# Version 1 -> 2: rebuild both tables with INTEGER columns, scaling values
+MIGRATE_TO_MINOR_UNITS = """
+BEGIN;
+ALTER TABLE accounts RENAME TO accounts_v1;
+ALTER TABLE transactions RENAME TO transactions_v1;
+DROP INDEX IF EXISTS ix_transactions_account_timestamp;
+{schema}
+INSERT INTO accounts (id, balance)
+    SELECT id, CAST(ROUND(balance * {factor}) AS INTEGER) FROM accounts_v1;
+INSERT INTO transactions (id, account_id, amount, type, timestamp)
+    SELECT id, account_id, CAST(ROUND(amount * {factor}) AS INTEGER), type, timestamp FROM transactions_v1;
+DROP TABLE transactions_v1;
+DROP TABLE accounts_v1;
+COMMIT;
+"""
+
+# Version 2 -> 3: ownership (see AccountRepository.owned)
+MIGRATE_ADD_OWNER = """
+BEGIN;
+ALTER TABLE accounts ADD COLUMN owner TEXT;
+CREATE INDEX IF NOT EXISTS ix_accounts_owner ON accounts(owner);
+COMMIT;
+"""
+
+def sqlite_path(database_url: str) -> str:
+    """``sqlite:///./dev.db`` -> ``./dev.db``; ``sqlite://`` means in-memory."""
+    if database_url in ("sqlite://", "sqlite:///:memory:"):
+        return ":memory:"
+    prefix = "sqlite:///"
+    if not database_url.startswith(prefix):
+        raise ValueError(f"Not a SQLite URL: {database_url}")
+    return database_url[len(prefix):]
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections to one database file."""
+
+    def __init__(self, path: str, size: int = 8, timeout: float = 30.0):
+        if path == ":memory:":
+            size = 1  # every :memory: connection would be a separate database
+        self.path = path
+        self.timeout = timeout
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        self._all = [self._connect() for _ in range(size)]
+        for conn in self._all:
+            self._pool.put(conn)
+        with self.connection() as conn:
+            self._init_schema(conn)
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection) -> None:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'accounts'").fetchone()
+        if exists and version < 2:
+            conn.executescript(MIGRATE_TO_MINOR_UNITS.format(schema=SCHEMA, factor=minor_per_major()))
+        elif exists:
+            conn.executescript(MIGRATE_ADD_OWNER)
+        else:
+            conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            isolation_level=None,     # explicit BEGIN/COMMIT only
+            cached_statements=256,    # prepared-statement cache
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        for conn in self._all:
+            conn.close()
@@ -0,0 +1,172 @@
+# app/db/wal.py
+"""
+Append-only write-ahead log with group commit.
+
+Events are JSON lines tagged with a monotonically increasing log sequence
+number (LSN). Writers append to an in-memory buffer and then call
+``commit``; the first committer flushes and fsyncs the buffer on behalf of
+every writer waiting behind it, so one fsync covers a whole group.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+SEGMENT_PREFIX = "wal-"
+SEGMENT_SUFFIX = ".log"
+
+
+def _segment_name(first_lsn: int) -> str:
+    return f"{SEGMENT_PREFIX}{first_lsn:020d}{SEGMENT_SUFFIX}"
+
+
+def _segment_first_lsn(path: Path) -> int:
+    return int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+class WriteAheadLog:
+    """Segmented, fsync-batched event log stored in ``directory``."""
+
+    def __init__(self, directory: str | os.PathLike, fsync: bool = True):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+
+        self._lock = threading.Lock()         # guards buffer and LSN counter
+        self._commit_lock = threading.Lock()  # held by the group-commit leader
+        self._buffer: List[str] = []
+        self._repair_tail()
+        self._lsn = self._last_lsn_on_disk()
+        self._durable_lsn = self._lsn
+
+        segments = self.segments()
+        if segments:
+            self._file = open(segments[-1], "a", encoding="utf-8")
+        else:
+            self._file = self._open_segment(self._lsn + 1)
+
+    # ─────────────────────────────────────────────────────────────
+    # Writing
+    # ─────────────────────────────────────────────────────────────
+    @property
+    def last_lsn(self) -> int:
+        return self._lsn
+
+    @property
+    def durable_lsn(self) -> int:
+        return self._durable_lsn
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Buffer an event and return its LSN. Not durable until ``commit``."""
+        with self._lock:
+            self._lsn += 1
+            lsn = self._lsn
+            self._buffer.append(json.dumps({"lsn": lsn, **event}, separators=(",", ":")) + "\n")
+        return lsn
+
+    def commit(self, lsn: int | None = None) -> None:
+        """
+        Make every event up to ``lsn`` (default: all appended) durable.
+
+        Concurrent callers queue on the commit lock; whoever gets it writes
+        the whole buffer, so the callers behind it usually find their LSN
+        already durable and return without touching the disk.
+        """
+        if lsn is None:
+            lsn = self._lsn
+        if self._durable_lsn >= lsn:
+            return
+        with self._commit_lock:
+            if self._durable_lsn >= lsn:
+                return
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+                upto = self._lsn
+            if pending:
+                self._file.write("".join(pending))
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            self._durable_lsn = upto
+
+    def rotate(self) -> None:
+        """Close the current segment and start a new one at the next LSN."""
+        with self._commit_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+                upto = self._lsn
+                if pending:
+                    self._file.write("".join(pending))
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = self._open_segment(upto + 1)
+            self._durable_lsn = upto
+
+    def close(self) -> None:
+        self.commit()
+        self._file.close()
+
+    # ─────────────────────────────────────────────────────────────
+    # Reading and truncation
+    # ─────────────────────────────────────────────────────────────
+    def segments(self) -> List[Path]:
+        return sorted(
+            self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"),
+            key=_segment_first_lsn,
+        )
+
+    def replay(self, after_lsn: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield durable events with ``lsn > after_lsn`` in log order."""
+        segments = self.segments()
+        for i, path in enumerate(segments):
+            # Skip segments that end before the requested position
+            if i + 1 < len(segments) and _segment_first_lsn(segments[i + 1]) <= after_lsn + 1:
+                continue
+            with open(path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    if not line.endswith("\n"):
+                        break  # torn write at the tail of a crashed segment
+                    event = json.loads(line)
+                    if event["lsn"] > after_lsn:
+                        yield event
+
+    def truncate_before(self, lsn: int) -> None:
+        """Delete segments whose events all have an LSN <= ``lsn``."""
+        segments = self.segments()
+        for current, following in zip(segments, segments[1:]):
+            if _segment_first_lsn(following) <= lsn + 1:
+                current.unlink()
+
+    # ─────────────────────────────────────────────────────────────
+    # Internals
+    # ─────────────────────────────────────────────────────────────
+    def _open_segment(self, first_lsn: int):
+        return open(self.directory / _segment_name(first_lsn), "a", encoding="utf-8")
+
+    def _repair_tail(self) -> None:
+        """Cut off a torn last line left behind by a crash mid-write."""
+        segments = self.segments()
+        if not segments:
+            return
+        path = segments[-1]
+        with open(path, "rb+") as fh:
+            data = fh.read()
+            if data and not data.endswith(b"\n"):
+                fh.truncate(data.rfind(b"\n") + 1)
+
+    def _last_lsn_on_disk(self) -> int:
+        segments = self.segments()
+        if not segments:
+            return 0
+        last = None
+        with open(segments[-1], "r", encoding="utf-8") as fh:
+            for line in fh:
+                last = line
+        if last is None:
+            # Empty segment: the next event would have taken its first LSN
+            return _segment_first_lsn(segments[-1]) - 1
+        return json.loads(last)["lsn"]
@@ -21,4 +21,34 @@ class DuplicateAccountError(Exception):
 
 class InvalidTransactionError(Exception):
     """Raised for invalid transaction types or amounts."""
-    pass
\ No newline at end of file
+    pass
+
+
+class InvalidTokenError(Exception):
+    """Raised when a JWT fails signature or claim verification."""
+    pass
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when too many password verifications are already pending."""
+    pass
+
+
+class IdempotencyKeyMismatchError(Exception):
+    """Raised when an Idempotency-Key is reused for a different request."""
+    pass
+
+
+class IdempotencyKeyInFlightError(Exception):
+    """Raised when the first request with an Idempotency-Key is still running after the wait timeout."""
+    pass
+
+
+class ShardUnavailableError(Exception):
+    """Raised when the process owning an account cannot be reached."""
+    pass
+
+
+class ScheduleNotFoundError(Exception):
+    """Raised when a scheduled transfer is unknown (never created, finished long ago or cancelled)."""
+    pass
@@ -1,20 +1,85 @@
 # app/main.py
-from datetime import timedelta
-from fastapi import FastAPI, HTTPException, Path, Body, Depends, status
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict
+from functools import partial
+from datetime import datetime, timedelta
+from fastapi import FastAPI, HTTPException, Header, Path, Body, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, PositiveFloat
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Literal, Optional
 
+from app.db.journal import Journal
+from app.db.segments import SegmentStore
+from app.repositories.account_repository import build_repository
 from app.services.account_service import AccountService
-from app.exceptions import AccountNotFoundError, InsufficientFundsError, DuplicateAccountError
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.services.audit import Auditor, AuditReport, Drift
+from app.services.bulk import MEDIA_TYPES as BULK_MEDIA_TYPES, BulkImporter, export_ledger
+from app.services.compaction import Compactor
+from app.services.engine import LedgerEngine
+from app.services.listing import AccountListing
+from app.services.scheduler import TransferScheduler
+from app.api.responses import adapter, etag, etag_matches, render
+from app.services.events import EventBus, Subscription, TransactionEvent
+from app.exceptions import (
+    AccountNotFoundError, InsufficientFundsError, DuplicateAccountError,
+    InvalidTokenError, PasswordHasherBusyError, IdempotencyKeyInFlightError, IdempotencyKeyMismatchError,
+    ShardUnavailableError, ScheduleNotFoundError,
+)
+from app.core.security import get_password_hash, create_access_token, decode_access_token, password_hasher
+from app.core.auth_cache import TokenCache, UserCache
+from app.core.idempotency import IdempotencyStore, StoredResponse, build_idempotency_backend, fingerprint
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, MetricsMiddleware
 from app.core.config import settings
 from app.schemas.token import Token
 from app.schemas.user import User, UserInDB
-from app.schemas.account import AccountCreate, DepositRequest, WithdrawRequest, TransferRequest
+from app.schemas.account import (
+    AccountCreate, DepositRequest, WithdrawRequest, TransferRequest, BatchRequest, BatchResponse,
+    AccountDetail, AccountOut, BalanceAtOut, BalanceOut, ImportOut, TransactionQueryOut, TransferOut,
+)
+from app.schemas.audit import AuditOut
+from app.schemas.report import StatementResponse
+from app.schemas.schedule import ScheduleCreate, ScheduleOut
+from app.models.batch import BatchOperation, BatchResult
+from app.models.money import format_major, set_scale as set_currency_scale, to_major, to_minor
+from app.models.schedule import Schedule
+from app.models.transaction import from_epoch, to_epoch
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Seed the demo users in the background so startup does not wait on bcrypt
+    asyncio.get_running_loop().run_in_executor(None, get_fake_users_db)
+    if compactor is not None:
+        compactor.start()
+    auditor.start()
+    if transfer_scheduler is not None:
+        transfer_scheduler.start()
+    if ledger_engine is not None:
+        await ledger_engine.start()
+    yield
+    if transfer_scheduler is not None:
+        transfer_scheduler.close()
+    if ledger_engine is not None:
+        await ledger_engine.close()
+    event_bus.close()
+    auditor.close()
+    if compactor is not None:
+        compactor.close()
+    account_service.close()
+    if compactor is not None and journal is None:
+        compactor.segments.close()
+    idempotency_store.close()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Financial App API",
     description=(
         "RESTful API for managing financial accounts, transactions, deposits, withdrawals, and transfers. "
@@ -34,24 +99,38 @@ app = FastAPI(
         },
     ],
 )
+app.add_middleware(MetricsMiddleware)
+
+# Fake users database (in-memory for development - replace with real DB later).
+# Seeded on first use: hashing the demo passwords costs two bcrypt rounds,
+# which importing the app should not pay.
+_fake_users_db: Optional[Dict[str, Dict[str, Any]]] = None
+_fake_users_lock = threading.Lock()
+
+
+def get_fake_users_db() -> Dict[str, Dict[str, Any]]:
+    global _fake_users_db
+    if _fake_users_db is None:
+        with _fake_users_lock:
+            if _fake_users_db is None:
+                _fake_users_db = {
+                    "johndoe": {
+                        "username": "johndoe",
+                        "full_name": "John Doe",
+                        "email": "johndoe@example.com",
+                        "hashed_password": get_password_hash("secret123"),
+                        "disabled": False,
+                    },
+                    "alice": {
+                        "username": "alice",
+                        "full_name": "Alice Wonderland",
+                        "email": "alice@example.com",
+                        "hashed_password": get_password_hash("wonderland456"),
+                        "disabled": True,
+                    },
+                }
+    return _fake_users_db
 
-# Fake users database (in-memory for development - replace with real DB later)
-fake_users_db = {
-    "johndoe": {
-        "username": "johndoe",
-        "full_name": "John Doe",
-        "email": "johndoe@example.com",
-        "hashed_password": get_password_hash("secret123"),
-        "disabled": False,
-    },
-    "alice": {
-        "username": "alice",
-        "full_name": "Alice Wonderland",
-        "email": "alice@example.com",
-        "hashed_password": get_password_hash("wonderland456"),
-        "disabled": True,
-    },
-}
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -61,33 +140,64 @@ def get_user(db, username: str):
         return UserInDB(**user_dict)
 
 
-def authenticate_user(fake_db, username: str, password: str):
+async def authenticate_user(fake_db, username: str, password: str):
     user = get_user(fake_db, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    # bcrypt runs on the bounded hasher pool, not on the event loop
+    if not await password_hasher.verify(password, user.hashed_password):
         return None
     return user
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
+# Verified tokens and user principals, so most requests skip jwt.decode
+# and the UserInDB rebuild (see app/core/auth_cache.py)
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS)
+user_cache: UserCache[UserInDB] = UserCache(lambda username: get_user(get_fake_users_db(), username))
+
+
+def set_user_disabled(username: str, disabled: bool = True) -> None:
+    """Enable/disable a user and drop its cached principal."""
+    get_fake_users_db()[username]["disabled"] = disabled
+    user_cache.invalidate(username)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    return await _user_for_token_async(token)
+
+
+async def _user_for_token_async(token: str) -> UserInDB:
+    if _fake_users_db is None:
+        # Cold start: this lookup may seed the users (bcrypt), off the event loop
+        return await run_in_threadpool(_user_for_token, token)
+    return _user_for_token(token)
+
+
+def _user_for_token(token: str) -> UserInDB:
+    username = token_cache.get(token)
+    if username is None:
+        try:
+            payload = decode_access_token(token)
+        except InvalidTokenError:
+            raise _credentials_exception()
         sub = payload.get("sub")
         if sub is None or not isinstance(sub, str):
-            raise credentials_exception
-        username: str = sub
-    except JWTError:
-        raise credentials_exception
+            raise _credentials_exception()
+        username = sub
+        if "exp" in payload:
+            token_cache.put(token, username, payload["exp"])
 
-    user = get_user(fake_users_db, username=username)
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 
@@ -97,8 +207,179 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
-# In-memory account service instance
-account_service = AccountService()
+ADMIN_USERS = frozenset(name.strip() for name in settings.ADMIN_USERS.split(",") if name.strip())
+
+
+async def get_admin_user(current_user: User = Depends(get_current_active_user)):
+    if current_user.username not in ADMIN_USERS:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return current_user
+
+
+# Amounts are int minor units below the API; set the scale before loading data
+set_currency_scale(settings.CURRENCY_SCALE)
+
+# Transaction events pushed to /events and /ws/events subscribers; every
+# worker numbers its events apart from the others' (see app/services/events.py)
+event_bus = EventBus(
+    retain=settings.EVENT_RETAIN,
+    queue_size=settings.EVENT_QUEUE_SIZE,
+    policy=settings.EVENT_SLOW_CONSUMER,
+    stride=settings.SHARD_COUNT,
+    offset=settings.SHARD_ID,
+)
+
+# Account service instance: storage backend chosen by ACCOUNT_BACKEND,
+# journaled to disk when WAL_DIR is set (one subdirectory per shard)
+_sharded = settings.SHARD_COUNT > 1
+if settings.WAL_DIR and settings.ACCOUNT_BACKEND != "memory":
+    raise ValueError("WAL_DIR journals the in-memory backend only (ACCOUNT_BACKEND=memory)")
+if _sharded and settings.ACCOUNT_BACKEND != "memory":
+    # One DATABASE_URL for every worker: each would load (and list) every account
+    raise ValueError("Several workers need ACCOUNT_BACKEND=memory, with WAL_DIR for durability")
+journal = Journal(
+    os.path.join(settings.WAL_DIR, f"shard-{settings.SHARD_ID}") if _sharded else settings.WAL_DIR,
+    fsync=settings.WAL_FSYNC,
+    snapshot_every=settings.SNAPSHOT_EVERY,
+) if settings.WAL_DIR else None
+account_service = AccountService(
+    journal=journal,
+    repository=build_repository(settings.ACCOUNT_BACKEND, str(settings.DATABASE_URL)),
+    events=event_bus,
+)
+
+# Tiered history: a background thread moves rows older than
+# COLD_AFTER_SECONDS into compressed segment files (app/services/compaction.py)
+compactor: Optional[Compactor] = None
+if settings.COLD_AFTER_SECONDS is not None:
+    if journal is not None:
+        cold_segments = journal.segments
+    elif settings.COLD_DIR:
+        cold_segments = SegmentStore(
+            os.path.join(settings.COLD_DIR, f"shard-{settings.SHARD_ID}") if _sharded else settings.COLD_DIR,
+            fsync=False,  # nothing durable refers to them
+        )
+        cold_segments.retain(())  # left over from a previous run
+    else:
+        raise ValueError("COLD_AFTER_SECONDS needs WAL_DIR or COLD_DIR for the segment files")
+    compactor = Compactor(
+        account_service,
+        cold_segments,
+        cold_after=settings.COLD_AFTER_SECONDS,
+        interval=settings.COMPACT_INTERVAL_SECONDS,
+        min_rows=settings.COMPACT_MIN_ROWS,
+    )
+# Incremental check of balances against ledgers and of money conservation,
+# every AUDIT_INTERVAL_SECONDS and on GET /admin/audit (app/services/audit.py)
+auditor = Auditor(account_service, interval=settings.AUDIT_INTERVAL_SECONDS)
+# Optional single writer for deposit/withdraw/transfer (app/services/engine.py)
+ledger_engine: Optional[LedgerEngine] = None
+if settings.LEDGER_ENGINE:
+    if _sharded:
+        raise ValueError("LEDGER_ENGINE needs a single worker (SHARD_COUNT=1)")
+    ledger_engine = LedgerEngine(
+        account_service, max_batch=settings.ENGINE_MAX_BATCH, max_pending=settings.ENGINE_MAX_PENDING
+    )
+
+# Scheduled and recurring transfers fired in batches (app/services/scheduler.py);
+# single worker only: every worker would otherwise need every schedule
+transfer_scheduler: Optional[TransferScheduler] = None
+if not _sharded:
+    transfer_scheduler = TransferScheduler(
+        account_service,
+        directory=os.path.join(settings.WAL_DIR, "schedules") if settings.WAL_DIR else None,
+        fsync=settings.WAL_FSYNC,
+        max_batch=settings.SCHEDULE_MAX_BATCH,
+    )
+
+if _sharded:
+    # Several workers (python -m app.serve): this one owns a slice of the
+    # accounts and forwards the rest to their owners (app/services/sharding.py)
+    from app.services.sharding import ShardedAccountService
+
+    account_service = ShardedAccountService(
+        account_service,
+        shard_id=settings.SHARD_ID,
+        shards=settings.SHARD_COUNT,
+        socket_dir=settings.SHARD_SOCKET_DIR,
+        authkey=hashlib.sha256(b"shard-rpc:" + settings.SECRET_KEY.encode()).digest(),
+        resolve_after=settings.TWO_PHASE_RESOLVE_SECONDS,
+    )
+
+
+@app.exception_handler(ShardUnavailableError)
+async def shard_unavailable(request, exc: ShardUnavailableError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+# Responses of deposit/withdraw/transfer by Idempotency-Key, so client retries
+# replay the first result instead of moving money twice
+if _sharded and settings.IDEMPOTENCY_BACKEND == "memory":
+    # Per-worker keys: a retry reaching another worker would run again
+    raise ValueError("Several workers need IDEMPOTENCY_BACKEND=sqlite (one DATABASE_URL shared by all)")
+idempotency_store = IdempotencyStore(
+    build_idempotency_backend(
+        settings.IDEMPOTENCY_BACKEND, str(settings.DATABASE_URL), maxsize=settings.IDEMPOTENCY_MAX_KEYS
+    ),
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_SECONDS,
+)
+IDEMPOTENT_REPLAYS = REGISTRY.counter(
+    "idempotent_replays_total", "Responses replayed for a repeated Idempotency-Key", ("operation",)
+)
+
+
+def _idempotent(
+    key: Optional[str], user: User, operation: str, request: Any, response: Response, run
+) -> Any:
+    """
+    Run ``run()`` once per (user, Idempotency-Key) and replay its outcome,
+    including 4xx errors, to retries. Without a key it just runs.
+    """
+    if key is None:
+        return run()
+
+    def first() -> StoredResponse:
+        try:
+            return StoredResponse(digest, 200, run())
+        except HTTPException as e:
+            if e.status_code >= 500:
+                raise  # transient: let the retry run it again
+            return StoredResponse(digest, e.status_code, e.detail)
+
+    digest = fingerprint(operation, request)
+    try:
+        stored, replayed = idempotency_store.execute(f"{user.username}:{key}", digest, first)
+    except IdempotencyKeyMismatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyKeyInFlightError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    if replayed:
+        IDEMPOTENT_REPLAYS.inc(operation.split(":", 1)[0])
+        response.headers["Idempotent-Replayed"] = "true"
+    if stored.status_code >= 400:
+        headers = {"Idempotent-Replayed": "true"} if replayed else None
+        raise HTTPException(status_code=stored.status_code, detail=stored.body, headers=headers)
+    return stored.body
+
+
+IDEMPOTENCY_KEY = Header(
+    None, alias="Idempotency-Key", max_length=255,
+    description="Retries with the same key replay the first response instead of repeating the operation",
+)
+
+
+REGISTRY.gauge("accounts", "Accounts in the repository", account_service.count_accounts)
+REGISTRY.gauge("token_cache_entries", "Verified tokens cached", lambda: len(token_cache))
+REGISTRY.gauge("event_subscribers", "Open /events and /ws/events subscriptions", event_bus.subscribers)
+REGISTRY.gauge("scheduled_transfers_pending", "Scheduled transfers waiting to run", lambda: transfer_scheduler.pending() if transfer_scheduler else 0)
+REGISTRY.gauge("ledger_audit_drifting", "Invariant violations outstanding since the last full audit", lambda: len(auditor.drifting))
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (text exposition format)."""
+    return PlainTextResponse(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 @app.post("/token", response_model=Token, tags=["Auth"])
@@ -112,7 +393,11 @@ async def login_for_access_token(
     - username: johndoe
     - password: secret123
     """
-    user = authenticate_user(fake_users_db, form_data.username, form_data.password)
+    fake_users_db = await run_in_threadpool(get_fake_users_db)  # seeds on first use
+    try:
+        user = await authenticate_user(fake_users_db, form_data.username, form_data.password)
+    except PasswordHasherBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -126,92 +411,731 @@ async def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-@app.get("/accounts", response_model=List[Dict[str, Any]], tags=["Accounts"])
-def list_accounts(current_user: User = Depends(get_current_active_user)):
-    """List all accounts (summary view: id and current balance)."""
-    return account_service.list_all_accounts()
+def _check_owner(account_id: str, user: User) -> None:
+    """
+    Raise ``AccountNotFoundError`` unless ``user`` may use the account:
+    its owner, or anyone for an account without one (imported / created
+    before ownership). Someone else's account looks like a missing one.
+    One lookup of the account, however many accounts exist.
+    """
+    owner = account_service.owner_of(account_id)
+    if owner is not None and owner != user.username:
+        raise AccountNotFoundError(f"Account {account_id} not found")
+
+
+def _account_page(
+    request: Request, accounts: List[dict], offset: int, limit: Optional[int], if_none_match: Optional[str],
+    body: Optional[bytes] = None, tag: Optional[str] = None,
+) -> Response:
+    """
+    Serve ``accounts`` (or the page ``offset``/``limit`` of them) with
+    `ETag`, `X-Total-Count` and a `Link` to the next page. ``body`` and
+    ``tag`` are the already serialized full list, if there is one.
+    """
+    total = len(accounts)
+    headers = {"X-Total-Count": str(total), "Cache-Control": "no-cache"}
+    page = None  # the whole list
+    if body is None:
+        body = adapter(List[AccountOut]).dump_json(accounts)
+        tag = etag(body)
+    if offset or limit is not None:
+        end = total if limit is None else offset + limit
+        page = accounts[offset:end]
+        tag = etag(f"{tag}:{offset}:{end}".encode())  # pages of one list never change either
+        if end < total:
+            headers["Link"] = f'<{request.url.include_query_params(offset=end, limit=limit)}>; rel="next"'
+    headers["ETag"] = tag
+    if etag_matches(if_none_match, tag):
+        return Response(status_code=304, headers=headers)
+    if page is not None:
+        body = adapter(List[AccountOut]).dump_json(page)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/accounts", response_model=List[AccountOut], tags=["Accounts"])
+def list_accounts(
+    request: Request,
+    offset: int = Query(0, ge=0, description="Accounts to skip"),
+    limit: Optional[int] = Query(None, ge=1, le=10_000, description="Page size (default: all accounts)"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    List the caller's accounts (summary view: id and current balance),
+    oldest first.
+
+    Read from the owner index, so the cost grows with the accounts the
+    caller owns, not with all accounts. The response has an `ETag`; send
+    it back as `If-None-Match` to get 304 while nothing changed. With
+    `limit`, returns one page from `offset` plus a `Link: <...>; rel="next"`
+    header while more remain. `X-Total-Count` is the number of accounts.
+    """
+    accounts = account_service.list_owned_accounts(current_user.username)
+    return _account_page(request, accounts, offset, limit, if_none_match)
+
+
+# GET /admin/accounts body and ETag, rebuilt only after an account or balance changes
+account_listing = AccountListing(account_service, adapter(List[AccountOut]).dump_json, etag)
 
 
-@app.post("/accounts", status_code=201, response_model=Dict[str, Any], tags=["Accounts"])
+@app.get("/admin/accounts", response_model=List[AccountOut], tags=["Admin"])
+def admin_list_accounts(
+    request: Request,
+    offset: int = Query(0, ge=0, description="Accounts to skip"),
+    limit: Optional[int] = Query(None, ge=1, le=10_000, description="Page size (default: all accounts)"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    List every account, whoever owns it (admins only), paged like
+    `GET /accounts`. Served from a snapshot rebuilt only after accounts
+    change.
+    """
+    snapshot = account_listing.snapshot()
+    return _account_page(request, snapshot.accounts, offset, limit, if_none_match, snapshot.body, snapshot.etag)
+
+
+@app.post("/accounts", status_code=201, response_model=AccountOut, tags=["Accounts"])
 def create_account(
     account: AccountCreate,
     current_user: User = Depends(get_current_active_user)
 ):
-    """Create a new account with given ID and optional initial balance."""
+    """Create a new account with given ID and optional initial balance, owned by the caller."""
     try:
-        created = account_service.create_account(account.id, account.initial_balance)
-        return {"id": created.id, "balance": created.balance}
+        created = account_service.create_account(account.id, account.initial_balance, owner=current_user.username)
+        return render(AccountOut, {"id": created.id, "balance": created.balance}, status_code=201)
     except DuplicateAccountError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/accounts/{account_id}", response_model=Dict[str, Any], tags=["Accounts"])
+def _apply_owned_batch(operations: List[BatchOperation], atomic: bool, user: User) -> List[BatchResult]:
+    """
+    ``account_service.apply_batch`` for the items whose account ``user``
+    may use (``_check_owner``, once per account); the others report that
+    error in place. In atomic mode one such item aborts the batch.
+    """
+    denied: Dict[str, Optional[str]] = {}
+    for op in operations:
+        if op.account_id not in denied:
+            try:
+                _check_owner(op.account_id, user)
+                denied[op.account_id] = None
+            except AccountNotFoundError as e:
+                denied[op.account_id] = str(e)
+    results = [BatchResult(index=i, error=denied[op.account_id]) for i, op in enumerate(operations)]
+    allowed = [i for i, result in enumerate(results) if result.error is None]
+    if len(allowed) == len(operations):
+        return account_service.apply_batch(operations, atomic=atomic)
+    if atomic:
+        return AccountService._abort_batch(results)
+    applied = account_service.apply_batch([operations[i] for i in allowed]) if allowed else []
+    for i, result in zip(allowed, applied):
+        result.index = i
+        results[i] = result
+    return results
+
+
+@app.post("/accounts/batch", response_model=BatchResponse, tags=["Accounts"])
+def apply_batch(
+    req: BatchRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Apply many deposits, withdrawals and transfers in one call.
+
+    - mode=best_effort: apply every item that can be applied, in order
+    - mode=atomic: apply all items or none
+
+    Returns one result per item (new balance of `account_id`, or the error).
+    An item whose `account_id` is another user's fails like one naming a
+    missing account; transfers may go to anyone's account.
+    """
+    results = _apply_owned_batch(
+        [
+            BatchOperation(op=item.op, account_id=item.account_id, amount=item.amount, to_account_id=item.to_account_id)
+            for item in req.operations
+        ],
+        req.mode == "atomic",
+        current_user,
+    )
+    applied = sum(1 for r in results if r.ok)
+    return render(BatchResponse, {
+        "mode": req.mode,
+        "applied": applied,
+        "failed": len(results) - applied,
+        "results": [
+            {"index": r.index, "ok": r.ok, "balance": r.balance, "error": r.error}
+            for r in results
+        ],
+    })
+
+
+@app.get("/accounts/{account_id}", response_model=AccountDetail, tags=["Accounts"])
 def get_account(
     account_id: str = Path(...),
+    limit: int = Query(100, ge=1, le=1000, description="Transactions per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    order: Literal["desc", "asc"] = Query("desc", description="desc: newest first, asc: oldest first"),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson streams the full history"),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get detailed account information including transaction history."""
+    """
+    Get account information with its transaction history.
+
+    - format=json: one page of `limit` transactions plus `next_cursor`
+      (null on the last page); pass it back as `cursor` for the next page.
+    - format=ndjson: streams the whole history, one JSON object per line
+      (first line: account id and balance), in constant memory.
+    """
     try:
+        _check_owner(account_id, current_user)
         acc = account_service.get_account(account_id)
-        return {
+        if format == "ndjson":
+            chunks = account_service.iter_transactions(account_id, order=order)
+            return StreamingResponse(
+                _ndjson_history(acc.id, to_major(acc.balance), chunks),
+                media_type="application/x-ndjson",
+            )
+        page, next_cursor = account_service.get_transactions_page(
+            account_id, limit=limit, cursor=cursor, order=order
+        )
+        return render(AccountDetail, {
             "id": acc.id,
             "balance": acc.balance,
-            "transactions": [
-                {"amount": t.amount, "type": t.type, "timestamp": t.timestamp.isoformat()}
-                for t in acc.transactions
-            ]
-        }
+            "transactions": [{"amount": t.amount, "type": t.type, "timestamp": t.timestamp} for t in page],
+            "next_cursor": next_cursor,
+        })
     except AccountNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _transaction_dict(t) -> Dict[str, Any]:
+    return {"amount": to_major(t.amount), "type": t.type, "timestamp": t.timestamp.isoformat()}
+
 
+def _ndjson_history(account_id: str, balance: float, chunks):
+    # One yield per chunk, not per row: Starlette hops to the threadpool for
+    # every item of a sync iterator
+    yield json.dumps({"id": account_id, "balance": balance}) + "\n"
+    for chunk in chunks:
+        yield "".join(json.dumps(_transaction_dict(t)) + "\n" for t in chunk)
 
-@app.post("/accounts/{account_id}/deposit", response_model=Dict[str, float], tags=["Accounts"])
-def deposit(
+
+@app.get("/accounts/{account_id}/transactions", response_model=TransactionQueryOut, tags=["Accounts"])
+def query_transactions(
     account_id: str = Path(...),
-    req: DepositRequest = Body(...),
+    min_amount: Optional[float] = Query(None, ge=0.0),
+    max_amount: Optional[float] = Query(None, ge=0.0),
+    type: Optional[Literal["deposit", "withdraw"]] = Query(None),
+    from_: Optional[datetime] = Query(None, alias="from", description="Earliest timestamp (inclusive)"),
+    to: Optional[datetime] = Query(None, description="Latest timestamp (inclusive)"),
+    limit: int = Query(1000, ge=1, le=10_000),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Deposit money into the specified account."""
+    """Filter an account's transactions by amount range, type and time window (oldest first)."""
     try:
-        acc = account_service.deposit(account_id, req.amount)
-        return {"balance": acc.balance}
+        _check_owner(account_id, current_user)
+        matches = account_service.query_transactions(
+            account_id,
+            min_amount=None if min_amount is None else to_minor(min_amount),
+            max_amount=None if max_amount is None else to_minor(max_amount),
+            type=type,
+            start=from_,
+            end=to,
+            limit=limit,
+        )
+        return render(TransactionQueryOut, {
+            "id": account_id,
+            "count": len(matches),
+            "transactions": [{"amount": t.amount, "type": t.type, "timestamp": t.timestamp} for t in matches],
+        })
     except AccountNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/accounts/{account_id}/withdraw", response_model=Dict[str, float], tags=["Accounts"])
-def withdraw(
+@app.get("/accounts/{account_id}/balance", response_model=BalanceAtOut, tags=["Accounts"])
+def get_balance(
     account_id: str = Path(...),
-    req: WithdrawRequest = Body(...),
+    at: Optional[datetime] = Query(None, description="Point in time (default: now)"),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Withdraw money from the specified account."""
+    """Balance of the account now, or as it was at time `at`."""
     try:
-        acc = account_service.withdraw(account_id, req.amount)
-        return {"balance": acc.balance}
+        _check_owner(account_id, current_user)
+        if at is None:
+            balance = account_service.get_balance(account_id)
+            return render(BalanceAtOut, {"id": account_id, "balance": balance, "at": None})
+        balance = account_service.get_balance_at(account_id, at)
+        return render(BalanceAtOut, {"id": account_id, "balance": balance, "at": at.isoformat()})
     except AccountNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    except InsufficientFundsError as e:
+
+
+@app.get("/accounts/{account_id}/statement", response_model=StatementResponse, tags=["Reports"])
+def get_statement(
+    account_id: str = Path(...),
+    from_: Optional[datetime] = Query(None, alias="from", description="Window start (inclusive)"),
+    to: Optional[datetime] = Query(None, description="Window end (inclusive)"),
+    period: Literal["day", "week", "month"] = Query("day", description="Bucket size of `flows`"),
+    top: int = Query(10, ge=0, le=1000, description="Largest movements to return"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Account statement for a time window: totals in and out, net flow per
+    period, opening/closing/min/max/time-weighted average balance and the
+    largest movements.
+    """
+    try:
+        _check_owner(account_id, current_user)
+        return asdict(account_service.get_statement(account_id, start=from_, end=to, period=period, top=top))
+    except AccountNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/reports/summary", response_model=StatementResponse, tags=["Reports"])
+def get_summary(
+    from_: Optional[datetime] = Query(None, alias="from", description="Window start (inclusive)"),
+    to: Optional[datetime] = Query(None, description="Window end (inclusive)"),
+    period: Literal["day", "week", "month"] = Query("day", description="Bucket size of `flows`"),
+    top: int = Query(10, ge=0, le=1000, description="Largest movements to return"),
+    scope: Literal["mine", "all"] = Query("mine", description="all: every account (admins only)"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Portfolio statement: the same aggregates over the caller's accounts
+    together, or over all accounts with `scope=all` (admins only).
+    """
+    if scope == "all" and current_user.username not in ADMIN_USERS:
+        raise HTTPException(status_code=403, detail="Admin only")
+    owner = None if scope == "all" else current_user.username
+    try:
+        return asdict(account_service.get_summary(start=from_, end=to, period=period, top=top, owner=owner))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/accounts/{account_id}/transfer", response_model=Dict[str, str], tags=["Accounts"])
-def transfer(
+def _drift_out(drift: Drift) -> Dict[str, Any]:
+    return {**asdict(drift), "detected_at": from_epoch(drift.detected_at)}
+
+
+def _audit_out(report: AuditReport) -> Dict[str, Any]:
+    return {
+        **asdict(report),
+        "finished_at": from_epoch(report.finished_at),
+        "drifts": [_drift_out(drift) for drift in report.drifts],
+        "drifting": [_drift_out(drift) for drift in report.drifting],
+    }
+
+
+@app.get("/admin/audit", response_model=AuditOut, tags=["Admin"])
+def get_audit(
+    full: bool = Query(False, description="Reread all history instead of only rows added since the last audit"),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Run the ledger audit now and report: every balance must equal the
+    account's opening balance plus its ledger's net flow, and the sum of
+    balances must equal the money deposited minus withdrawn (transfers
+    conserve money). `drifts` lists what this run found, `drifting`
+    everything found since the last full audit. In a multi-worker
+    deployment each worker audits its own shard.
+    """
+    return _audit_out(auditor.run(full=full))
+
+
+async def _move(
+    op: BatchOperation,
+    direct: Callable[[], Any],
+    body_of: Callable[[Any], Any],
+    key: Optional[str],
+    user: User,
+    request: Any,
+    response: Response,
+) -> Any:
+    """
+    Apply a deposit/withdraw/transfer and return the response body.
+
+    With the ledger engine the operation is queued and awaited right on
+    the event loop, so thousands of requests can be in flight. Without it
+    (or with an Idempotency-Key, whose bookkeeping blocks) ``direct`` runs
+    in the threadpool as before, the engine's blocking ``call`` taking its
+    place in engine mode. ``op.account_id`` must be ``user``'s (see
+    ``_check_owner``; a local lookup in engine mode, which is unsharded).
+    """
+    if ledger_engine is not None and key is None:
+        with _ledger_errors():
+            _check_owner(op.account_id, user)
+            return body_of(await ledger_engine.submit(op))
+    apply = direct if ledger_engine is None else partial(ledger_engine.call, op)
+
+    def run():
+        with _ledger_errors():
+            _check_owner(op.account_id, user)
+            return body_of(apply())
+
+    return await run_in_threadpool(_idempotent, key, user, f"{op.op}:{op.account_id}", request, response, run)
+
+
+@contextmanager
+def _ledger_errors():
+    """Map service errors of a money movement to HTTP errors."""
+    try:
+        yield
+    except AccountNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (InsufficientFundsError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/accounts/{account_id}/deposit", response_model=BalanceOut, tags=["Accounts"])
+async def deposit(
+    response: Response,
+    account_id: str = Path(...),
+    req: DepositRequest = Body(...),
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Deposit money into the specified account."""
+    body = await _move(
+        BatchOperation("deposit", account_id, req.amount),
+        lambda: account_service.deposit(account_id, req.amount).balance,
+        lambda balance: {"balance": to_major(balance)},
+        idempotency_key, current_user, req.model_dump(), response,
+    )
+    return render(BalanceOut, body, response=response)
+
+
+@app.post("/accounts/{account_id}/withdraw", response_model=BalanceOut, tags=["Accounts"])
+async def withdraw(
+    response: Response,
+    account_id: str = Path(...),
+    req: WithdrawRequest = Body(...),
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Withdraw money from the specified account."""
+    body = await _move(
+        BatchOperation("withdraw", account_id, req.amount),
+        lambda: account_service.withdraw(account_id, req.amount).balance,
+        lambda balance: {"balance": to_major(balance)},
+        idempotency_key, current_user, req.model_dump(), response,
+    )
+    return render(BalanceOut, body, response=response)
+
+
+@app.post("/accounts/{account_id}/transfer", response_model=TransferOut, tags=["Accounts"])
+async def transfer(
+    response: Response,
     account_id: str = Path(...),
     req: TransferRequest = Body(...),
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
     current_user: User = Depends(get_current_active_user)
 ):
     """Transfer money from one account to another."""
+    body = await _move(
+        BatchOperation("transfer", account_id, req.amount, req.to_account_id),
+        lambda: account_service.transfer(account_id, req.to_account_id, req.amount),
+        lambda _: {"message": f"Transferred {format_major(req.amount)} from {account_id} to {req.to_account_id}"},
+        idempotency_key, current_user, req.model_dump(), response,
+    )
+    return render(TransferOut, body, response=response)
+
+
+# ─────────────────────────────────────────────────────────────
+# Scheduled and recurring transfers
+# ─────────────────────────────────────────────────────────────
+def _scheduler() -> TransferScheduler:
+    if transfer_scheduler is None:
+        raise HTTPException(status_code=501, detail="Scheduled transfers need a single worker (SHARD_COUNT=1)")
+    return transfer_scheduler
+
+
+def _own_schedule(schedule_id: str, user: User) -> Schedule:
+    """The schedule, if ``user`` may use the account it pays from (else ``ScheduleNotFoundError``)."""
+    schedule = _scheduler().get(schedule_id)
     try:
-        account_service.transfer(account_id, req.to_account_id, req.amount)
-        return {"message": f"Transferred {req.amount} from {account_id} to {req.to_account_id}"}
-    except AccountNotFoundError as e:
+        _check_owner(schedule.from_account_id, user)
+    except AccountNotFoundError:
+        raise ScheduleNotFoundError(f"Schedule {schedule_id} not found")
+    return schedule
+
+
+def _schedule_out(schedule: Schedule) -> Dict[str, Any]:
+    return {
+        "id": schedule.id,
+        "from_account_id": schedule.from_account_id,
+        "to_account_id": schedule.to_account_id,
+        "amount": schedule.amount,
+        "next_run": None if schedule.next_run is None else from_epoch(schedule.next_run),
+        "every_seconds": schedule.interval,
+        "remaining": schedule.remaining,
+        "runs": schedule.runs,
+        "failures": schedule.failures,
+        "last_run": None if schedule.last_run is None else from_epoch(schedule.last_run),
+        "last_error": schedule.last_error,
+    }
+
+
+@app.post("/accounts/{account_id}/schedules", status_code=201, response_model=ScheduleOut, tags=["Schedules"])
+def create_schedule(
+    account_id: str = Path(...),
+    req: ScheduleCreate = Body(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Schedule a transfer from the account: once at `start_at` (default now),
+    or every `every_seconds` from then on, `count` times in all or until
+    cancelled. A run that fails (e.g. insufficient funds) is reported in
+    `failures`/`last_error`; a recurring schedule carries on with its next run.
+    """
+    scheduler = _scheduler()
+    with _ledger_errors():
+        _check_owner(account_id, current_user)
+        schedule = scheduler.create(
+            account_id, req.to_account_id, req.amount,
+            start=None if req.start_at is None else to_epoch(req.start_at),
+            interval=req.every_seconds,
+            count=req.count,
+        )
+    return render(ScheduleOut, _schedule_out(schedule), status_code=201)
+
+
+@app.get("/accounts/{account_id}/schedules", response_model=List[ScheduleOut], tags=["Schedules"])
+def list_schedules(
+    account_id: str = Path(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Pending scheduled transfers paying from the account, oldest first."""
+    scheduler = _scheduler()
+    with _ledger_errors():
+        _check_owner(account_id, current_user)
+    return render(List[ScheduleOut], [_schedule_out(schedule) for schedule in scheduler.list(account_id)])
+
+
+@app.get("/schedules/{schedule_id}", response_model=ScheduleOut, tags=["Schedules"])
+def get_schedule(
+    schedule_id: str = Path(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """A pending or recently finished scheduled transfer."""
+    try:
+        return render(ScheduleOut, _schedule_out(_own_schedule(schedule_id, current_user)))
+    except ScheduleNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    except InsufficientFundsError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+
+
+@app.delete("/schedules/{schedule_id}", status_code=204, tags=["Schedules"])
+def cancel_schedule(
+    schedule_id: str = Path(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Cancel a pending scheduled transfer (a run already under way still completes)."""
+    try:
+        _own_schedule(schedule_id, current_user)
+        _scheduler().cancel(schedule_id)
+    except ScheduleNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(status_code=204)
+
+
+# ─────────────────────────────────────────────────────────────
+# Bulk import / export
+# ─────────────────────────────────────────────────────────────
+@app.post("/import", response_model=ImportOut, tags=["Bulk"])
+async def bulk_import(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Load accounts and historical transactions from the request body,
+    streamed (see app/services/bulk.py for the layout): CSV with a
+    `kind,account_id,amount,timestamp,owner` header, or NDJSON objects
+    with those keys. Valid lines are loaded in chunks as they arrive;
+    invalid ones are counted and the first errors returned with their
+    line. Admins only: rows may touch any account and set any owner.
+    """
+    importer = BulkImporter(
+        account_service, format, chunk_size=settings.IMPORT_CHUNK_SIZE, max_errors=settings.IMPORT_MAX_ERRORS
+    )
+    async for block in request.stream():
+        if block:
+            await run_in_threadpool(importer.write, block)
+    report = await run_in_threadpool(importer.finish)
+    return render(ImportOut, {
+        "lines": report.lines,
+        "accounts": report.accounts,
+        "transactions": report.transactions,
+        "rejected": report.rejected,
+        "errors": [{"line": line, "error": error} for line, error in report.errors],
+    })
+
+
+@app.get("/export", tags=["Bulk"])
+def bulk_export(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Stream every account (opening balance) and its transactions in the
+    import layout, in constant memory; the output can be re-imported
+    (admins only).
+    """
+    return StreamingResponse(
+        export_ledger(account_service, format, chunk_size=settings.IMPORT_CHUNK_SIZE),
+        media_type=BULK_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="ledger.{format}"'},
+    )
+
+
+# ─────────────────────────────────────────────────────────────
+# Transaction event stream
+# ─────────────────────────────────────────────────────────────
+def _check_subscription(account_id: Optional[str], user: User) -> None:
+    if account_id is None:
+        if user.username not in ADMIN_USERS:
+            raise HTTPException(status_code=403, detail="Only admins may follow all accounts")
+        return
+    with _ledger_errors():
+        _check_owner(account_id, user)
+    if _sharded and account_service.ring.shard(account_id) != settings.SHARD_ID:
+        # Its events are published on the owning worker's bus only: this stream would stay silent
+        raise HTTPException(
+            status_code=421, detail=f"Account {account_id} is served by another worker; reconnect to reach it"
+        )
+
+
+def _event_dict(event: TransactionEvent) -> Dict[str, Any]:
+    return {
+        "seq": event.seq,
+        "account_id": event.account_id,
+        "type": event.type,
+        "amount": to_major(event.amount),
+        "balance": to_major(event.balance),
+        "timestamp": from_epoch(event.timestamp).isoformat(),
+        "counterparty": event.counterparty,
+    }
+
+
+async def _event_messages(subscription: Subscription):
+    """
+    Yield ``(kind, payload)`` for a subscription: "transaction" events,
+    "gap" (resumed past the retained window), "dropped" (slow consumer,
+    drop policy), "overflow" (slow consumer, disconnected: resume from
+    ``last_seq``) and "heartbeat" when idle.
+    """
+    if subscription.missed is not None:
+        yield "gap", {"first_seq": subscription.missed}
+    while not subscription.closed:
+        batch, dropped = await subscription.next_batch(settings.EVENT_HEARTBEAT_SECONDS)
+        if subscription.overflowed:
+            yield "overflow", {"last_seq": subscription.last_seq}
+            return
+        if dropped:
+            yield "dropped", {"count": dropped}
+        for event in batch:
+            yield "transaction", _event_dict(event)
+        if not batch and not dropped and not subscription.closed:
+            yield "heartbeat", {"last_seq": subscription.last_seq}
+
+
+def _sse_events(subscription: Subscription):
+    async def stream():
+        try:
+            async for kind, payload in _event_messages(subscription):
+                if kind == "heartbeat":
+                    yield ": keep-alive\n\n"
+                elif kind == "transaction":
+                    yield f"id: {payload['seq']}\nevent: transaction\ndata: {json.dumps(payload)}\n\n"
+                else:
+                    yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            subscription.close()
+    return stream()
+
+
+@app.get("/events", tags=["Events"])
+async def stream_events(
+    account_id: Optional[str] = Query(None, description="Only this account (default: all accounts)"),
+    since: Optional[int] = Query(None, ge=0, description="Resume after this sequence number"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID", ge=0),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Server-Sent Events stream of new transactions (one `transaction` event
+    per ledger row, `id` = sequence number). Reconnecting clients resume
+    with `Last-Event-ID` (sent automatically by EventSource) or `since`.
+    Other events: `gap` (some events were no longer retained, or the
+    sequence number is not this worker's, e.g. after a restart: re-read
+    state), `dropped` and `overflow` (this client was too slow). With
+    several workers, an account's stream is only served by the worker
+    owning it (421 elsewhere).
+    All accounts' events are for admins; others pass one of their `account_id`s.
+    """
+    await run_in_threadpool(_check_subscription, account_id, current_user)  # may ask another shard
+    resume = since if since is not None else last_event_id
+    subscription = event_bus.subscribe(account_id, resume)
+    return StreamingResponse(
+        _sse_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/ws/events")
+async def websocket_events(
+    websocket: WebSocket,
+    account_id: Optional[str] = None,
+    since: Optional[int] = None,
+    token: Optional[str] = None,
+):
+    """
+    WebSocket stream of the same events as `GET /events`, as JSON
+    messages `{"event": kind, "data": {...}}`. Authenticate with an
+    `Authorization: Bearer` header or `?token=`.
+    """
+    authorization = websocket.headers.get("authorization", "")
+    if token is None and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    try:
+        user = await _user_for_token_async(token) if token else None
+    except HTTPException:
+        user = None
+    if user is None or user.disabled:
+        await websocket.close(code=1008)  # policy violation
+        return
+    try:
+        await run_in_threadpool(_check_subscription, account_id, user)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    subscription = event_bus.subscribe(account_id, since)
+
+    async def watch_disconnect():
+        # Client messages are ignored; a disconnect ends the subscription right away
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            subscription.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        async for kind, payload in _event_messages(subscription):
+            await websocket.send_text(json.dumps({"event": kind, "data": payload}))
+            if kind == "overflow":
+                await websocket.close(code=1013)  # try again later (resume from last_seq)
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        subscription.close()
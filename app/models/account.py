@@ -3,28 +3,59 @@
 Data models for Account using dataclasses.
 """
 
+import time
 from dataclasses import dataclass, field
-from typing import List
+from typing import Optional
 
 from app.exceptions import InsufficientFundsError
+from app.models.ledger import DEPOSIT, WITHDRAW, Ledger
+from app.models.money import MAX_MINOR, format_major
 from app.models.transaction import Transaction
 
+ACCOUNT_ID_MIN_LENGTH = 3
+ACCOUNT_ID_MAX_LENGTH = 20
+
+
+def check_account_id(account_id: str) -> str:
+    """Return ``account_id`` if it is valid for a new account; raises ValueError."""
+    if not ACCOUNT_ID_MIN_LENGTH <= len(account_id) <= ACCOUNT_ID_MAX_LENGTH:
+        raise ValueError(f"Account ID must be {ACCOUNT_ID_MIN_LENGTH} to {ACCOUNT_ID_MAX_LENGTH} characters")
+    if not account_id.isalnum():
+        raise ValueError("Account ID must be alphanumeric")
+    return account_id
+
 
 @dataclass
 class Account:
-    """Account entity with balance and transaction history."""
+    """Account entity with balance (minor units), columnar transaction history and owning user."""
     id: str
-    balance: float = 0.0
-    transactions: List[Transaction] = field(default_factory=list)
+    balance: int = 0
+    transactions: Ledger = field(default_factory=Ledger)
+    owner: Optional[str] = None  # username; None for accounts open to every user (imported / legacy)
 
-    def deposit(self, amount: float) -> None:
-        """Add deposit transaction."""
-        self.transactions.append(Transaction(amount=amount, type="deposit"))
-        self.balance += amount
+    def __post_init__(self):
+        if not isinstance(self.transactions, Ledger):
+            self.transactions = Ledger(self.transactions)
 
-    def withdraw(self, amount: float) -> None:
+    def deposit(self, amount: int, timestamp: Optional[float] = None) -> Transaction:
+        """Add deposit transaction (``timestamp``: POSIX seconds, default now)."""
+        return self.transactions.row(self.apply(amount, DEPOSIT, timestamp))
+
+    def withdraw(self, amount: int, timestamp: Optional[float] = None) -> Transaction:
         """Add withdraw transaction if funds available."""
-        if self.balance < amount:
-            raise InsufficientFundsError(f"Insufficient funds: {self.balance} < {amount}")
-        self.transactions.append(Transaction(amount=amount, type="withdraw"))
-        self.balance -= amount
\ No newline at end of file
+        return self.transactions.row(self.apply(amount, WITHDRAW, timestamp))
+
+    def check_deposit(self, amount: int) -> None:
+        """Raise ValueError if depositing ``amount`` would take the balance past ``MAX_MINOR``."""
+        if self.balance + amount > MAX_MINOR:
+            raise ValueError(f"Balance would exceed the maximum of {format_major(MAX_MINOR)}")
+
+    def apply(self, amount: int, type_code: int, timestamp: Optional[float] = None) -> int:
+        """Record a deposit/withdraw row and return its ledger index (no ``Transaction`` built)."""
+        if type_code == WITHDRAW and self.balance < amount:
+            raise InsufficientFundsError(f"Insufficient funds: {format_major(self.balance)} < {format_major(amount)}")
+        if type_code == DEPOSIT:
+            self.check_deposit(amount)
+        index = self.transactions.record(amount, type_code, time.time() if timestamp is None else timestamp)
+        self.balance += amount if type_code == DEPOSIT else -amount
+        return index
@@ -0,0 +1,41 @@
+# app/models/batch.py
+"""
+Data models for batched money movements using dataclasses.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+BATCH_OPS = ("deposit", "withdraw", "transfer")
+
+
+@dataclass(frozen=True)
+class BatchOperation:
+    """One deposit, withdraw or transfer inside a batch."""
+    op: str  # "deposit", "withdraw" or "transfer"
+    account_id: str
+    amount: int  # minor units
+    to_account_id: Optional[str] = None  # transfer target
+
+
+def operation_error(op: BatchOperation) -> Optional[str]:
+    """Error message for a malformed item (accounts are not looked up), or None."""
+    if op.op not in BATCH_OPS:
+        return f"Unknown operation: {op.op}"
+    if op.amount <= 0:
+        return "Amount must be positive"
+    if op.op == "transfer":
+        if not op.to_account_id:
+            return "Transfer requires to_account_id"
+        if op.to_account_id == op.account_id:
+            return "Cannot transfer to the same account"
+    return None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch item: new balance of ``account_id`` or an error."""
+    index: int
+    ok: bool = False
+    balance: Optional[int] = None
+    error: Optional[str] = None
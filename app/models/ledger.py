@@ -0,0 +1,298 @@
+# app/models/ledger.py
+"""
+Columnar, append-only transaction storage for one account.
+
+Instead of one ``Transaction`` object per row (a dataclass instance plus an
+int, a str and a datetime: a few hundred bytes), a ``Ledger`` keeps three
+typed ``array`` columns: amounts (int64 minor units), an enum-coded type
+(int8) and POSIX timestamps (float64), i.e. 17 bytes per row. Rows are materialized as
+``Transaction`` views only when a caller indexes or iterates the ledger.
+
+The raw columns are public so hot paths (snapshots, reports, indexes) can
+work on them directly, e.g. ``numpy.frombuffer(ledger.amounts)``.
+
+For point-in-time balances the ledger also keeps a checkpoint of the
+running net flow (deposits minus withdrawals) every ``CHECKPOINT_EVERY``
+rows, so the net up to any row costs one lookup plus at most
+``CHECKPOINT_EVERY - 1`` additions. ``record`` extends the checkpoints as
+rows are appended; a ledger built with ``from_columns`` (e.g. loaded from a
+snapshot) builds them on its first lookup instead.
+
+History is tiered: ``freeze`` moves the oldest rows out of memory into
+an immutable *cold block* (``app.db.segments`` keeps them compressed in
+memory-mapped segment files), leaving the hot tail in the columns plus
+the carried-forward net flow of the cold rows. Row numbers stay global
+(``base`` cold rows come first), so indexing, iteration, ``net_before``
+and ``net_after`` span both tiers; only the column attributes are
+hot-only. A cold block is any object with ``rows``, ``net``,
+``min_amount``/``max_amount``, ``min_ts``/``max_ts`` and a ``columns()``
+method returning its three ``array`` columns.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from array import array
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from app.models.transaction import Transaction, from_epoch, to_epoch
+
+DEPOSIT = 0
+WITHDRAW = 1
+TYPE_NAMES = ("deposit", "withdraw")
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+CHECKPOINT_EVERY = 256
+
+
+# (amounts, types, timestamps) of a run of rows
+ColumnSet = Tuple[array, array, array]
+
+
+class Ledger:
+    """Sequence of ``Transaction`` rows stored as typed columns."""
+
+    __slots__ = (
+        "amounts", "types", "timestamps", "checkpoints", "ordered", "_synced", "_tail",
+        "cold", "base", "cold_net", "_starts",
+    )
+
+    def __init__(self, transactions: Iterable[Transaction] = ()):
+        # Hot rows only: row ``i`` of the ledger is ``amounts[i - base]``
+        self.amounts = array("q")
+        self.types = array("b")
+        self.timestamps = array("d")
+        self.checkpoints = array("q", [0])  # [j]: net flow of hot rows [0, j * CHECKPOINT_EVERY)
+        self.ordered = True  # hot timestamps non-decreasing (as of the last sync)
+        self._synced = 0     # hot rows folded into the checkpoints
+        self._tail = 0       # net flow of folded rows after the last checkpoint
+        self.cold: Tuple[Any, ...] = ()  # frozen blocks, oldest first
+        self.base = 0                    # rows in the cold blocks
+        self.cold_net = 0                # their net flow, carried forward
+        self._starts: List[int] = []     # first row of each cold block
+        for tx in transactions:
+            self.append(tx)
+
+    @classmethod
+    def from_columns(cls, amounts: array, types: array, timestamps: array, cold: Sequence[Any] = ()) -> "Ledger":
+        if not len(amounts) == len(types) == len(timestamps):
+            raise ValueError("Ledger columns must have the same length")
+        ledger = cls()
+        ledger.amounts, ledger.types, ledger.timestamps = amounts, types, timestamps
+        for block in cold:
+            ledger._add_cold(block)
+        return ledger
+
+    def record(self, amount: int, type_code: int, timestamp: float) -> int:
+        """Append a row and return its index."""
+        if amount <= 0:
+            raise ValueError("Transaction amount must be positive")
+        if not 0 <= type_code < len(TYPE_NAMES):
+            raise ValueError("Invalid transaction type")
+        timestamp = round(timestamp * 1_000_000) / 1_000_000  # µs, like datetime: views round-trip
+        index = len(self.amounts)
+        self.amounts.append(amount)
+        self.types.append(type_code)
+        self.timestamps.append(timestamp)
+        if self._synced == index:
+            self._fold(index)
+        return self.base + index
+
+    def _fold(self, index: int) -> None:
+        """Add row ``index`` (== ``_synced``) to the checkpoints."""
+        if index and self.timestamps[index] < self.timestamps[index - 1]:
+            self.ordered = False
+        self._tail += self.amounts[index] if self.types[index] == DEPOSIT else -self.amounts[index]
+        self._synced = index + 1
+        if self._synced % CHECKPOINT_EVERY == 0:
+            self.checkpoints.append(self.checkpoints[-1] + self._tail)
+            self._tail = 0
+
+    def _sync(self) -> None:
+        for index in range(self._synced, len(self.amounts)):
+            self._fold(index)
+
+    def net_before(self, row: int) -> int:
+        """Net flow (deposits minus withdrawals) of rows ``[0, row)``."""
+        if row < self.base:
+            position = bisect_right(self._starts, row) - 1
+            start = self._starts[position]
+            net = sum(block.net for block in self.cold[:position])
+            amounts, types, _ = self.cold[position].columns()
+            return net + _cold_net(amounts, types, None, row - start)
+        return self.cold_net + self._hot_net_before(row - self.base)
+
+    def _hot_net_before(self, row: int) -> int:
+        self._sync()
+        if row == len(self.amounts):
+            return self.checkpoints[-1] + self._tail
+        block = row // CHECKPOINT_EVERY
+        return self.checkpoints[block] + _net(self.amounts, self.types, block * CHECKPOINT_EVERY, row)
+
+    def net_after(self, timestamp: float) -> int:
+        """Net flow of the rows recorded strictly after ``timestamp``."""
+        net = 0
+        for block in self.cold:
+            # Zone maps: only a block straddling ``timestamp`` is decompressed
+            if block.min_ts > timestamp:
+                net += block.net
+            elif block.max_ts > timestamp:
+                amounts, types, timestamps = block.columns()
+                net += _cold_net(amounts, types, timestamps, timestamp)
+        self._sync()
+        size = len(self.amounts)
+        if self.ordered:
+            row = bisect_right(self.timestamps, timestamp)
+            return net if row == size else net + self._hot_net_before(size) - self._hot_net_before(row)
+        # Out-of-order history (e.g. imported): no prefix to cut, scan it
+        return net + _net_after(self.amounts, self.types, self.timestamps, timestamp)
+
+    # ── Tiers ────────────────────────────────────────────────────
+    def count_before(self, timestamp: float) -> int:
+        """Length of the run of oldest hot rows recorded strictly before ``timestamp``."""
+        self._sync()
+        timestamps = self.timestamps
+        if self.ordered:
+            return bisect_left(timestamps, timestamp)
+        for i in range(len(timestamps)):
+            if timestamps[i] >= timestamp:
+                return i
+        return len(timestamps)
+
+    def freeze(self, rows: int, block: Any) -> None:
+        """
+        Replace the oldest ``rows`` hot rows by ``block``, which must hold
+        exactly those rows (see ``hot_columns``). The hot columns are new
+        arrays afterwards; their checkpoints are rebuilt on the next lookup.
+        """
+        if block.rows != rows or rows > len(self.amounts):
+            raise ValueError("Cold block does not match the hot rows it replaces")
+        self.amounts = self.amounts[rows:]
+        self.types = self.types[rows:]
+        self.timestamps = self.timestamps[rows:]
+        self.checkpoints = array("q", [0])
+        self.ordered, self._synced, self._tail = True, 0, 0
+        self._add_cold(block)
+
+    def hot_columns(self, start: int = 0, stop: Optional[int] = None) -> ColumnSet:
+        """Copies of hot rows ``[start, stop)``, counted from the first hot row."""
+        return self.amounts[start:stop], self.types[start:stop], self.timestamps[start:stop]
+
+    def columns(self, start: int = 0, stop: Optional[int] = None) -> ColumnSet:
+        """Copies of rows ``[start, stop)`` (default: all) across both tiers."""
+        size = len(self)
+        stop = size if stop is None else min(stop, size)
+        if start >= self.base:
+            return self.hot_columns(start - self.base, stop - self.base)
+        parts = array("q"), array("b"), array("d")
+        for block_start, block in zip(self._starts, self.cold):
+            if block_start >= stop:
+                break
+            if block_start + block.rows > start:
+                lo, hi = max(start - block_start, 0), min(stop - block_start, block.rows)
+                for part, column in zip(parts, block.columns()):
+                    part.extend(column[lo:hi])
+        if stop > self.base:
+            for part, column in zip(parts, self.hot_columns(0, stop - self.base)):
+                part.extend(column)
+        return parts
+
+    def _add_cold(self, block: Any) -> None:
+        self._starts.append(self.base)
+        self.cold += (block,)
+        self.base += block.rows
+        self.cold_net += block.net
+
+    def append(self, tx: Transaction) -> None:
+        """List-compatible append of a ``Transaction`` object."""
+        self.record(tx.amount, TYPE_CODES[tx.type], to_epoch(tx.timestamp))
+
+    def raw(self, index: int) -> Tuple[int, int, float]:
+        """``(amount, type_code, timestamp)`` of row ``index`` (0 <= index < len)."""
+        if index >= self.base:
+            index -= self.base
+            return self.amounts[index], self.types[index], self.timestamps[index]
+        position = bisect_right(self._starts, index) - 1
+        amounts, types, timestamps = self.cold[position].columns()
+        index -= self._starts[position]
+        return amounts[index], types[index], timestamps[index]
+
+    def row(self, index: int) -> Transaction:
+        amount, type_code, timestamp = self.raw(index)
+        return Transaction(amount=amount, type=TYPE_NAMES[type_code], timestamp=from_epoch(timestamp))
+
+    def __len__(self) -> int:
+        return self.base + len(self.amounts)
+
+    @overload
+    def __getitem__(self, index: int) -> Transaction: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[Transaction]: ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ledger index out of range")
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for block in self.cold:
+            amounts, types, timestamps = block.columns()
+            for i in range(block.rows):
+                yield Transaction(amount=amounts[i], type=TYPE_NAMES[types[i]], timestamp=from_epoch(timestamps[i]))
+        for i in range(self.base, len(self)):
+            yield self.row(i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Ledger):
+            if self.cold or other.cold:
+                return self.columns() == other.columns()
+            return (
+                self.amounts == other.amounts
+                and self.types == other.types
+                and self.timestamps == other.timestamps
+            )
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Ledger({len(self)} transactions)"
+
+    def nbytes(self) -> int:
+        """Bytes used by the (hot) column buffers; cold blocks live on disk."""
+        return sum(col.buffer_info()[1] * col.itemsize for col in (self.amounts, self.types, self.timestamps))
+
+
+def _net(amounts: array, types: array, start: int, stop: int) -> int:
+    net = 0
+    for i in range(start, stop):
+        net += amounts[i] if types[i] == DEPOSIT else -amounts[i]
+    return net
+
+
+def _cold_net(amounts: array, types: array, timestamps: Optional[array], limit: Union[int, float]) -> int:
+    """
+    Net flow of a cold block's first ``limit`` rows, or (with
+    ``timestamps``) of its rows after ``limit``. Vectorized: a block is
+    thousands of rows, and NumPy is loaded anyway once blocks exist.
+    """
+    import numpy as np
+
+    a = np.frombuffer(amounts, dtype=np.int64)
+    t = np.frombuffer(types, dtype=np.int8)
+    if timestamps is None:
+        a, t = a[:limit], t[:limit]
+    else:
+        mask = np.frombuffer(timestamps, dtype=np.float64) > limit
+        a, t = a[mask], t[mask]
+    return int(a.sum()) - 2 * int(a[t != DEPOSIT].sum())
+
+
+def _net_after(amounts: array, types: array, timestamps: array, timestamp: float) -> int:
+    return sum(
+        (amounts[i] if types[i] == DEPOSIT else -amounts[i])
+        for i in range(len(amounts)) if timestamps[i] > timestamp
+    )
@@ -0,0 +1,80 @@
+# app/models/money.py
+"""
+Fixed-point money.
+
+Every amount and balance below the API is an ``int`` number of minor
+currency units (cents at the default scale of 2 decimal places), so
+arithmetic and sums are exact and ledgers can be summed with integer
+vector operations. Conversion happens only at the JSON boundary:
+``to_minor`` parses request values, ``to_major`` renders responses.
+
+The scale is process-wide and set once at startup from
+``settings.CURRENCY_SCALE``; stored amounts are minor units of the scale
+they were written with, so changing it reinterprets existing data.
+"""
+
+from decimal import Decimal, InvalidOperation
+from typing import Union
+
+SCALE = 2  # decimal places of the major unit
+MAX_SCALE = 9  # keeps balances of up to ~9.2e9 major units within int64
+MAX_MINOR = 2**63 - 1  # largest amount or balance: ledgers store int64 columns
+
+
+def set_scale(digits: int) -> None:
+    global SCALE
+    if not 0 <= digits <= MAX_SCALE:
+        raise ValueError(f"Currency scale must be between 0 and {MAX_SCALE}")
+    SCALE = digits
+
+
+def minor_per_major() -> int:
+    return 10 ** SCALE
+
+
+def to_minor(value: Union[int, float, str, Decimal]) -> int:
+    """
+    Major units (``12.34``, ``"12.34"``, ``Decimal``) -> minor units (``1234``).
+
+    Floats are read through their shortest repr, so ``0.1`` is exactly ten
+    cents. Raises ValueError for non-numbers, for more decimal places
+    than the scale allows (nothing is silently rounded) and for amounts
+    beyond ``MAX_MINOR`` either way.
+    """
+    if type(value) is str:
+        # Fast path for plain "123" / "123.45" (bulk imports parse millions)
+        whole, dot, fraction = value.partition(".")
+        if whole.isascii() and whole.isdigit() and (
+            not dot or (fraction.isascii() and fraction.isdigit() and len(fraction) <= SCALE)
+        ):
+            minor = int(whole) * 10 ** SCALE + (int(fraction) * 10 ** (SCALE - len(fraction)) if dot else 0)
+            if minor > MAX_MINOR:
+                raise ValueError(f"Amount {value} is too large (max {format_major(MAX_MINOR)})")
+            return minor
+    if isinstance(value, bool) or not isinstance(value, (int, float, str, Decimal)):
+        raise ValueError(f"Invalid amount: {value!r}")
+    try:
+        number = Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value!r}")
+    if not number.is_finite():
+        raise ValueError(f"Invalid amount: {value!r}")
+    minor = number.scaleb(SCALE)
+    if minor != minor.to_integral_value():
+        raise ValueError(f"Amount {value} has more than {SCALE} decimal places")
+    if abs(minor) > MAX_MINOR:
+        raise ValueError(f"Amount {value} is too large (max {format_major(MAX_MINOR)})")
+    return int(minor)
+
+
+def to_major(minor: Union[int, float]) -> float:
+    """Minor units -> major units for JSON (exact up to 2**53 minor units)."""
+    return minor / 10 ** SCALE
+
+
+def format_major(minor: int) -> str:
+    """Minor units -> fixed-point text, e.g. ``1234`` -> ``"12.34"``."""
+    if not SCALE:
+        return str(minor)
+    whole, fraction = divmod(abs(minor), 10 ** SCALE)
+    return f"{'-' if minor < 0 else ''}{whole}.{fraction:0{SCALE}d}"
@@ -0,0 +1,54 @@
+# app/models/report.py
+"""
+Data models for account statements and portfolio reports using dataclasses.
+
+Money fields are minor units (see ``app.models.money``).
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+REPORT_PERIODS = ("day", "week", "month")
+
+
+@dataclass(frozen=True)
+class FlowBucket:
+    """Money in and out during one day, week (from Monday) or month."""
+    start: datetime
+    inflow: int
+    outflow: int
+    net: int
+    count: int
+
+
+@dataclass(frozen=True)
+class Movement:
+    """One transaction among the largest of a statement."""
+    account_id: str
+    amount: int
+    type: str  # "deposit" or "withdraw"
+    timestamp: datetime
+
+
+@dataclass
+class Statement:
+    """
+    Aggregates over a time window for one account, or for the whole
+    portfolio (``account_id`` None, balances summed over ``accounts``).
+    """
+    account_id: Optional[str]
+    start: Optional[datetime]
+    end: Optional[datetime]
+    accounts: int = 1
+    count: int = 0
+    total_in: int = 0
+    total_out: int = 0
+    net_flow: int = 0
+    opening_balance: int = 0
+    closing_balance: int = 0
+    min_balance: int = 0
+    max_balance: int = 0
+    average_balance: float = 0.0  # time-weighted over the window, may be fractional
+    flows: List[FlowBucket] = field(default_factory=list)
+    top_movements: List[Movement] = field(default_factory=list)
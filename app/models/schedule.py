@@ -0,0 +1,36 @@
+# app/models/schedule.py
+"""
+Data model for scheduled and recurring transfers using dataclasses.
+
+Times are POSIX seconds and amounts minor units, like ledger rows.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass(slots=True)
+class Schedule:
+    """A transfer due at ``next_run``, repeated every ``interval`` seconds if set."""
+    id: str
+    from_account_id: str
+    to_account_id: str
+    amount: int
+    next_run: Optional[float]          # None once finished
+    interval: Optional[float] = None   # None: runs once
+    remaining: Optional[int] = None    # runs left (None: until cancelled)
+    runs: int = 0                      # attempts so far, failed ones included
+    failures: int = 0
+    last_run: Optional[float] = None   # due time of the latest attempt
+    last_error: Optional[str] = None   # of the latest attempt, None if it succeeded
+
+    @property
+    def finished(self) -> bool:
+        return self.next_run is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}  # asdict() is several times slower
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Schedule":
+        return cls(**data)
@@ -0,0 +1,121 @@
+# app/repositories/account_repository.py
+"""
+Storage abstraction behind AccountService.
+
+``AccountService`` works on ``Account`` objects; a repository decides
+where they live. ``InMemoryAccountRepository`` is the original dict, and
+``SqliteAccountRepository`` persists every change to SQLite. Select one
+with ``build_repository`` (driven by ``ACCOUNT_BACKEND`` in settings).
+
+Both keep an owner index (username -> the accounts it owns, in creation
+order), so a user's accounts are listed in O(accounts owned).
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.models.account import Account
+from app.models.transaction import Transaction
+
+# (account after the change, transaction appended to it)
+Change = Tuple[Account, Transaction]
+
+# (account, index of a row in its ledger): a change not materialized as a Transaction
+LedgerRow = Tuple[Account, int]
+
+
+class AccountRepository(ABC):
+    """Interface every account storage backend implements."""
+
+    durable = False  # True when accounts and history survive a restart without a journal
+
+    @abstractmethod
+    def add(self, account: Account) -> None:
+        """Store a new account (the caller has checked it does not exist)."""
+
+    @abstractmethod
+    def get(self, account_id: str) -> Optional[Account]:
+        """Return the live ``Account`` object, or None."""
+
+    @abstractmethod
+    def __contains__(self, account_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def all(self) -> Iterable[Account]:
+        """Every account, fully loaded."""
+
+    @abstractmethod
+    def summaries(self) -> Iterator[Tuple[str, int]]:
+        """``(id, balance)`` for every account, without loading history."""
+
+    @abstractmethod
+    def owned(self, owner: str) -> List[Tuple[str, int]]:
+        """``(id, balance)`` for every account of ``owner``, oldest first."""
+
+    @abstractmethod
+    def record(self, changes: Sequence[Change]) -> None:
+        """Persist already-applied changes as one atomic unit."""
+
+    def bulk_load(self, accounts: Sequence[Account], rows: Sequence[LedgerRow]) -> None:
+        """Store new ``accounts`` and persist already-applied ``rows`` as one unit (bulk import)."""
+        for account in accounts:
+            self.add(account)
+        self.record([(account, account.transactions.row(index)) for account, index in rows])
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryAccountRepository(AccountRepository):
+    """Accounts kept in a dict; nothing to persist."""
+
+    def __init__(self):
+        self._accounts: Dict[str, Account] = {}
+        self._owned: Dict[str, Dict[str, None]] = {}  # owner -> account ids (dict as ordered set)
+
+    def add(self, account: Account) -> None:
+        self._accounts[account.id] = account
+        if account.owner is not None:
+            self._owned.setdefault(account.owner, {})[account.id] = None
+
+    def get(self, account_id: str) -> Optional[Account]:
+        return self._accounts.get(account_id)
+
+    def __contains__(self, account_id: str) -> bool:
+        return account_id in self._accounts
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def all(self) -> Iterable[Account]:
+        return self._accounts.values()
+
+    def summaries(self) -> Iterator[Tuple[str, int]]:
+        return ((acc.id, acc.balance) for acc in self._accounts.values())
+
+    def owned(self, owner: str) -> List[Tuple[str, int]]:
+        accounts = self._accounts
+        # list() of a dict is one C call: safe against concurrent add()
+        return [(account_id, accounts[account_id].balance) for account_id in list(self._owned.get(owner, ()))]
+
+    def record(self, changes: Sequence[Change]) -> None:
+        pass
+
+    def bulk_load(self, accounts: Sequence[Account], rows: Sequence[LedgerRow]) -> None:
+        for account in accounts:
+            self.add(account)
+
+
+def build_repository(backend: str = "memory", database_url: str = "sqlite://") -> AccountRepository:
+    """Create the repository named by ``backend`` ("memory" or "sqlite")."""
+    if backend == "memory":
+        return InMemoryAccountRepository()
+    if backend == "sqlite":
+        from app.repositories.sqlite_repository import SqliteAccountRepository
+        return SqliteAccountRepository(database_url)
+    raise ValueError(f"Unknown account backend: {backend}")
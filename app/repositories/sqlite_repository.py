@@ -0,0 +1,163 @@
+# app/repositories/sqlite_repository.py
+"""
+SQLite account repository.
+
+Accounts are loaded on first access and then kept in an identity map, so
+AccountService mutates the same ``Account`` objects it would with the
+in-memory backend. Every change is written through to SQLite by a
+``BatchWriter``, which coalesces concurrent requests into shared commits.
+"""
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.db.batching import BatchWriter
+from app.db.sqlite import ConnectionPool, sqlite_path
+from app.exceptions import DuplicateAccountError
+from app.models.account import Account
+from app.models.ledger import TYPE_CODES, TYPE_NAMES, Ledger
+from app.models.transaction import to_epoch
+from app.repositories.account_repository import AccountRepository, Change, LedgerRow
+
+INSERT_ACCOUNT = "INSERT INTO accounts (id, balance, owner) VALUES (?, ?, ?)"
+UPDATE_BALANCE = "UPDATE accounts SET balance = ? WHERE id = ?"
+INSERT_TRANSACTION = (
+    "INSERT INTO transactions (account_id, amount, type, timestamp) VALUES (?, ?, ?, ?)"
+)
+SELECT_ACCOUNT = "SELECT balance, owner FROM accounts WHERE id = ?"
+SELECT_TRANSACTIONS = (
+    "SELECT amount, type, timestamp FROM transactions "
+    "WHERE account_id = ? ORDER BY timestamp, id"
+)
+SELECT_SUMMARIES = "SELECT id, balance FROM accounts ORDER BY rowid"
+SELECT_IDS = "SELECT id FROM accounts ORDER BY rowid"
+SELECT_OWNED = "SELECT id, balance FROM accounts WHERE owner = ? ORDER BY rowid"  # ix_accounts_owner
+COUNT_ACCOUNTS = "SELECT COUNT(*) FROM accounts"
+
+
+class SqliteAccountRepository(AccountRepository):
+    """Write-through SQLite storage with an in-process identity map."""
+
+    durable = True
+
+    def __init__(self, database_url: str = "sqlite://", pool_size: int = 8, max_batch: int = 512):
+        self._pool = ConnectionPool(sqlite_path(database_url), size=pool_size)
+        self._writer = BatchWriter(self._pool, max_batch=max_batch)
+        self._cache: Dict[str, Account] = {}
+        self._cache_lock = threading.Lock()
+
+    @property
+    def commits(self) -> int:
+        return self._writer.commits
+
+    def add(self, account: Account) -> None:
+        values = (account.id, account.balance, account.owner)
+
+        def work(conn: sqlite3.Connection) -> None:
+            conn.execute(INSERT_ACCOUNT, values)
+
+        try:
+            self._writer.submit(work)
+        except sqlite3.IntegrityError:
+            raise DuplicateAccountError(f"Account {account.id} already exists")
+        with self._cache_lock:
+            self._cache[account.id] = account
+
+    def get(self, account_id: str) -> Optional[Account]:
+        account = self._cache.get(account_id)
+        if account is not None:
+            return account
+        account = self._load(account_id)
+        if account is None:
+            return None
+        with self._cache_lock:
+            # Another thread may have loaded it meanwhile: keep a single object
+            return self._cache.setdefault(account_id, account)
+
+    def __contains__(self, account_id: str) -> bool:
+        if account_id in self._cache:
+            return True
+        with self._pool.connection() as conn:
+            return conn.execute(SELECT_ACCOUNT, (account_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute(COUNT_ACCOUNTS).fetchone()[0]
+
+    def all(self) -> Iterable[Account]:
+        with self._pool.connection() as conn:
+            ids = [row[0] for row in conn.execute(SELECT_IDS)]
+        return [self.get(account_id) for account_id in ids]
+
+    def summaries(self) -> Iterator[Tuple[str, int]]:
+        with self._pool.connection() as conn:
+            rows = conn.execute(SELECT_SUMMARIES).fetchall()
+        return iter(rows)
+
+    def owned(self, owner: str) -> List[Tuple[str, int]]:
+        with self._pool.connection() as conn:
+            return conn.execute(SELECT_OWNED, (owner,)).fetchall()
+
+    def record(self, changes: Sequence[Change]) -> None:
+        # Capture values now: the objects may change again before the batch runs
+        rows: List[Tuple] = [
+            (acc.id, acc.balance, tx.amount, tx.type, to_epoch(tx.timestamp))
+            for acc, tx in changes
+        ]
+
+        def work(conn: sqlite3.Connection) -> None:
+            for account_id, balance, amount, type_, ts in rows:
+                conn.execute(INSERT_TRANSACTION, (account_id, amount, type_, ts))
+                conn.execute(UPDATE_BALANCE, (balance, account_id))
+
+        try:
+            self._writer.submit(work)
+        except Exception:
+            # Memory is ahead of the database now; reload on next access
+            with self._cache_lock:
+                for acc, _ in changes:
+                    self._cache.pop(acc.id, None)
+            raise
+
+    def bulk_load(self, accounts: Sequence[Account], rows: Sequence[LedgerRow]) -> None:
+        # One commit with executemany, instead of a round trip per row
+        new_accounts = [(acc.id, acc.balance, acc.owner) for acc in accounts]
+        transactions = []
+        for acc, i in rows:
+            amount, type_code, ts = acc.transactions.raw(i)
+            transactions.append((acc.id, amount, TYPE_NAMES[type_code], ts))
+        balances = {acc.id: acc.balance for acc, _ in rows}
+        for account_id, _, _ in new_accounts:
+            balances.pop(account_id, None)
+
+        def work(conn: sqlite3.Connection) -> None:
+            conn.executemany(INSERT_ACCOUNT, new_accounts)
+            conn.executemany(INSERT_TRANSACTION, transactions)
+            conn.executemany(UPDATE_BALANCE, [(balance, account_id) for account_id, balance in balances.items()])
+
+        try:
+            self._writer.submit(work)
+        except Exception:
+            # As in record(): drop what memory has ahead of the database
+            with self._cache_lock:
+                for acc, _ in rows:
+                    self._cache.pop(acc.id, None)
+            raise
+        with self._cache_lock:
+            for account in accounts:
+                self._cache[account.id] = account
+
+    def close(self) -> None:
+        self._writer.close()
+        self._pool.close()
+
+    def _load(self, account_id: str) -> Optional[Account]:
+        with self._pool.connection() as conn:
+            row = conn.execute(SELECT_ACCOUNT, (account_id,)).fetchone()
+            if row is None:
+                return None
+            ledger = Ledger()
+            for amount, type_, ts in conn.execute(SELECT_TRANSACTIONS, (account_id,)):
+                ledger.record(amount, TYPE_CODES[type_], ts)
+        return Account(id=account_id, balance=row[0], transactions=ledger, owner=row[1])
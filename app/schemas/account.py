@@ -1,25 +1,121 @@
 # app/schemas/account.py
-from pydantic import BaseModel, Field, PositiveFloat, field_validator
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing_extensions import TypedDict
+
+from app.models.account import ACCOUNT_ID_MAX_LENGTH, ACCOUNT_ID_MIN_LENGTH, check_account_id
+from app.schemas.money import MajorUnits, MinorUnits
 
 class AccountCreate(BaseModel):
-    id: str = Field(..., min_length=3, max_length=20, description="Unique account identifier")
-    initial_balance: float = Field(0.0, ge=0.0, description="Initial balance >= 0")
+    id: str = Field(
+        ..., min_length=ACCOUNT_ID_MIN_LENGTH, max_length=ACCOUNT_ID_MAX_LENGTH, description="Unique account identifier"
+    )
+    initial_balance: MinorUnits = Field(0, ge=0, description="Initial balance >= 0")
 
     @field_validator("id")
     def id_alphanumeric(cls, v):
-        if not v.isalnum():
-            raise ValueError("Account ID must be alphanumeric")
-        return v
+        return check_account_id(v)
 
 
 class DepositRequest(BaseModel):
-    amount: PositiveFloat = Field(..., gt=0.0, description="Amount must be positive")
+    amount: MinorUnits = Field(..., gt=0, description="Amount must be positive")
 
 
 class WithdrawRequest(BaseModel):
-    amount: PositiveFloat = Field(..., gt=0.0)
+    amount: MinorUnits = Field(..., gt=0)
 
 
 class TransferRequest(BaseModel):
     to_account_id: str = Field(..., min_length=3)
-    amount: PositiveFloat = Field(..., gt=0.0)
\ No newline at end of file
+    amount: MinorUnits = Field(..., gt=0)
+
+
+class BatchItem(BaseModel):
+    op: Literal["deposit", "withdraw", "transfer"]
+    account_id: str = Field(..., min_length=3)
+    amount: MinorUnits = Field(..., gt=0)
+    to_account_id: Optional[str] = Field(None, min_length=3, description="Required for transfers")
+
+    @model_validator(mode="after")
+    def transfer_needs_target(self):
+        if self.op == "transfer" and not self.to_account_id:
+            raise ValueError("to_account_id is required for transfers")
+        return self
+
+
+class BatchRequest(BaseModel):
+    mode: Literal["atomic", "best_effort"] = Field(
+        "best_effort", description="atomic: all or nothing; best_effort: apply what can be applied"
+    )
+    operations: List[BatchItem] = Field(..., min_length=1, max_length=100_000)
+
+
+# Responses are TypedDicts: endpoints build plain dicts (money in minor
+# units) and app.api.responses serializes them with the precompiled
+# pydantic-core schema, without constructing or re-validating models.
+class AccountOut(TypedDict):
+    id: str
+    balance: MajorUnits
+
+
+class TransactionOut(TypedDict):
+    amount: MajorUnits
+    type: str
+    timestamp: datetime
+
+
+class AccountDetail(TypedDict):
+    id: str
+    balance: MajorUnits
+    transactions: List[TransactionOut]
+    next_cursor: Optional[str]
+
+
+class TransactionQueryOut(TypedDict):
+    id: str
+    count: int
+    transactions: List[TransactionOut]
+
+
+class BalanceOut(TypedDict):
+    # Already in major units: stored as rendered for Idempotency-Key replays
+    balance: float
+
+
+class BalanceAtOut(TypedDict):
+    id: str
+    balance: MajorUnits
+    at: Optional[str]
+
+
+class TransferOut(TypedDict):
+    message: str
+
+
+class ImportErrorOut(TypedDict):
+    line: int
+    error: str
+
+
+class ImportOut(TypedDict):
+    lines: int
+    accounts: int
+    transactions: int
+    rejected: int
+    errors: List[ImportErrorOut]
+
+
+class BatchItemResult(TypedDict):
+    index: int
+    ok: bool
+    balance: Optional[MajorUnits]
+    error: Optional[str]
+
+
+class BatchResponse(TypedDict):
+    mode: str
+    applied: int
+    failed: int
+    results: List[BatchItemResult]
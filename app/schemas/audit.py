@@ -0,0 +1,28 @@
+# app/schemas/audit.py
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.money import MajorUnits
+
+
+class DriftOut(BaseModel):
+    kind: str
+    account_id: Optional[str] = None
+    detail: str
+    expected: Optional[MajorUnits] = None
+    actual: Optional[MajorUnits] = None
+    detected_at: datetime
+
+
+class AuditOut(BaseModel):
+    full: bool
+    accounts: int
+    rows: int
+    issued: MajorUnits
+    balances: MajorUnits
+    seconds: float
+    finished_at: datetime
+    drifts: List[DriftOut]
+    drifting: List[DriftOut]
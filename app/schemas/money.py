@@ -0,0 +1,23 @@
+# app/schemas/money.py
+"""
+Money at the JSON boundary.
+
+Clients send and receive amounts in major units (``12.34``); models and
+the service work in int minor units (``1234``). ``MinorUnits`` parses a
+request value into minor units, rejecting more decimals than the
+currency scale; ``MajorUnits`` renders minor units back as a number.
+"""
+
+from typing import Annotated
+
+from pydantic import BeforeValidator, PlainSerializer, WithJsonSchema
+
+from app.models.money import to_major, to_minor
+
+MinorUnits = Annotated[
+    int,
+    BeforeValidator(to_minor),
+    WithJsonSchema({"type": "number", "description": "Amount in major currency units"}),
+]
+
+MajorUnits = Annotated[float, PlainSerializer(to_major, return_type=float)]
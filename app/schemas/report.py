@@ -0,0 +1,40 @@
+# app/schemas/report.py
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.money import MajorUnits
+
+
+class FlowBucketOut(BaseModel):
+    start: datetime
+    inflow: MajorUnits
+    outflow: MajorUnits
+    net: MajorUnits
+    count: int
+
+
+class MovementOut(BaseModel):
+    account_id: str
+    amount: MajorUnits
+    type: str
+    timestamp: datetime
+
+
+class StatementResponse(BaseModel):
+    account_id: Optional[str] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    accounts: int
+    count: int
+    total_in: MajorUnits
+    total_out: MajorUnits
+    net_flow: MajorUnits
+    opening_balance: MajorUnits
+    closing_balance: MajorUnits
+    min_balance: MajorUnits
+    max_balance: MajorUnits
+    average_balance: MajorUnits
+    flows: List[FlowBucketOut]
+    top_movements: List[MovementOut]
@@ -0,0 +1,30 @@
+# app/schemas/schedule.py
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+from typing_extensions import TypedDict
+
+from app.schemas.money import MajorUnits, MinorUnits
+
+
+class ScheduleCreate(BaseModel):
+    to_account_id: str = Field(..., min_length=3)
+    amount: MinorUnits = Field(..., gt=0)
+    start_at: Optional[datetime] = Field(None, description="First run (default: now); naive times are UTC")
+    every_seconds: Optional[float] = Field(None, ge=1, description="Repeat interval; omit for a one-off transfer")
+    count: Optional[int] = Field(None, ge=1, description="Runs in total (default: until cancelled)")
+
+
+class ScheduleOut(TypedDict):
+    id: str
+    from_account_id: str
+    to_account_id: str
+    amount: MajorUnits
+    next_run: Optional[datetime]  # null once finished
+    every_seconds: Optional[float]
+    remaining: Optional[int]
+    runs: int
+    failures: int
+    last_run: Optional[datetime]
+    last_error: Optional[str]
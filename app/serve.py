@@ -0,0 +1,80 @@
+# app/serve.py
+"""
+Run the API as several sharded worker processes on one port.
+
+``uvicorn --workers N`` would give every process its own, diverging copy
+of the accounts. This launcher instead binds the socket once and starts N
+uvicorn processes on it, each told its shard (``SHARD_ID``/``SHARD_COUNT``)
+so it owns a slice of the accounts and forwards requests for the others
+(see ``app/services/sharding.py``). The kernel spreads connections over
+the workers; any worker can serve any request.
+
+Usage:
+    python -m app.serve --workers 4 --port 8000
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+from typing import List, Tuple
+
+
+def run_worker(shard_id: int, shards: int, sock: socket.socket, log_level: str) -> None:
+    # Settings are read when app.main is first imported, i.e. after this
+    os.environ["SHARD_ID"] = str(shard_id)
+    os.environ["SHARD_COUNT"] = str(shards)
+    import uvicorn
+
+    config = uvicorn.Config("app.main:app", log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def start_workers(
+    workers: int, host: str = "127.0.0.1", port: int = 8000, log_level: str = "warning"
+) -> Tuple[socket.socket, List[multiprocessing.Process]]:
+    """Bind ``host:port`` and start ``workers`` shard processes serving it."""
+    import uvicorn
+
+    sock = uvicorn.Config("app.main:app", host=host, port=port).bind_socket()
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(i, workers, sock, log_level), name=f"shard-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    return sock, processes
+
+
+def stop_workers(processes: List[multiprocessing.Process], timeout: float = 10.0) -> None:
+    for process in processes:
+        if process.is_alive():
+            process.terminate()  # SIGTERM: uvicorn shuts down gracefully
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="shard processes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    sock, processes = start_workers(args.workers, args.host, args.port, args.log_level)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_workers(processes)
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# app/services/audit.py
+"""
+Incremental audit of the ledger invariants.
+
+Two things must hold at all times:
+
+  * per account, the balance equals its opening balance plus the net flow
+    (deposits minus withdrawals) of its ledger rows;
+  * transfers conserve money: the sum of all balances equals the money
+    that entered the system (opening balances and deposits) minus the
+    money that left it (withdrawals).
+
+Recomputing either from the whole history is too expensive to do often,
+so the ``Auditor`` keeps, per account, a watermark (rows verified so
+far), their net flow, the balance at the watermark and running CRC-32
+checksums of the three columns. A run only reads the rows appended since
+the previous one, for the accounts that changed since then, i.e. it costs
+O(new transactions).
+
+Which accounts changed, and how much money was issued, comes from an
+``AuditFeed`` the service fills from the changes it journals
+(``AccountService.attach_audit``), independently of the balances it
+updates. A run takes a consistent cut of the feed and of the changed
+balances with every stripe held, then reads the new rows account by
+account with only that account's stripe held.
+
+Opening balances are not ledger rows, so the first sight of an account
+(at attach time, or its creation) is its baseline. A drift is reported
+once and becomes the new baseline; ``drifting`` keeps every drift found
+since the last full run. A full run (``run(full=True)``) rereads every
+row, compares the prefix with the running checksums and replaces the
+outstanding list with what it finds.
+"""
+
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from itertools import compress
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.metrics import REGISTRY
+from app.models.ledger import ColumnSet
+
+AUDITED_ROWS = REGISTRY.counter("ledger_audit_rows_total", "Ledger rows verified by the auditor")
+AUDITS = REGISTRY.counter("ledger_audits_total", "Audit runs by outcome", ("outcome",))
+DRIFTS = REGISTRY.counter("ledger_audit_drifts_total", "Invariant violations found by the auditor", ("kind",))
+
+# Per-column running checksum of an empty ledger
+EMPTY_CHECKSUM = (0, 0, 0)
+
+
+class AuditFeed:
+    """Money issued and accounts touched by the changes the service applies."""
+
+    def __init__(self, issued: int = 0, touched: Set[str] = frozenset()):
+        self.issued = issued
+        self._touched = set(touched)
+        self._lock = threading.Lock()
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        """Account for one journal event (see ``AccountService._log``)."""
+        with self._lock:
+            self._observe(event)
+
+    def _observe(self, event: Dict[str, Any]) -> None:
+        op = event["op"]
+        if op == "batch":
+            for sub_event in event["events"]:
+                self._observe(sub_event)
+        elif op == "transfer":
+            self._touched.add(event["from"])
+            self._touched.add(event["to"])
+        else:
+            self._touched.add(event["account"])
+            if op == "create":
+                self.issued += event["balance"]
+            elif op == "deposit":
+                self.issued += event["amount"]
+            else:
+                self.issued -= event["amount"]
+
+    def drain(self) -> Set[str]:
+        """The accounts touched since the previous drain."""
+        with self._lock:
+            touched, self._touched = self._touched, set()
+        return touched
+
+
+@dataclass
+class AccountAudit:
+    """What the auditor has verified of one account."""
+    opening: int   # balance before the first row
+    rows: int      # watermark: rows [0, rows) are verified
+    net: int       # their net flow
+    balance: int   # balance at the watermark
+    checksum: Tuple[int, int, int] = EMPTY_CHECKSUM  # CRC-32 of each column over those rows
+
+
+@dataclass(frozen=True)
+class Drift:
+    """One invariant violation."""
+    kind: str                  # "balance", "history" or "conservation"
+    account_id: Optional[str]  # None for conservation
+    detail: str
+    expected: Optional[int] = None  # minor units, when the violation is an amount
+    actual: Optional[int] = None
+    detected_at: float = 0.0
+
+
+@dataclass
+class AuditReport:
+    full: bool = False
+    accounts: int = 0   # accounts checked
+    rows: int = 0       # rows read
+    issued: int = 0     # money issued since the auditor attached
+    balances: int = 0   # sum of all balances at the cut
+    seconds: float = 0.0
+    finished_at: float = 0.0
+    drifts: List[Drift] = field(default_factory=list)    # found by this run
+    drifting: List[Drift] = field(default_factory=list)  # outstanding, oldest first
+
+
+def extend_checksum(checksum: Tuple[int, int, int], columns: ColumnSet) -> Tuple[int, int, int]:
+    """Running checksums after appending ``columns`` (split anywhere, same result)."""
+    return tuple(zlib.crc32(column, crc) for crc, column in zip(checksum, columns))
+
+
+def _net(columns: ColumnSet) -> int:
+    amounts, types, _ = columns
+    return sum(amounts) - 2 * sum(compress(amounts, types))  # types: 1 = withdraw
+
+
+class Auditor:
+    """Verifies ``service``'s invariants incrementally, now and then on a daemon thread."""
+
+    def __init__(self, service, interval: float = 60.0):
+        if interval < 0:
+            raise ValueError("interval must be >= 0 (0: no background runs)")
+        self.service = service
+        self.interval = interval
+        self.feed: AuditFeed = service.attach_audit()
+        self.accounts: Dict[str, AccountAudit] = {}
+        self.drifting: List[Drift] = []
+        self.last: Optional[AuditReport] = None
+        self.last_error: Optional[BaseException] = None  # of the background thread
+        self._balances = 0  # sum of the audited balances
+        self._gap = 0       # accepted difference between balances and issued money
+        self._lock = threading.Lock()  # one run at a time
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self, full: bool = False) -> AuditReport:
+        """Audit what changed since the previous run (``full``: everything) on the calling thread."""
+        with self._lock:
+            started = time.perf_counter()
+            now = time.time()
+            issued, cut = self.service.audit_cut(self.feed, everything=full)
+            report = AuditReport(full=full, accounts=len(cut), issued=issued)
+            for account_id, (balance, size) in cut.items():
+                report.rows += self._verify(account_id, balance, size, full, report.drifts, now)
+
+            gap = self._balances - issued
+            if gap != (0 if full else self._gap):
+                report.drifts.append(Drift(
+                    "conservation", None, "sum of balances differs from the money deposited minus withdrawn",
+                    issued + (0 if full else self._gap), self._balances, now,
+                ))
+            self._gap = gap
+
+            AUDITS.inc("drift" if report.drifts else "clean")
+            for drift in report.drifts:
+                DRIFTS.inc(drift.kind)
+            self.drifting = report.drifts[:] if full else self.drifting + report.drifts
+            report.balances = self._balances
+            report.drifting = list(self.drifting)
+            report.seconds = time.perf_counter() - started
+            report.finished_at = time.time()
+            AUDITED_ROWS.inc(amount=report.rows)
+            self.last = report
+            return report
+
+    def _verify(self, account_id: str, balance: int, size: int, full: bool, drifts: List[Drift], now: float) -> int:
+        state = self.accounts.get(account_id)
+        previous = 0 if state is None else state.balance
+        if state is not None and size < state.rows:
+            drifts.append(Drift("history", account_id, f"ledger shrank from {state.rows} to {size} rows", detected_at=now))
+            state = None
+        start = 0 if state is None or full else state.rows
+        total, columns = self.service.audit_rows(account_id, start)
+        if len(columns[0]) > size - start:
+            # Rows appended after the cut: they belong to the next run
+            total -= _net(tuple(column[size - start:] for column in columns))
+            columns = tuple(column[:size - start] for column in columns)
+
+        new_net = _net(columns)
+        if state is None:
+            state = AccountAudit(balance - new_net, size, new_net, balance, extend_checksum(EMPTY_CHECKSUM, columns))
+        else:
+            if full:
+                head = tuple(column[:state.rows] for column in columns)
+                head_net = _net(head)
+                if head_net != state.net:
+                    drifts.append(Drift(
+                        "history", account_id, f"net flow of the first {state.rows} rows changed",
+                        state.net, head_net, now,
+                    ))
+                elif extend_checksum(EMPTY_CHECKSUM, head) != state.checksum:
+                    drifts.append(Drift("history", account_id, f"rows before {state.rows} were rewritten", detected_at=now))
+                net = new_net
+                checksum = extend_checksum(EMPTY_CHECKSUM, columns)
+            else:
+                if total - new_net != state.net:
+                    # The checkpoints or cold-tier totals disagree with the rows already verified
+                    drifts.append(Drift(
+                        "history", account_id, f"net flow of the first {state.rows} rows changed",
+                        state.net, total - new_net, now,
+                    ))
+                net = state.net + new_net
+                checksum = extend_checksum(state.checksum, columns)
+            opening = state.opening
+            if opening + net != balance:
+                drifts.append(Drift(
+                    "balance", account_id, "balance differs from opening balance plus ledger net flow",
+                    opening + net, balance, now,
+                ))
+                opening = balance - net
+            state = AccountAudit(opening, size, net, balance, checksum)
+
+        self.accounts[account_id] = state
+        self._balances += balance - previous
+        return len(columns[0])
+
+    def start(self) -> None:
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="ledger-auditor", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the thread, waiting for a running audit to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run()
+            except Exception as e:
+                self.last_error = e
+                AUDITS.inc("error")
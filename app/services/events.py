@@ -0,0 +1,259 @@
+# app/services/events.py
+"""
+In-process bus of transaction events for push subscribers (WebSocket/SSE).
+
+``AccountService`` publishes one ``TransactionEvent`` per ledger row it
+records (deposits, withdrawals, both legs of transfers, batch items),
+numbered by a process-wide sequence. The bus keeps the last ``retain``
+events so a subscriber that reconnects with the last sequence it saw
+resumes without a gap; if the events it missed were already evicted it
+is told so (``missed``) and should re-read state over REST.
+
+Sequence numbers are unique to one bus: they count up from the bus's
+start time in microseconds (so a restarted process never hands out the
+numbers of the previous one), in steps of ``stride`` from ``offset`` (so
+the buses of several workers never share one). A resume from a number
+this bus did not hand out is a gap too.
+
+Publishing happens on the threads running service calls, with account
+stripes held, so it only appends to bounded per-subscriber queues and
+wakes the subscriber's event loop when its queue goes from empty to
+non-empty. A subscriber whose queue exceeds ``queue_size`` is a slow
+consumer; depending on ``policy`` it is either disconnected (it can
+resume from its last sequence) or has its oldest queued events dropped
+and counted.
+
+Each worker process has its own bus: in a sharded deployment a subscriber
+sees the accounts owned by the worker it is connected to.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from app.core.metrics import REGISTRY
+
+SLOW_CONSUMER_POLICIES = ("disconnect", "drop")
+
+DROPPED = REGISTRY.counter("event_subscriber_dropped_total", "Events dropped from slow subscribers' queues")
+DISCONNECTED = REGISTRY.counter("event_subscriber_disconnects_total", "Slow subscribers disconnected")
+
+
+class TransactionEvent(NamedTuple):
+    """One recorded ledger row; money in minor units, ``timestamp`` in POSIX seconds."""
+    seq: int
+    account_id: str
+    type: str  # "deposit" or "withdraw"
+    amount: int
+    balance: int  # balance of ``account_id`` right after this row
+    timestamp: float
+    counterparty: Optional[str] = None  # other account of a transfer
+
+
+# (account_id, type, amount, balance, timestamp, counterparty)
+EventData = Tuple[str, str, int, int, float, Optional[str]]
+
+
+class Subscription:
+    """Queue of events for one subscriber, drained from its event loop."""
+
+    def __init__(
+        self,
+        bus: "EventBus",
+        account_id: Optional[str],
+        queue_size: int,
+        policy: str,
+        loop: asyncio.AbstractEventLoop,
+    ):
+        self.account_id = account_id
+        self.queue_size = queue_size
+        self.policy = policy
+        self.missed: Optional[int] = None  # first retained seq (0: none) when events were missed
+        self.overflowed = False
+        self.closed = False
+        self.last_seq = 0  # last seq handed to the subscriber
+        self._bus = bus
+        self._loop = loop
+        self._events: Deque[TransactionEvent] = deque()
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def offer(self, events: Sequence[TransactionEvent]) -> None:
+        """Queue ``events`` (any thread); applies the slow-consumer policy."""
+        with self._lock:
+            if self.closed or self.overflowed:
+                return
+            wake = not self._events
+            self._events.extend(events)
+            excess = len(self._events) - self.queue_size
+            if excess > 0:
+                if self.policy == "drop":
+                    for _ in range(excess):
+                        self._events.popleft()
+                    self._dropped += excess
+                    DROPPED.inc(amount=excess)
+                else:
+                    self.overflowed = True
+                    self._events.clear()
+                    wake = True
+        if wake:
+            self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # the subscriber's loop is gone
+
+    async def next_batch(self, timeout: Optional[float] = None) -> Tuple[List[TransactionEvent], int]:
+        """
+        Wait up to ``timeout`` seconds for events; return them with the
+        number dropped since the last call. Returns ([], 0) on timeout,
+        on overflow and once closed (check ``overflowed``/``closed``).
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return [], 0
+        with self._lock:
+            self._ready.clear()
+            batch = list(self._events)
+            self._events.clear()
+            dropped, self._dropped = self._dropped, 0
+        if batch:
+            self.last_seq = batch[-1].seq
+        return batch, dropped
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            self._events.clear()
+        self._bus._unsubscribe(self)
+        self._wake()
+
+
+class EventBus:
+    """Publishes ``TransactionEvent``s to per-account and all-account subscribers."""
+
+    def __init__(
+        self,
+        retain: int = 50_000,
+        queue_size: int = 1_000,
+        policy: str = "disconnect",
+        stride: int = 1,
+        offset: int = 0,
+        start: Optional[int] = None,
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"policy must be one of {SLOW_CONSUMER_POLICIES}")
+        if not 0 <= offset < stride:
+            raise ValueError("offset must be in [0, stride)")
+        self.queue_size = queue_size
+        self.policy = policy
+        if start is None:
+            start = int(time.time() * 1e6)  # below 2**53 (exact in JSON clients) until the 2250s
+        self._step = stride
+        self._first = start - start % stride + offset  # "nothing seen yet"; events follow in steps
+        self._seq = self._first
+        self._history: Deque[TransactionEvent] = deque(maxlen=retain)
+        self._by_account: Dict[str, Set[Subscription]] = {}
+        self._everything: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, items: Sequence[EventData]) -> List[TransactionEvent]:
+        """
+        Number, retain and fan out events; returns them. Queues are fed
+        under the bus lock so every subscriber sees sequence order.
+        """
+        with self._lock:
+            events = []
+            for account_id, type_, amount, balance, timestamp, counterparty in items:
+                self._seq += self._step
+                events.append(TransactionEvent(self._seq, account_id, type_, amount, balance, timestamp, counterparty))
+            self._history.extend(events)
+            if not self._everything and not self._by_account:
+                return events
+            targets: Dict[Subscription, List[TransactionEvent]] = {}
+            for subscriber in self._everything:
+                targets[subscriber] = events
+            for event in events:
+                for subscriber in self._by_account.get(event.account_id, ()):
+                    targets.setdefault(subscriber, []).append(event)
+            for subscriber, matching in targets.items():
+                subscriber.offer(matching)
+                if subscriber.overflowed:
+                    DISCONNECTED.inc()
+                    self._remove(subscriber)
+        return events
+
+    def subscribe(
+        self,
+        account_id: Optional[str] = None,
+        since: Optional[int] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> Subscription:
+        """
+        Subscribe to one account (or all when None) from the running event
+        loop. With ``since``, retained events after that sequence number
+        are queued first; registration and replay happen under the bus
+        lock, so nothing is missed or repeated between them. A ``since``
+        this bus did not hand out (another worker's, or from before a
+        restart) is reported as ``missed`` and every retained event is
+        replayed.
+        """
+        subscription = Subscription(
+            self, account_id, self.queue_size, self.policy, loop or asyncio.get_running_loop()
+        )
+        with self._lock:
+            if since is not None and not self._handed_out(since):
+                subscription.missed = self._history[0].seq if self._history else 0
+                since = self._first
+            if since is not None and since < self._seq:
+                if self._history and self._history[0].seq > since + self._step:
+                    subscription.missed = self._history[0].seq
+                backlog = [
+                    e for e in self._history if e.seq > since and (account_id is None or e.account_id == account_id)
+                ]
+                if backlog:
+                    subscription._events.extend(backlog)
+                    subscription._ready.set()
+            subscription.last_seq = self._seq if since is None else since
+            if account_id is None:
+                self._everything.add(subscription)
+            else:
+                self._by_account.setdefault(account_id, set()).add(subscription)
+        return subscription
+
+    def _handed_out(self, seq: int) -> bool:
+        # Called with the bus lock held; the start counts ("nothing seen yet")
+        return self._first <= seq <= self._seq and (seq - self._first) % self._step == 0
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._remove(subscription)
+
+    def _remove(self, subscription: Subscription) -> None:
+        # Called with the bus lock held
+        self._everything.discard(subscription)
+        subscribers = self._by_account.get(subscription.account_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._by_account[subscription.account_id]
+
+    def subscribers(self) -> int:
+        return len(self._everything) + sum(len(s) for s in self._by_account.values())
+
+    def close(self) -> None:
+        """End every subscription (e.g. at shutdown)."""
+        with self._lock:
+            subscriptions = list(self._everything) + [s for subs in self._by_account.values() for s in subs]
+        for subscription in subscriptions:
+            subscription.close()
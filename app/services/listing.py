@@ -0,0 +1,53 @@
+# app/services/listing.py
+"""
+Version-stamped snapshot of the account list for ``GET /accounts``.
+
+``AccountService`` bumps ``accounts_version()`` on every creation and
+balance change. ``AccountListing`` keeps the last ``list_all_accounts()``
+result together with its serialized body and ETag, labelled with the
+version read *before* the list was taken: while the version is unchanged
+every request is served from the snapshot, and the first request after a
+mutation rebuilds it (one rebuild at a time; concurrent requests wait for
+it and share it).
+
+A snapshot may already include changes newer than its label, never miss
+older ones, so it is never stale; it is only rebuilt more often than
+strictly needed.
+"""
+
+import threading
+from typing import Any, Callable, List, NamedTuple, Optional
+
+
+class ListingSnapshot(NamedTuple):
+    version: Any
+    accounts: List[dict]  # {"id", "balance"} in repository order
+    body: bytes           # serialized ``accounts``
+    etag: str
+
+
+class AccountListing:
+    """Serves ``list_all_accounts`` from a snapshot invalidated by mutations."""
+
+    def __init__(self, service: Any, serialize: Callable[[List[dict]], bytes], tag: Callable[[bytes], str]):
+        self._service = service
+        self._serialize = serialize
+        self._tag = tag
+        self._snapshot: Optional[ListingSnapshot] = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def snapshot(self) -> ListingSnapshot:
+        current = self._snapshot
+        if current is not None and current.version == self._service.accounts_version():
+            return current
+        with self._lock:
+            version = self._service.accounts_version()
+            current = self._snapshot
+            if current is not None and current.version == version:
+                return current  # rebuilt by the request we waited for
+            accounts = self._service.list_all_accounts()
+            body = self._serialize(accounts)
+            self._snapshot = current = ListingSnapshot(version, accounts, body, self._tag(body))
+            self.rebuilds += 1
+        return current
@@ -0,0 +1,62 @@
+# app/services/locking.py
+"""
+Striped locks for per-account mutual exclusion.
+
+A fixed array of locks is shared by all accounts: an account ID hashes to
+one stripe. Operations touching several accounts acquire their stripes in
+ascending stripe order, so two transfers in opposite directions can never
+deadlock, and operations on accounts in different stripes run in parallel.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+
+class LockStripes:
+    """``stripes`` mutexes indexed by key hash."""
+
+    def __init__(self, stripes: int = 256):
+        if stripes < 1:
+            raise ValueError("Need at least one lock stripe")
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(stripes)]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def stripe(self, key: str) -> int:
+        return hash(key) % len(self._locks)
+
+    @contextmanager
+    def hold(self, *keys: str) -> Iterator[None]:
+        """Hold the stripes of all ``keys``, acquired in a global order."""
+        indexes = sorted({self.stripe(key) for key in keys})
+        self._acquire(indexes)
+        try:
+            yield
+        finally:
+            self._release(indexes)
+
+    @contextmanager
+    def hold_all(self) -> Iterator[None]:
+        """Hold every stripe: a consistent, quiescent view of all accounts."""
+        indexes = list(range(len(self._locks)))
+        self._acquire(indexes)
+        try:
+            yield
+        finally:
+            self._release(indexes)
+
+    def _acquire(self, indexes: List[int]) -> None:
+        acquired = []
+        try:
+            for i in indexes:
+                self._locks[i].acquire()
+                acquired.append(i)
+        except BaseException:
+            self._release(acquired)
+            raise
+
+    def _release(self, indexes: List[int]) -> None:
+        for i in reversed(indexes):
+            self._locks[i].release()
@@ -0,0 +1,32 @@
+# app/services/pagination.py
+"""
+Opaque cursors for paging through an account's transaction history.
+
+Ledgers are append-only, so a row's position never changes and a cursor
+only needs to remember where the next page starts and in which order it
+is read. Clients treat the string as opaque.
+"""
+
+import base64
+import binascii
+from typing import Tuple
+
+ORDERS = ("desc", "asc")
+
+
+def encode_cursor(position: int, order: str) -> str:
+    raw = f"{order}:{position}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """Return ``(position, order)``; raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        order, position = raw.split(":")
+        position = int(position)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if order not in ORDERS or position < 0:
+        raise ValueError("Invalid cursor")
+    return position, order
@@ -0,0 +1,225 @@
+# app/services/reporting.py
+"""
+Vectorized statements and portfolio reports.
+
+Aggregations run with NumPy over copies of the ledger columns instead of
+looping over ``Transaction`` rows. Amounts are int64 minor units, so every
+sum is exact:
+
+* totals in/out and net flow: masked sums;
+* flows per day/week/month: timestamps are floored to ``datetime64``
+  buckets and summed per bucket with ``np.add.at``;
+* balance min/max/average: the running balance is the opening balance
+  plus ``np.cumsum`` of the signed amounts; the average is time-weighted
+  (each balance counts for as long as it was held inside the window);
+* top-N movements: ``np.argpartition``, so only N rows are fully sorted.
+
+The opening balance is derived from the current balance minus the net of
+the whole history, since initial balances are not ledger rows. Likewise
+the portfolio timeline counts every account's initial balance from the
+start of time.
+
+Callers snapshot columns with ``columns_of`` while holding the account's
+lock; everything else works on the copies.
+"""
+
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.ledger import DEPOSIT, TYPE_NAMES, Ledger
+from app.models.report import REPORT_PERIODS, FlowBucket, Movement, Statement
+from app.models.transaction import from_epoch
+
+
+class Columns(NamedTuple):
+    """NumPy copies of one ledger's columns."""
+    amounts: np.ndarray      # int64 minor units
+    types: np.ndarray        # int8 type codes
+    timestamps: np.ndarray   # float64 POSIX seconds
+
+
+def columns_of(ledger: Ledger) -> Columns:
+    """
+    Copy the ledger's columns into NumPy arrays.
+
+    The ledger must not grow during the call (an ``array`` cannot be
+    resized while a buffer view of it exists); hold the account's lock.
+    Cold rows are decompressed and included.
+    """
+    if ledger.cold:
+        amounts, types, timestamps = ledger.columns()  # fresh copies already
+        return Columns(
+            np.frombuffer(amounts, dtype=np.int64),
+            np.frombuffer(types, dtype=np.int8),
+            np.frombuffer(timestamps, dtype=np.float64),
+        )
+    n = len(ledger)
+    return Columns(
+        np.frombuffer(ledger.amounts, dtype=np.int64, count=n).copy(),
+        np.frombuffer(ledger.types, dtype=np.int8, count=n).copy(),
+        np.frombuffer(ledger.timestamps, dtype=np.float64, count=n).copy(),
+    )
+
+
+def account_statement(
+    account_id: str,
+    balance: int,
+    columns: Columns,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    period: str = "day",
+    top: int = 10,
+) -> Statement:
+    """Statement of one account over ``[start, end]`` (POSIX seconds, inclusive)."""
+    owners = np.zeros(len(columns.amounts), dtype=np.int64)
+    return _statement(account_id, [account_id], [balance], columns, owners, start, end, period, top)
+
+
+def portfolio_summary(
+    accounts: Sequence[Tuple[str, int, Columns]],
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    period: str = "day",
+    top: int = 10,
+) -> Statement:
+    """Statement of all ``(account_id, balance, columns)`` taken together."""
+    ids = [account_id for account_id, _, _ in accounts]
+    balances = [balance for _, balance, _ in accounts]
+    parts = [cols for _, _, cols in accounts]
+    if parts:
+        columns = Columns(*(np.concatenate([getattr(c, name) for c in parts]) for name in Columns._fields))
+    else:
+        columns = Columns(np.empty(0, np.int64), np.empty(0, np.int8), np.empty(0, np.float64))
+    owners = np.repeat(np.arange(len(parts), dtype=np.int64), [len(c.amounts) for c in parts])
+    return _statement(None, ids, balances, columns, owners, start, end, period, top)
+
+
+def _statement(
+    account_id: Optional[str],
+    ids: List[str],
+    balances: List[int],
+    columns: Columns,
+    owners: np.ndarray,
+    start: Optional[float],
+    end: Optional[float],
+    period: str,
+    top: int,
+) -> Statement:
+    if period not in REPORT_PERIODS:
+        raise ValueError(f"period must be one of {REPORT_PERIODS}")
+    if top < 0:
+        raise ValueError("top must not be negative")
+    if start is not None and end is not None and start > end:
+        raise ValueError("start must not be after end")
+
+    amounts, types, timestamps = columns
+    if np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind="stable")
+        amounts, types, timestamps, owners = amounts[order], types[order], timestamps[order], owners[order]
+
+    deposits = types == DEPOSIT
+    signed = np.where(deposits, amounts, -amounts)
+    initial = sum(balances) - int(signed.sum())
+    running = initial + np.cumsum(signed)  # balance after each row
+
+    lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+    hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="right"))
+    hi = max(lo, hi)
+    window = slice(lo, hi)
+    w_amounts, w_deposits, w_timestamps = amounts[window], deposits[window], timestamps[window]
+
+    opening = int(running[lo - 1]) if lo > 0 else initial
+    closing = int(running[hi - 1]) if hi > 0 else initial
+    # Rows sharing a timestamp (e.g. both legs of a transfer) are one
+    # change: only the balance after the last of them was ever held
+    settled = np.append(w_timestamps[1:] != w_timestamps[:-1], True) if hi > lo else slice(0)
+    held = np.concatenate(([opening], running[window][settled]))
+    total_in = int(w_amounts[w_deposits].sum())
+    total_out = int(w_amounts[~w_deposits].sum())
+
+    return Statement(
+        account_id=account_id,
+        start=None if start is None else from_epoch(start),
+        end=None if end is None else from_epoch(end),
+        accounts=len(ids),
+        count=hi - lo,
+        total_in=total_in,
+        total_out=total_out,
+        net_flow=total_in - total_out,
+        opening_balance=opening,
+        closing_balance=closing,
+        min_balance=int(held.min()),
+        max_balance=int(held.max()),
+        average_balance=_time_weighted(held, w_timestamps[settled], start, end),
+        flows=_flows(w_amounts, w_deposits, w_timestamps, period),
+        top_movements=_top(ids, w_amounts, types[window], w_timestamps, owners[window], top),
+    )
+
+
+def _time_weighted(held: np.ndarray, timestamps: np.ndarray, start: Optional[float], end: Optional[float]) -> float:
+    """``held[0]`` until ``timestamps[0]``, ``held[i + 1]`` from ``timestamps[i]`` on."""
+    if len(timestamps) == 0 and (start is None or end is None):
+        return float(held[-1])
+    t0 = timestamps[0] if start is None else start
+    t1 = timestamps[-1] if end is None else end
+    durations = np.diff(np.concatenate(([t0], timestamps, [t1])))
+    total = t1 - t0
+    if total <= 0:
+        return float(held[-1])
+    return float(np.dot(held, durations) / total)
+
+
+def _buckets(timestamps: np.ndarray, period: str) -> np.ndarray:
+    """Start day (``datetime64[D]``, UTC) of each timestamp's period."""
+    days = np.floor(timestamps / 86_400).astype(np.int64).astype("datetime64[D]")
+    if period == "week":
+        # 1970-01-01 was a Thursday; weeks start on Monday
+        return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    if period == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    return days
+
+
+def _flows(amounts: np.ndarray, deposits: np.ndarray, timestamps: np.ndarray, period: str) -> List[FlowBucket]:
+    if len(amounts) == 0:
+        return []
+    keys, bucket = np.unique(_buckets(timestamps, period), return_inverse=True)
+    size = len(keys)
+    inflow = np.zeros(size, dtype=np.int64)
+    outflow = np.zeros(size, dtype=np.int64)
+    np.add.at(inflow, bucket[deposits], amounts[deposits])
+    np.add.at(outflow, bucket[~deposits], amounts[~deposits])
+    counts = np.bincount(bucket, minlength=size)
+    starts = keys.astype("datetime64[us]").tolist()
+    return [
+        FlowBucket(start=s, inflow=int(i), outflow=int(o), net=int(i - o), count=int(c))
+        for s, i, o, c in zip(starts, inflow, outflow, counts)
+    ]
+
+
+def _top(
+    ids: List[str],
+    amounts: np.ndarray,
+    types: np.ndarray,
+    timestamps: np.ndarray,
+    owners: np.ndarray,
+    n: int,
+) -> List[Movement]:
+    """The ``n`` largest amounts, largest first (earliest first on ties)."""
+    n = min(n, len(amounts))
+    if n == 0:
+        return []
+    rows = np.arange(len(amounts))
+    if n < len(amounts):
+        rows = np.argpartition(-amounts, n - 1)[:n]
+    rows = rows[np.lexsort((rows, -amounts[rows]))]
+    return [
+        Movement(
+            account_id=ids[owners[i]],
+            amount=int(amounts[i]),
+            type=TYPE_NAMES[types[i]],
+            timestamp=from_epoch(float(timestamps[i])),
+        )
+        for i in rows
+    ]
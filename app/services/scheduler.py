@@ -0,0 +1,353 @@
+# app/services/scheduler.py
+"""
+Scheduled and recurring transfers (standing orders).
+
+A ``TransferScheduler`` keeps pending schedules in a binary heap keyed by
+due time: creating one is an O(log n) push, and the dispatcher thread
+sleeps until the earliest is due. Whatever is due is popped in batches
+of up to ``max_batch`` and applied with one best-effort
+``AccountService.apply_batch`` (one lock pass, one journal event) per
+batch. Cancelling drops the schedule from the index and leaves its heap
+entry behind; stale entries are skipped when popped, and the heap is
+rebuilt once they outnumber the live ones.
+
+A run that fails (e.g. insufficient funds) is recorded on the schedule
+(``failures``, ``last_error``); a recurring schedule then waits for its
+next occurrence. Runs missed while the dispatcher was behind or the
+process was down fire once, not once per missed interval.
+
+With a ``directory`` schedules survive restarts: creations, cancellations
+and every schedule's advanced state are appended to a write-ahead log
+(``app.db.wal``), compacted to the live schedules now and then. A batch's
+new state is durable before its transfers are applied, so a crash in
+between skips those runs rather than repeating them (at most once). The
+outcome of a run reaches the log with the schedule's next logged state.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+from app.db.wal import WriteAheadLog
+from app.exceptions import ScheduleNotFoundError
+from app.models.batch import BatchOperation
+from app.models.schedule import Schedule
+
+SCHEDULED_RUNS = REGISTRY.counter("scheduled_transfers_total", "Scheduled transfer runs by outcome", ("outcome",))
+DISPATCH_LAG = REGISTRY.histogram(
+    "scheduled_transfer_lag_seconds", "Delay between a scheduled transfer's due time and its execution",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+MIN_INTERVAL = 1.0  # seconds between runs of a recurring schedule, at least
+
+# (due time, tie-breaker, schedule)
+Entry = Tuple[float, int, Schedule]
+
+
+class TransferScheduler:
+    """Pending transfers in a due-time heap, fired in batches by a daemon thread."""
+
+    def __init__(
+        self,
+        service,
+        directory: Optional[str] = None,
+        fsync: bool = True,
+        max_batch: int = 1_024,
+        keep_finished: int = 10_000,
+        compact_every: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be positive")
+        self.service = service
+        self.max_batch = max_batch
+        self.keep_finished = keep_finished    # recently finished schedules still answered by get()
+        self.compact_every = compact_every    # log events between compactions, at least
+        self._clock = clock
+        self._schedules: Dict[str, Schedule] = {}                # pending, by id
+        self._by_account: Dict[str, Dict[str, Schedule]] = {}    # pending, by source account
+        self._finished: "OrderedDict[str, Schedule]" = OrderedDict()
+        self._heap: List[Entry] = []
+        self._stale = 0  # heap entries of cancelled schedules
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[BaseException] = None  # of the dispatcher thread
+        self._log = WriteAheadLog(directory, fsync=fsync) if directory else None
+        self._logged = 0  # events in the log since it was last compacted
+        if self._log is not None:
+            self._recover()
+
+    # ─────────────────────────────────────────────────────────────
+    # Schedules
+    # ─────────────────────────────────────────────────────────────
+    def create(
+        self,
+        from_account_id: str,
+        to_account_id: str,
+        amount: int,
+        start: Optional[float] = None,
+        interval: Optional[float] = None,
+        count: Optional[int] = None,
+    ) -> Schedule:
+        """
+        Schedule a transfer at ``start`` (POSIX seconds, default now),
+        repeated every ``interval`` seconds ``count`` times in all (default:
+        until cancelled) if ``interval`` is given.
+
+        Raises:
+            AccountNotFoundError: If either account is missing
+            ValueError: On a bad amount, interval or count, or a transfer to the same account
+        """
+        if amount <= 0:
+            raise ValueError("Amount must be positive")
+        if from_account_id == to_account_id:
+            raise ValueError("Cannot transfer to the same account")
+        if interval is not None and interval < MIN_INTERVAL:
+            raise ValueError(f"Interval must be at least {MIN_INTERVAL:g} seconds")
+        if count is not None and (count < 1 or (interval is None and count != 1)):
+            raise ValueError("Count must be >= 1, and 1 for a one-off transfer")
+        self.service.get_account(from_account_id)
+        self.service.get_account(to_account_id)
+
+        schedule = Schedule(
+            id=uuid.uuid4().hex,
+            from_account_id=from_account_id,
+            to_account_id=to_account_id,
+            amount=amount,
+            next_run=self._clock() if start is None else start,
+            interval=interval,
+            remaining=count,
+        )
+        with self._lock:
+            self._add(schedule)
+            lsn = self._append_states((schedule,))
+            if self._heap[0][2] is schedule:
+                self._wakeup.notify()
+        self._commit(lsn)
+        return schedule
+
+    def get(self, schedule_id: str) -> Schedule:
+        """A pending or recently finished schedule."""
+        schedule = self._schedules.get(schedule_id) or self._finished.get(schedule_id)
+        if schedule is None:
+            raise ScheduleNotFoundError(f"Schedule {schedule_id} not found")
+        return schedule
+
+    def list(self, account_id: str) -> List[Schedule]:
+        """Pending schedules paying from ``account_id``, oldest first."""
+        with self._lock:
+            return list(self._by_account.get(account_id, {}).values())
+
+    def cancel(self, schedule_id: str) -> Schedule:
+        """
+        Stop a pending schedule. A run already being dispatched still completes.
+
+        Raises:
+            ScheduleNotFoundError: If it is not pending
+        """
+        with self._lock:
+            schedule = self._schedules.get(schedule_id)
+            if schedule is None:
+                raise ScheduleNotFoundError(f"Schedule {schedule_id} not found")
+            self._remove(schedule)
+            self._stale += 1
+            if self._stale > 1_024 and self._stale > len(self._heap) // 2:
+                self._heap = [entry for entry in self._heap if self._live(entry)]
+                heapq.heapify(self._heap)
+                self._stale = 0
+            lsn = self._append({"op": "cancel", "id": schedule_id})
+        self._commit(lsn)
+        return schedule
+
+    def pending(self) -> int:
+        return len(self._schedules)
+
+    def next_due(self) -> Optional[float]:
+        """Due time of the earliest pending schedule (a cancelled one may still show)."""
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    # ─────────────────────────────────────────────────────────────
+    # Dispatch
+    # ─────────────────────────────────────────────────────────────
+    def run_due(self, now: Optional[float] = None) -> int:
+        """Apply every transfer due by ``now`` (default: the clock), in batches. Returns how many ran."""
+        now = self._clock() if now is None else now
+        fired = 0
+        while True:
+            with self._lock:
+                batch = self._take_due(now)
+                lsn = self._append_states(schedule for schedule, _ in batch)
+            if not batch:
+                return fired
+            self._commit(lsn)
+            operations = [
+                BatchOperation("transfer", schedule.from_account_id, schedule.amount, schedule.to_account_id)
+                for schedule, _ in batch
+            ]
+            try:
+                errors = [result.error for result in self.service.apply_batch(operations)]
+            except Exception as e:
+                errors = [str(e) or type(e).__name__] * len(batch)
+            executed = self._clock()
+            with self._lock:
+                for (schedule, due), error in zip(batch, errors):
+                    schedule.last_error = error
+                    if error is not None:
+                        schedule.failures += 1
+                    DISPATCH_LAG.observe(max(executed - due, 0.0))
+            failed = sum(1 for error in errors if error is not None)
+            SCHEDULED_RUNS.inc("ok", amount=len(batch) - failed)
+            if failed:
+                SCHEDULED_RUNS.inc("error", amount=failed)
+            fired += len(batch)
+            if len(batch) < self.max_batch:
+                return fired
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="transfer-scheduler", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the dispatcher, waiting for a running batch to finish, and close the log."""
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._log is not None:
+            self._log.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._stopping:
+                    delay = self._heap[0][0] - self._clock() if self._heap else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._wakeup.wait(delay)
+                if self._stopping:
+                    return
+            try:
+                self.run_due()
+            except Exception as e:
+                self.last_error = e
+                self._wakeup_after_error()
+
+    def _wakeup_after_error(self) -> None:
+        # E.g. the schedule log failed: back off instead of spinning on the same batch
+        with self._lock:
+            self._wakeup.wait(1.0)
+
+    # ─────────────────────────────────────────────────────────────
+    # Internals (called with the lock held)
+    # ─────────────────────────────────────────────────────────────
+    def _add(self, schedule: Schedule) -> None:
+        self._schedules[schedule.id] = schedule
+        self._by_account.setdefault(schedule.from_account_id, {})[schedule.id] = schedule
+        heapq.heappush(self._heap, (schedule.next_run, next(self._sequence), schedule))
+
+    def _remove(self, schedule: Schedule) -> None:
+        del self._schedules[schedule.id]
+        mine = self._by_account[schedule.from_account_id]
+        del mine[schedule.id]
+        if not mine:
+            del self._by_account[schedule.from_account_id]
+
+    def _finish(self, schedule: Schedule) -> None:
+        self._finished[schedule.id] = schedule
+        while len(self._finished) > self.keep_finished:
+            self._finished.popitem(last=False)
+
+    def _live(self, entry: Entry) -> bool:
+        due, _, schedule = entry
+        return self._schedules.get(schedule.id) is schedule and schedule.next_run == due
+
+    def _take_due(self, now: float) -> List[Tuple[Schedule, float]]:
+        """Pop up to ``max_batch`` due schedules and advance each to its next run."""
+        batch: List[Tuple[Schedule, float]] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now and len(batch) < self.max_batch:
+            entry = heapq.heappop(heap)
+            if not self._live(entry):
+                self._stale -= 1
+                continue
+            due, _, schedule = entry
+            schedule.runs += 1
+            schedule.last_run = due
+            if schedule.remaining is not None:
+                schedule.remaining -= 1
+            if schedule.interval is None or schedule.remaining == 0:
+                schedule.next_run = None
+                self._remove(schedule)
+                self._finish(schedule)
+            else:
+                missed = math.floor((now - due) / schedule.interval)
+                schedule.next_run = due + (missed + 1) * schedule.interval
+                heapq.heappush(heap, (schedule.next_run, next(self._sequence), schedule))
+            batch.append((schedule, due))
+        return batch
+
+    def _append(self, event: dict) -> int:
+        if self._log is None:
+            return 0
+        self._logged += 1
+        lsn = self._log.append(event)
+        if self._logged >= max(self.compact_every, 2 * (len(self._schedules) + len(self._finished))):
+            lsn = self._compact()
+        return lsn
+
+    def _append_states(self, schedules) -> int:
+        lsn = 0
+        if self._log is None:
+            return lsn
+        for schedule in schedules:
+            lsn = self._append({"op": "put", "schedule": schedule.to_dict()})
+        return lsn
+
+    def _commit(self, lsn: int) -> None:
+        if lsn:
+            self._log.commit(lsn)
+
+    def _compact(self) -> int:
+        """Rewrite the log as one put per known schedule and drop the older segments."""
+        log = self._log
+        log.rotate()
+        first = log.last_lsn
+        lsn = first
+        for schedule in itertools.chain(self._finished.values(), self._schedules.values()):
+            lsn = log.append({"op": "put", "schedule": schedule.to_dict()})
+        log.commit(lsn)
+        log.truncate_before(first)
+        self._logged = len(self._finished) + len(self._schedules)
+        return lsn
+
+    def _recover(self) -> None:
+        state: Dict[str, Schedule] = {}
+        for event in self._log.replay():
+            self._logged += 1
+            if event["op"] == "put":
+                schedule = Schedule.from_dict(event["schedule"])
+                state[schedule.id] = schedule
+            else:
+                state.pop(event["id"], None)
+        for schedule in state.values():
+            if schedule.finished:
+                self._finish(schedule)
+            else:
+                self._schedules[schedule.id] = schedule
+                self._by_account.setdefault(schedule.from_account_id, {})[schedule.id] = schedule
+        self._heap = [(s.next_run, next(self._sequence), s) for s in self._schedules.values()]
+        heapq.heapify(self._heap)
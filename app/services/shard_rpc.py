@@ -0,0 +1,135 @@
+# app/services/shard_rpc.py
+"""
+Request/response IPC between the worker processes of a sharded deployment.
+
+Each shard listens on a Unix domain socket (``multiprocessing.connection``:
+length-prefixed pickled messages, HMAC challenge on connect with a shared
+``authkey``), one thread per peer connection. A request is
+``(method, args, kwargs)``; the reply is ``("ok", value)`` or
+``("error", exception)``, and the exception is re-raised in the caller, so
+``AccountNotFoundError`` & co. cross the process boundary unchanged.
+
+``ShardClient`` keeps idle connections to one peer for reuse. Connecting
+is retried until ``connect_timeout`` (peers start concurrently); a request
+is never re-sent, since the peer may already have applied it.
+"""
+
+import os
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, List, Set
+
+from app.exceptions import ShardUnavailableError
+
+Handler = Callable[..., Any]
+
+
+def shard_address(socket_dir: str, shard_id: int) -> str:
+    return os.path.join(socket_dir, f"shard-{shard_id}.sock")
+
+
+class ShardServer:
+    """Serves ``handler(method, *args, **kwargs)`` on a Unix socket."""
+
+    def __init__(self, address: str, handler: Handler, authkey: bytes):
+        os.makedirs(os.path.dirname(address), mode=0o700, exist_ok=True)
+        if os.path.exists(address):
+            os.unlink(address)  # left behind by a previous run
+        self.address = address
+        self._handler = handler
+        self._listener = Listener(address, family="AF_UNIX", authkey=authkey)
+        self._connections: Set[Connection] = set()  # open ones; each handler removes its own
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._accept, name="shard-rpc-accept", daemon=True)
+        self._thread.start()
+
+    def _accept(self) -> None:
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return  # listener closed
+            except Exception:
+                continue  # failed handshake (wrong authkey): drop that client only
+            with self._lock:
+                self._connections.add(conn)
+            threading.Thread(target=self._serve, args=(conn,), name="shard-rpc", daemon=True).start()
+
+    def _serve(self, conn: Connection) -> None:
+        try:
+            self._handle(conn)
+        finally:
+            with self._lock:
+                self._connections.discard(conn)
+
+    def _handle(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    method, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ("ok", self._handler(method, *args, **kwargs))
+                except Exception as e:
+                    reply = ("error", e)
+                try:
+                    conn.send(reply)
+                except (OSError, ValueError):
+                    return
+
+    def close(self) -> None:
+        self._closed = True
+        self._listener.close()
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            conn.close()
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class ShardClient:
+    """Calls into one peer shard over pooled connections."""
+
+    def __init__(self, address: str, authkey: bytes, connect_timeout: float = 10.0):
+        self.address = address
+        self.connect_timeout = connect_timeout
+        self._authkey = authkey
+        self._idle: List[Connection] = []
+        self._lock = threading.Lock()
+
+    def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        conn = self._acquire()
+        try:
+            conn.send((method, args, kwargs))
+            status, value = conn.recv()
+        except (EOFError, OSError) as e:
+            conn.close()
+            raise ShardUnavailableError(f"Shard at {self.address} failed during {method}: {e}") from e
+        with self._lock:
+            self._idle.append(conn)
+        if status == "error":
+            raise value
+        return value
+
+    def _acquire(self) -> Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return Client(self.address, family="AF_UNIX", authkey=self._authkey)
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                if time.monotonic() >= deadline:
+                    raise ShardUnavailableError(f"Shard at {self.address} is not reachable") from e
+                time.sleep(0.05)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
@@ -0,0 +1,398 @@
+# app/services/sharding.py
+"""
+Sharded account ownership for running several worker processes.
+
+Every worker owns the accounts whose IDs a consistent-hash ring maps to
+its shard and holds only those in its local ``AccountService`` (with its
+own journal). ``ShardedAccountService`` has the ``AccountService``
+interface: calls about a local account run in-process, calls about any
+other account are forwarded to the owner over ``app.services.shard_rpc``,
+and ``list_all_accounts``/``list_owned_accounts``/``count_accounts``/
+``get_summary`` fan out to every shard.
+
+A transfer (or atomic batch) touching accounts on several shards runs as
+a two-phase commit coordinated by the worker that received the request:
+every involved shard ``prepare``s its legs (checks and reserves funds) and
+votes; if all vote yes, the coordinator journals its decision and every
+shard ``commit``s, otherwise every prepared shard ``abort``s. Prepares and
+decisions are journaled (with ``WAL_DIR``), so a restart on either side
+resumes the transaction instead of forgetting it. Every ``resolve_after``
+seconds each worker re-sends the commits of its decisions that some shard
+has not acknowledged, and asks the coordinator of each reservation it has
+held that long for the outcome: the coordinator answers with its decision
+or, if it has none, aborts the transaction for good (presumed abort).
+A reservation whose coordinator cannot be reached stays held until it can.
+
+Accounts returned for remote shards are detached copies with the current
+balance and no history (query history with the paging/search methods).
+The number of shards must not change once accounts exist: the ring would
+assign some of them to a shard that does not have them.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.exceptions import ShardUnavailableError
+from app.models.account import Account
+from app.models.batch import BatchOperation, BatchResult, operation_error
+from app.models.report import Statement
+from app.models.transaction import Transaction, to_epoch
+from app.services.account_service import AccountService, ImportRecord, Leg
+from app.services.shard_rpc import ShardClient, ShardServer, shard_address
+
+# Methods a peer may call on the local service
+SERVED = frozenset({
+    "create_account", "get_account", "deposit", "withdraw", "transfer", "apply_batch",
+    "get_transactions_page", "query_transactions", "get_statement", "get_balance", "get_balance_at",
+    "count_accounts", "list_all_accounts", "portfolio_columns", "prepare", "commit", "abort",
+    "import_records", "export_rows", "accounts_version", "owner_of", "list_owned_accounts", "decision",
+})
+
+
+def _hash(key: str) -> int:
+    # Stable across processes, unlike hash() (randomized per interpreter)
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of keys onto ``shards`` with ``replicas`` virtual nodes each."""
+
+    def __init__(self, shards: int, replicas: int = 64):
+        if shards < 1:
+            raise ValueError("Need at least one shard")
+        points = sorted((_hash(f"shard-{shard}-{r}"), shard) for shard in range(shards) for r in range(replicas))
+        self.shards = shards
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard(self, key: str) -> int:
+        i = bisect_right(self._points, _hash(key))
+        return self._owners[i % len(self._owners)]
+
+
+def _detach(value: Any) -> Any:
+    # Ship id, balance and owner, not the whole ledger
+    return Account(id=value.id, balance=value.balance, owner=value.owner) if isinstance(value, Account) else value
+
+
+class ShardedAccountService:
+    """``AccountService`` interface over one local shard plus its peers."""
+
+    def __init__(
+        self,
+        local: AccountService,
+        shard_id: int,
+        shards: int,
+        socket_dir: str,
+        authkey: bytes,
+        connect_timeout: float = 10.0,
+        resolve_after: float = 30.0,
+    ):
+        if not 0 <= shard_id < shards:
+            raise ValueError(f"shard_id must be in [0, {shards})")
+        self.local = local
+        self.shard_id = shard_id
+        self.ring = HashRing(shards)
+        self._server = ShardServer(shard_address(socket_dir, shard_id), self._serve, authkey)
+        self._peers: Dict[int, ShardClient] = {
+            shard: ShardClient(shard_address(socket_dir, shard), authkey, connect_timeout)
+            for shard in range(shards) if shard != shard_id
+        }
+        self.resolve_after = resolve_after
+        self.last_error: Optional[Exception] = None
+        self._stop = threading.Event()
+        self._resolver = threading.Thread(target=self._resolve_loop, name="two-phase-resolver", daemon=True)
+        self._resolver.start()
+
+    def _serve(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        if method not in SERVED:
+            raise ValueError(f"Unknown shard method: {method}")
+        return _detach(getattr(self.local, method)(*args, **kwargs))
+
+    def _call(self, shard: int, method: str, *args: Any, **kwargs: Any) -> Any:
+        if shard == self.shard_id:
+            return getattr(self.local, method)(*args, **kwargs)
+        return self._peers[shard].call(method, *args, **kwargs)
+
+    def _route(self, account_id: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        return self._call(self.ring.shard(account_id), method, account_id, *args, **kwargs)
+
+    def _everywhere(self, method: str, *args: Any) -> List[Any]:
+        return [self._call(shard, method, *args) for shard in range(self.ring.shards)]
+
+    # ─────────────────────────────────────────────────────────────
+    # Single-account operations: run on the owner
+    # ─────────────────────────────────────────────────────────────
+    def create_account(self, account_id: str, initial_balance: int = 0, owner: Optional[str] = None) -> Account:
+        return self._route(account_id, "create_account", initial_balance, owner)
+
+    def get_account(self, account_id: str) -> Account:
+        return self._route(account_id, "get_account")
+
+    def owner_of(self, account_id: str) -> Optional[str]:
+        return self._route(account_id, "owner_of")
+
+    def deposit(self, account_id: str, amount: int) -> Account:
+        return self._route(account_id, "deposit", amount)
+
+    def withdraw(self, account_id: str, amount: int) -> Account:
+        return self._route(account_id, "withdraw", amount)
+
+    def get_balance(self, account_id: str) -> int:
+        return self._route(account_id, "get_balance")
+
+    def get_balance_at(self, account_id: str, at: datetime) -> int:
+        return self._route(account_id, "get_balance_at", at)
+
+    def get_transactions_page(
+        self, account_id: str, limit: int = 100, cursor: Optional[str] = None, order: str = "desc"
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        return self._route(account_id, "get_transactions_page", limit=limit, cursor=cursor, order=order)
+
+    def iter_transactions(
+        self, account_id: str, order: str = "desc", chunk_size: int = 1_000
+    ) -> Iterator[List[Transaction]]:
+        if self.ring.shard(account_id) == self.shard_id:
+            return self.local.iter_transactions(account_id, order=order, chunk_size=chunk_size)
+        return self._iter_remote(account_id, order, chunk_size)
+
+    def _iter_remote(self, account_id: str, order: str, chunk_size: int) -> Iterator[List[Transaction]]:
+        # One page per round trip, so memory stays bounded on both sides
+        page, cursor = self.get_transactions_page(account_id, limit=chunk_size, order=order)
+        while page:
+            yield page
+            if cursor is None:
+                return
+            page, cursor = self.get_transactions_page(account_id, limit=chunk_size, cursor=cursor)
+
+    def get_transactions(self, account_id: str) -> Sequence[Transaction]:
+        if self.ring.shard(account_id) == self.shard_id:
+            return self.local.get_transactions(account_id)
+        return list(chain.from_iterable(self._iter_remote(account_id, "asc", 10_000)))
+
+    def query_transactions(self, account_id: str, **filters: Any) -> List[Transaction]:
+        return self._route(account_id, "query_transactions", **filters)
+
+    def search_transactions_by_amount(self, account_id: str, min_amount: int) -> List[Transaction]:
+        return self.query_transactions(account_id, min_amount=min_amount)
+
+    def get_statement(self, account_id: str, **options: Any) -> Statement:
+        return self._route(account_id, "get_statement", **options)
+
+    def export_rows(
+        self, account_id: str, start: int = 0, limit: int = 10_000
+    ) -> Tuple[int, List[Tuple[str, int, float]]]:
+        return self._route(account_id, "export_rows", start, limit)
+
+    def import_records(self, records: Sequence[ImportRecord]) -> List[Tuple[int, str]]:
+        """
+        Split the chunk by owning shard (keeping each account's records in
+        order) and load every part there; errors keep chunk positions.
+        """
+        by_shard: Dict[int, List[int]] = defaultdict(list)
+        for position, record in enumerate(records):
+            by_shard[self.ring.shard(record[1])].append(position)
+        errors: List[Tuple[int, str]] = []
+        for shard, positions in sorted(by_shard.items()):
+            part = [records[position] for position in positions]
+            errors.extend((positions[i], error) for i, error in self._call(shard, "import_records", part))
+        errors.sort()
+        return errors
+
+    # ─────────────────────────────────────────────────────────────
+    # All accounts: fan out
+    # ─────────────────────────────────────────────────────────────
+    def count_accounts(self) -> int:
+        return sum(self._everywhere("count_accounts"))
+
+    def list_all_accounts(self) -> List[dict]:
+        return list(chain.from_iterable(self._everywhere("list_all_accounts")))
+
+    def list_owned_accounts(self, owner: str) -> List[dict]:
+        # Accounts are placed by id, not owner: every shard may hold some
+        return list(chain.from_iterable(self._everywhere("list_owned_accounts", owner)))
+
+    def accounts_version(self) -> Tuple[int, ...]:
+        return tuple(self._everywhere("accounts_version"))
+
+    def get_summary(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        period: str = "day",
+        top: int = 10,
+        owner: Optional[str] = None,
+    ) -> Statement:
+        """
+        Portfolio statement over every shard (``owner``'s accounts only,
+        if given). Each shard's columns are a consistent cut of that shard
+        only: a cross-shard transfer between its two commits can be
+        counted on one side.
+        """
+        from app.services import reporting
+
+        columns = list(chain.from_iterable(self._everywhere("portfolio_columns", owner)))
+        return reporting.portfolio_summary(
+            columns, None if start is None else to_epoch(start), None if end is None else to_epoch(end), period, top
+        )
+
+    # ─────────────────────────────────────────────────────────────
+    # Multi-account operations: local when possible, else 2PC
+    # ─────────────────────────────────────────────────────────────
+    def transfer(self, from_account_id: str, to_account_id: str, amount: int) -> None:
+        if from_account_id == to_account_id:
+            raise ValueError("Cannot transfer to the same account")
+        if amount <= 0:
+            raise ValueError("Transfer amount must be positive")
+        source = self.ring.shard(from_account_id)
+        if source == self.ring.shard(to_account_id):
+            self._call(source, "transfer", from_account_id, to_account_id, amount)
+            return
+        rejected, _ = self._two_phase([(from_account_id, -amount, 0), (to_account_id, amount, 0)])
+        if rejected is not None:
+            raise rejected[1]
+
+    def apply_batch(self, operations: List[BatchOperation], atomic: bool = False) -> List[BatchResult]:
+        """
+        Same contract as ``AccountService.apply_batch``. A batch whose
+        accounts all live on one shard runs there unchanged. Otherwise an
+        atomic batch is one two-phase transaction, and a best-effort batch
+        applies its items one at a time (each item atomic on its own).
+        """
+        shards = {
+            self.ring.shard(account_id)
+            for op in operations for account_id in (op.account_id, op.to_account_id) if account_id
+        }
+        if len(shards) <= 1:
+            return self._call(shards.pop() if shards else self.shard_id, "apply_batch", operations, atomic=atomic)
+        if not atomic:
+            results = []
+            for i, op in enumerate(operations):
+                result = self.apply_batch([op], atomic=True)[0]
+                result.index = i
+                results.append(result)
+            return results
+
+        results = [BatchResult(index=i, error=operation_error(op)) for i, op in enumerate(operations)]
+        if any(r.error for r in results):
+            return AccountService._abort_batch(results)
+        legs: List[Leg] = []
+        for i, op in enumerate(operations):
+            sign = 1 if op.op == "deposit" else -1
+            legs.append((op.account_id, sign * op.amount, i))
+            if op.op == "transfer":
+                legs.append((op.to_account_id, op.amount, i))
+        rejected, balances = self._two_phase(legs)
+        if rejected is not None:
+            results[rejected[0]].error = str(rejected[1])
+            return AccountService._abort_batch(results)
+        for (account_id, _, i), balance in zip(legs, balances):
+            if account_id == operations[i].account_id:
+                results[i].ok, results[i].balance = True, balance
+        return results
+
+    def _two_phase(self, legs: List[Leg]) -> Tuple[Optional[Tuple[Any, Exception]], List[int]]:
+        """
+        Run ``legs`` as one transaction across their shards. Returns
+        ``(rejection, balances)``: the first ``(tag, error)`` vote against
+        it (nothing applied), or None and the balance after every leg.
+
+        Raises ShardUnavailableError if, once it is decided, a shard cannot
+        confirm its commit. The transaction then is in doubt, not undone:
+        the decision is journaled and its commits are re-sent until every
+        shard has applied them (see ``resolve``).
+        """
+        txid = f"{self.shard_id}-{uuid.uuid4().hex}"
+        by_shard: Dict[int, List[Tuple[int, Leg]]] = defaultdict(list)
+        for position, leg in enumerate(legs):
+            by_shard[self.ring.shard(leg[0])].append((position, leg))
+
+        prepared: List[int] = []
+        decided = False
+        try:
+            for shard, shard_legs in sorted(by_shard.items()):
+                vote = self._call(shard, "prepare", txid, [leg for _, leg in shard_legs])
+                if vote is not None:
+                    return vote, []
+                prepared.append(shard)
+            timestamp = time.time()
+            decided = self.local.decide(txid, prepared, timestamp)
+            if not decided:
+                # A participant gave up waiting and its coordinator (us) answered abort
+                return (legs[0][2], ShardUnavailableError("Transaction timed out before it could commit")), []
+        finally:
+            if not decided:
+                for shard in prepared:
+                    self._call(shard, "abort", txid)
+
+        balances = [0] * len(legs)
+        failed: List[str] = []
+        for shard, shard_legs in by_shard.items():
+            try:
+                committed = self._call(shard, "commit", txid, timestamp)
+            except ShardUnavailableError as e:
+                failed.append(str(e))
+                continue
+            self.local.committed(txid, shard)
+            if len(committed) != len(shard_legs):
+                # Not prepared there any more: forgotten by a participant without a
+                # journal, or already committed by that participant's resolve()
+                failed.append(f"shard {shard} no longer had transaction {txid} prepared")
+                continue
+            for (position, _), balance in zip(shard_legs, committed):
+                balances[position] = balance
+        if failed:
+            raise ShardUnavailableError(f"Transaction {txid} is committed but not confirmed: {'; '.join(failed)}")
+        return None, balances
+
+    def resolve(self) -> None:
+        """
+        Settle two-phase transactions older than ``resolve_after``: re-send
+        this coordinator's unacknowledged commits, and commit or abort the
+        local reservations as their coordinators decided.
+        """
+        cutoff = time.time() - self.resolve_after
+        for txid, shards, timestamp in self.local.undelivered(cutoff):
+            for shard in shards:
+                try:
+                    self._call(shard, "commit", txid, timestamp)  # [] if it already committed
+                except ShardUnavailableError:
+                    continue
+                self.local.committed(txid, shard)
+        for txid in self.local.in_doubt(cutoff):
+            try:
+                timestamp = self._call(int(txid.split("-", 1)[0]), "decision", txid)
+            except ShardUnavailableError:
+                continue  # undecidable until the coordinator is back
+            if timestamp is None:
+                self.local.abort(txid)
+            else:
+                self.local.commit(txid, timestamp)
+
+    def _resolve_loop(self) -> None:
+        while not self._stop.wait(self.resolve_after / 2):
+            try:
+                self.resolve()
+            except Exception as e:
+                self.last_error = e  # the next round retries
+    # ─────────────────────────────────────────────────────────────
+    # Lifecycle
+    # ─────────────────────────────────────────────────────────────
+    def snapshot(self) -> None:
+        self.local.snapshot()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._resolver.join()
+        self._server.close()
+        for peer in self._peers.values():
+            peer.close()
+        self.local.close()
+
@@ -0,0 +1,194 @@
+# app/services/transaction_index.py
+"""
+Secondary indexes over one account's ledger for range queries.
+
+* Amount index: the ledger's row numbers kept sorted by amount, in a
+  compact ``array``; range lookups are two bisects on it.
+* Time index: ledgers are appended in time order, so normally the
+  timestamp column is already sorted and is bisected directly. If rows
+  ever arrive out of order (e.g. imported history) the index falls back
+  to a sorted row permutation like the amount index.
+
+Indexes are maintained lazily: each lookup first indexes the rows
+appended since the previous one, so writes pay nothing. The caller must
+keep the ledger from changing during a lookup (AccountService holds the
+account's lock).
+
+Only the ledger's hot rows are indexed. Cold blocks are filtered by their
+zone maps (amount and time ranges) and just the blocks that may match are
+decompressed and scanned. An index is tied to the ``base`` it was built
+at: once rows are frozen, build a new one.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Optional
+
+from app.models.ledger import Ledger
+
+# Above this many new rows a full re-sort beats inserting one by one
+REBUILD_THRESHOLD = 256
+
+
+class SortedRows:
+    """Row numbers of ``column`` ordered by the column's value."""
+
+    def __init__(self, column: array):
+        self._column = column
+        self.rows = array("q")
+
+    def extend(self, first: int, last: int) -> None:
+        """Index rows ``first`` .. ``last - 1``."""
+        key = self._column.__getitem__
+        if last - first > REBUILD_THRESHOLD:
+            self.rows = array("q", sorted(range(last), key=key))
+            return
+        for row in range(first, last):
+            insort(self.rows, row, key=key)
+
+    def bounds(self, low: Optional[float], high: Optional[float]) -> range:
+        """Positions in ``rows`` whose value lies in ``[low, high]``."""
+        key = self._column.__getitem__
+        lo = 0 if low is None else bisect_left(self.rows, low, key=key)
+        hi = len(self.rows) if high is None else bisect_right(self.rows, high, key=key)
+        return range(lo, max(lo, hi))
+
+
+class TransactionIndex:
+    """Amount and time indexes for one ``Ledger``."""
+
+    def __init__(self, ledger: Ledger):
+        self.ledger = ledger
+        self.base = ledger.base
+        self._indexed = 0
+        self._amounts = SortedRows(ledger.amounts)
+        self._times: Optional[SortedRows] = None  # only once timestamps go out of order
+
+    def catch_up(self) -> None:
+        size = len(self.ledger.amounts)
+        if size == self._indexed:
+            return
+        first = self._indexed
+        self._amounts.extend(first, size)
+
+        timestamps = self.ledger.timestamps
+        if self._times is None:
+            start = max(first, 1)
+            if any(timestamps[i] < timestamps[i - 1] for i in range(start, size)):
+                self._times = SortedRows(timestamps)
+                self._times.extend(0, size)
+        else:
+            self._times.extend(first, size)
+        self._indexed = size
+
+    def query(
+        self,
+        min_amount: Optional[int] = None,
+        max_amount: Optional[int] = None,
+        type_code: Optional[int] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[int]:
+        """Row numbers matching every given bound (inclusive), in ledger order."""
+        result = self._cold_rows(min_amount, max_amount, type_code, start, end)
+        self.catch_up()
+        ledger = self.ledger
+        by_amount = min_amount is not None or max_amount is not None
+        by_time = start is not None or end is not None
+
+        # Drive the lookup from the more selective index, filter the rest
+        amount_span = self._amounts.bounds(min_amount, max_amount) if by_amount else None
+        time_span = self._time_bounds(start, end) if by_time else None
+        if amount_span is not None and (time_span is None or len(amount_span) <= len(time_span)):
+            rows = sorted(self._amounts.rows[i] for i in amount_span)
+            amount_checked = True
+        elif time_span is not None:
+            rows = self._time_rows(time_span)
+            amount_checked = False
+        else:
+            rows = range(len(ledger.amounts))
+            amount_checked = True
+
+        amounts, types, timestamps = ledger.amounts, ledger.types, ledger.timestamps
+        base = self.base
+        for row in rows:
+            if type_code is not None and types[row] != type_code:
+                continue
+            if not amount_checked:
+                if min_amount is not None and amounts[row] < min_amount:
+                    continue
+                if max_amount is not None and amounts[row] > max_amount:
+                    continue
+            elif by_time:
+                if start is not None and timestamps[row] < start:
+                    continue
+                if end is not None and timestamps[row] > end:
+                    continue
+            result.append(base + row)
+        return result
+
+    def _cold_rows(
+        self,
+        min_amount: Optional[int],
+        max_amount: Optional[int],
+        type_code: Optional[int],
+        start: Optional[float],
+        end: Optional[float],
+    ) -> List[int]:
+        result: List[int] = []
+        first = 0
+        for block in self.ledger.cold:
+            skip = (
+                (min_amount is not None and block.max_amount < min_amount)
+                or (max_amount is not None and block.min_amount > max_amount)
+                or (start is not None and block.max_ts < start)
+                or (end is not None and block.min_ts > end)
+            )
+            if not skip:
+                result.extend(_block_matches(block, first, min_amount, max_amount, type_code, start, end))
+            first += block.rows
+        return result
+
+    def _time_bounds(self, start: Optional[float], end: Optional[float]) -> range:
+        if self._times is not None:
+            return self._times.bounds(start, end)
+        timestamps = self.ledger.timestamps
+        lo = 0 if start is None else bisect_left(timestamps, start)
+        hi = len(timestamps) if end is None else bisect_right(timestamps, end)
+        return range(lo, max(lo, hi))
+
+    def _time_rows(self, span: range) -> List[int]:
+        if self._times is None:
+            return list(span)  # positions are row numbers when the column is sorted
+        return sorted(self._times.rows[i] for i in span)
+
+
+def _block_matches(
+    block,
+    first: int,
+    min_amount: Optional[int],
+    max_amount: Optional[int],
+    type_code: Optional[int],
+    start: Optional[float],
+    end: Optional[float],
+) -> List[int]:
+    """Row numbers (offset by ``first``) of a cold block's matching rows, by a vectorized scan."""
+    import numpy as np  # cold blocks imply it is loaded already
+
+    amounts, types, timestamps = block.columns()
+    mask = np.ones(block.rows, dtype=bool)
+    if type_code is not None:
+        mask &= np.frombuffer(types, dtype=np.int8) == type_code
+    if min_amount is not None or max_amount is not None:
+        a = np.frombuffer(amounts, dtype=np.int64)
+        if min_amount is not None:
+            mask &= a >= min_amount
+        if max_amount is not None:
+            mask &= a <= max_amount
+    if start is not None or end is not None:
+        ts = np.frombuffer(timestamps, dtype=np.float64)
+        if start is not None:
+            mask &= ts >= start
+        if end is not None:
+            mask &= ts <= end
+    return (np.flatnonzero(mask) + first).tolist()
@@ -3,12 +3,19 @@
 Unit tests for AccountService using pytest.
 """
 
+import itertools
+import time
+from datetime import datetime, timedelta
+
 import pytest
 
 from app.exceptions import AccountNotFoundError, DuplicateAccountError, InsufficientFundsError
 from app.models.account import Account
+from app.models.batch import BatchOperation
+from app.models.ledger import DEPOSIT, Ledger
 from app.models.transaction import Transaction
 from app.services.account_service import AccountService
+from app.services.transaction_index import TransactionIndex
 
 
 @pytest.fixture
@@ -18,57 +25,191 @@ def service():
 
 
 def test_create_account(service):
-    account = service.create_account("ACC-TEST", 100.0)
+    account = service.create_account("ACC-TEST", 100)
     assert account.id == "ACC-TEST"
-    assert account.balance == 100.0
+    assert account.balance == 100
     assert len(account.transactions) == 0
 
 
 def test_create_duplicate_account(service):
-    service.create_account("ACC-DUP", 50.0)
+    service.create_account("ACC-DUP", 50)
     with pytest.raises(DuplicateAccountError):
-        service.create_account("ACC-DUP", 0.0)
+        service.create_account("ACC-DUP", 0)
 
 
 def test_deposit(service):
-    acc = service.create_account("ACC-DEP", 0.0)
-    service.deposit("ACC-DEP", 200.0)
-    assert service.get_balance("ACC-DEP") == 200.0
+    acc = service.create_account("ACC-DEP", 0)
+    service.deposit("ACC-DEP", 200)
+    assert service.get_balance("ACC-DEP") == 200
     assert len(service.get_transactions("ACC-DEP")) == 1
-    assert service.get_transactions("ACC-DEP")[0].amount == 200.0
+    assert service.get_transactions("ACC-DEP")[0].amount == 200
     assert service.get_transactions("ACC-DEP")[0].type == "deposit"
 
 
 def test_withdraw_success(service):
-    service.create_account("ACC-WIT", 300.0)
-    service.withdraw("ACC-WIT", 150.0)
-    assert service.get_balance("ACC-WIT") == 150.0
+    service.create_account("ACC-WIT", 300)
+    service.withdraw("ACC-WIT", 150)
+    assert service.get_balance("ACC-WIT") == 150
 
 
 def test_withdraw_insufficient(service):
-    service.create_account("ACC-INS", 100.0)
+    service.create_account("ACC-INS", 100)
     with pytest.raises(InsufficientFundsError):
-        service.withdraw("ACC-INS", 200.0)
+        service.withdraw("ACC-INS", 200)
 
 
 def test_transfer_success(service):
-    service.create_account("ACC-A", 500.0)
-    service.create_account("ACC-B", 0.0)
+    service.create_account("ACC-A", 500)
+    service.create_account("ACC-B", 0)
     
-    service.transfer("ACC-A", "ACC-B", 200.0)
+    service.transfer("ACC-A", "ACC-B", 200)
     
-    assert service.get_balance("ACC-A") == 300.0
-    assert service.get_balance("ACC-B") == 200.0
+    assert service.get_balance("ACC-A") == 300
+    assert service.get_balance("ACC-B") == 200
     assert len(service.get_transactions("ACC-A")) == 1  # withdraw
     assert len(service.get_transactions("ACC-B")) == 1  # deposit
 
 
 def test_transfer_same_account(service):
-    service.create_account("ACC-SAME", 100.0)
+    service.create_account("ACC-SAME", 100)
     with pytest.raises(ValueError):
-        service.transfer("ACC-SAME", "ACC-SAME", 50.0)
+        service.transfer("ACC-SAME", "ACC-SAME", 50)
 
 
 def test_transfer_not_found(service):
     with pytest.raises(AccountNotFoundError):
-        service.transfer("NON-EXIST", "ACC-B", 50.0)
\ No newline at end of file
+        service.transfer("NON-EXIST", "ACC-B", 50)
+
+
+def test_apply_batch_best_effort(service):
+    service.create_account("ACC-A", 100)
+    service.create_account("ACC-B", 0)
+    results = service.apply_batch([
+        BatchOperation("deposit", "ACC-A", 50),
+        BatchOperation("withdraw", "ACC-B", 10),          # insufficient funds
+        BatchOperation("transfer", "ACC-A", 120, "ACC-B"),
+        BatchOperation("deposit", "NON-EXIST", 1),        # unknown account
+    ])
+    assert [r.ok for r in results] == [True, False, True, False]
+    assert results[0].balance == 150
+    assert results[2].balance == 30
+    assert "Insufficient funds" in results[1].error
+    assert "not found" in results[3].error
+    assert service.get_balance("ACC-B") == 120
+
+
+def test_apply_batch_atomic_all_or_nothing(service):
+    service.create_account("ACC-A", 100)
+    service.create_account("ACC-B", 0)
+    ops = [
+        BatchOperation("transfer", "ACC-A", 100, "ACC-B"),
+        BatchOperation("withdraw", "ACC-B", 60),
+        BatchOperation("withdraw", "ACC-B", 60),  # only 40 left: aborts the batch
+    ]
+    results = service.apply_batch(ops, atomic=True)
+    assert not any(r.ok for r in results)
+    assert "Insufficient funds" in results[2].error
+    assert results[0].error == "Batch aborted"
+    assert service.get_balance("ACC-A") == 100
+    assert service.get_transactions("ACC-B") == []
+
+    results = service.apply_batch(ops[:2], atomic=True)
+    assert all(r.ok for r in results)
+    assert service.get_balance("ACC-B") == 40
+
+
+def test_transactions_page_newest_first(service):
+    service.create_account("ACC-P", 0)
+    for amount in range(1, 8):
+        service.deposit("ACC-P", amount)
+
+    page, cursor = service.get_transactions_page("ACC-P", limit=3)
+    assert [t.amount for t in page] == [7, 6, 5]
+    page, cursor = service.get_transactions_page("ACC-P", limit=3, cursor=cursor)
+    assert [t.amount for t in page] == [4, 3, 2]
+    # New activity does not shift pages already being read
+    service.deposit("ACC-P", 100)
+    page, cursor = service.get_transactions_page("ACC-P", limit=3, cursor=cursor)
+    assert [t.amount for t in page] == [1]
+    assert cursor is None
+
+
+def test_transactions_page_oldest_first(service):
+    service.create_account("ACC-P", 0)
+    for amount in range(1, 6):
+        service.deposit("ACC-P", amount)
+
+    page, cursor = service.get_transactions_page("ACC-P", limit=2, order="asc")
+    assert [t.amount for t in page] == [1, 2]
+    pages = []
+    while cursor:
+        page, cursor = service.get_transactions_page("ACC-P", limit=2, cursor=cursor)
+        pages.append([t.amount for t in page])
+    assert pages == [[3, 4], [5]]
+
+    with pytest.raises(ValueError):
+        service.get_transactions_page("ACC-P", cursor="not-a-cursor")
+
+
+def test_iter_transactions_in_chunks(service):
+    service.create_account("ACC-I", 0)
+    for amount in range(1, 6):
+        service.deposit("ACC-I", amount)
+    chunks = list(service.iter_transactions("ACC-I", chunk_size=2))
+    assert [[t.amount for t in c] for c in chunks] == [[5, 4], [3, 2], [1]]
+    chunks = list(service.iter_transactions("ACC-I", order="asc", chunk_size=4))
+    assert [[t.amount for t in c] for c in chunks] == [[1, 2, 3, 4], [5]]
+
+
+def test_query_transactions_by_amount_type_and_time(service, monkeypatch):
+    clock = itertools.count(1_700_000_000)
+    monkeypatch.setattr(time, "time", lambda: float(next(clock)))  # one tx per second
+    service.create_account("ACC-Q", 1_000)
+    for amount in [5, 50, 500, 20, 200]:
+        service.deposit("ACC-Q", amount)
+    service.withdraw("ACC-Q", 75)
+
+    assert [t.amount for t in service.query_transactions("ACC-Q", min_amount=20, max_amount=200)] == [
+        50, 20, 200, 75
+    ]
+    assert [t.amount for t in service.query_transactions("ACC-Q", min_amount=50, type="withdraw")] == [75]
+    assert [t.amount for t in service.search_transactions_by_amount("ACC-Q", 200)] == [500, 200]
+
+    # Index picks up rows appended after it was built
+    service.deposit("ACC-Q", 300)
+    assert [t.amount for t in service.search_transactions_by_amount("ACC-Q", 300)] == [500, 300]
+
+    txs = service.get_transactions("ACC-Q")
+    window = service.query_transactions("ACC-Q", start=txs[1].timestamp, end=txs[3].timestamp)
+    assert [t.amount for t in window] == [50, 500, 20]
+    assert service.query_transactions("ACC-Q", start=datetime.utcnow() + timedelta(days=1)) == []
+    assert len(service.query_transactions("ACC-Q", limit=2)) == 2
+    with pytest.raises(ValueError):
+        service.query_transactions("ACC-Q", type="refund")
+
+
+def test_transaction_index_out_of_order_timestamps():
+    ledger = Ledger()
+    for amount, ts in [(1, 30), (2, 10), (3, 20), (4, 40)]:
+        ledger.record(amount, DEPOSIT, ts)
+    index = TransactionIndex(ledger)
+    assert index.query(start=15, end=35) == [0, 2]
+    ledger.record(5, DEPOSIT, 25)
+    assert index.query(start=15, end=35, min_amount=3) == [2, 4]
+
+
+def test_get_balance_at(service, monkeypatch):
+    clock = itertools.count(1_700_000_000)
+    monkeypatch.setattr(time, "time", lambda: float(next(clock)))  # one tx per second
+    service.create_account("ACC-PIT", 100)
+    for _ in range(300):
+        service.deposit("ACC-PIT", 2)
+    service.withdraw("ACC-PIT", 50)
+    first = service.get_transactions("ACC-PIT")[0].timestamp
+
+    assert service.get_balance_at("ACC-PIT", first - timedelta(seconds=1)) == 100
+    assert service.get_balance_at("ACC-PIT", first) == 102
+    assert service.get_balance_at("ACC-PIT", first + timedelta(seconds=299)) == 700
+    assert service.get_balance_at("ACC-PIT", first + timedelta(days=1)) == service.get_balance("ACC-PIT") == 650
+    with pytest.raises(AccountNotFoundError):
+        service.get_balance_at("ACC-NOPE", first)
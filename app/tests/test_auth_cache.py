@@ -0,0 +1,79 @@
+# app/tests/test_auth_cache.py
+"""
+Unit tests for the verified-token and user-principal caches.
+"""
+
+from app.core.auth_cache import TokenCache, UserCache
+
+
+class FakeClock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_cache_hit_miss_and_expiry():
+    clock = FakeClock()
+    cache = TokenCache(maxsize=10, clock=clock)
+    assert cache.get("t1") is None
+    cache.put("t1", "johndoe", exp=1_060.0)
+    assert cache.get("t1") == "johndoe"
+
+    clock.now = 1_060.0  # the exp claim is reached
+    assert cache.get("t1") is None
+    assert len(cache) == 0
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 2}
+
+
+def test_token_cache_ttl_caps_lifetime():
+    clock = FakeClock()
+    cache = TokenCache(maxsize=10, ttl=5.0, clock=clock)
+    cache.put("t1", "johndoe", exp=10_000.0)
+    clock.now += 6.0
+    assert cache.get("t1") is None
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(maxsize=2, clock=FakeClock())
+    cache.put("t1", "a", exp=2_000.0)
+    cache.put("t2", "b", exp=2_000.0)
+    cache.get("t1")
+    cache.put("t3", "c", exp=2_000.0)
+    assert cache.get("t2") is None
+    assert cache.get("t1") == "a"
+    assert cache.get("t3") == "c"
+
+
+def test_token_cache_invalidate_subject_and_disabled():
+    cache = TokenCache(maxsize=10, clock=FakeClock())
+    cache.put("t1", "a", exp=2_000.0)
+    cache.put("t2", "a", exp=2_000.0)
+    cache.put("t3", "b", exp=2_000.0)
+    cache.invalidate_subject("a")
+    assert len(cache) == 1
+
+    disabled = TokenCache(maxsize=0)
+    disabled.put("t1", "a", exp=2_000.0)
+    assert disabled.get("t1") is None
+
+
+def test_user_cache_loads_once_until_invalidated():
+    db = {"johndoe": {"disabled": False}}
+    loads = []
+
+    def loader(username):
+        loads.append(username)
+        return dict(db[username]) if username in db else None
+
+    cache = UserCache(loader)
+    assert cache.get("johndoe") == {"disabled": False}
+    assert cache.get("johndoe") == {"disabled": False}
+    assert loads == ["johndoe"]
+
+    db["johndoe"]["disabled"] = True
+    cache.invalidate("johndoe")
+    assert cache.get("johndoe") == {"disabled": True}
+    assert cache.get("nobody") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 3}
@@ -0,0 +1,147 @@
+# app/tests/test_bulk.py
+"""
+Tests for streaming bulk import/export.
+"""
+
+import json
+
+import pytest
+
+from app.db.journal import Journal
+from app.repositories.sqlite_repository import SqliteAccountRepository
+from app.services.account_service import AccountService
+from app.services.bulk import BulkImporter, export_ledger, import_stream
+from app.services.sharding import ShardedAccountService
+
+CSV = b"""kind,account_id,amount,timestamp
+account,ACC001,150.00,
+deposit,ACC001,20.00,2024-01-31T09:30:00
+withdraw,ACC001,5.25,2024-02-01T12:00:00.250000
+account,ACC002,0,
+deposit,ACC002,1,2024-01-01T02:00:00+02:00
+"""
+
+
+def blocks(data, size=7):
+    # Split mid-line (and mid-character) like a network stream would
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_import_csv_in_chunks():
+    service = AccountService()
+    report = import_stream(service, blocks(CSV), "csv", chunk_size=2)
+
+    assert (report.lines, report.accounts, report.transactions, report.rejected) == (6, 2, 3, 0)
+    assert service.get_balance("ACC001") == 16_475
+    assert service.get_balance("ACC002") == 100
+    history = service.get_transactions("ACC001")
+    assert [(t.type, t.amount, t.timestamp.isoformat()) for t in history] == [
+        ("deposit", 2_000, "2024-01-31T09:30:00"),
+        ("withdraw", 525, "2024-02-01T12:00:00.250000"),
+    ]
+    assert service.get_transactions("ACC002")[0].timestamp.isoformat() == "2024-01-01T00:00:00"
+
+
+def test_bad_lines_are_reported_and_the_rest_loads():
+    data = "\n".join([
+        '{"kind": "account", "account_id": "ACC001", "amount": 10}',
+        '{"kind": "account", "account_id": "ACC001", "amount": 5}',
+        '{"kind": "withdraw", "account_id": "ACC001", "amount": 10.01}',
+        '{"kind": "deposit", "account_id": "NOPE", "amount": 1}',
+        "not json",
+        "",
+        '{"kind": "refund", "account_id": "ACC001", "amount": 1}',
+        '{"kind": "deposit", "account_id": "ACC001", "amount": 1.005}',
+        '{"kind": "deposit", "account_id": "ACC001", "amount": 2.5, "timestamp": "yesterday"}',
+        '{"kind": "deposit", "account_id": "ACC001", "amount": "0.10"}',
+    ]).encode()
+    service = AccountService()
+    report = import_stream(service, [data], "ndjson", chunk_size=4, max_errors=3)
+
+    assert (report.accounts, report.transactions, report.rejected) == (1, 1, 7)
+    assert [line for line, _ in report.errors] == [2, 3, 4]
+    assert "already exists" in report.errors[0][1]
+    assert "Insufficient funds" in report.errors[1][1]
+    assert service.get_balance("ACC001") == 1_010
+
+
+def test_account_ids_follow_the_api_rule():
+    data = b"kind,account_id,amount,timestamp\naccount,ACC-001,1,\naccount,AB,1,\naccount,ACC001,1,\n"
+    service = AccountService()
+    report = import_stream(service, [data], "csv")
+    assert report.accounts == 1 and report.errors == [
+        (2, "Account ID must be alphanumeric"), (3, "Account ID must be 3 to 20 characters")
+    ]
+
+
+def test_export_round_trips(tmp_path):
+    service = AccountService()
+    import_stream(service, [CSV], "csv")
+    service.deposit("ACC002", 7)
+    service.transfer("ACC001", "ACC002", 1_000)
+
+    for format in ("csv", "ndjson"):
+        exported = "".join(export_ledger(service, format, chunk_size=2))
+        copy = AccountService()
+        report = import_stream(copy, blocks(exported.encode(), 100), format)
+        assert report.rejected == 0
+        assert copy.list_all_accounts() == service.list_all_accounts()
+        for account_id in ("ACC001", "ACC002"):
+            assert copy.get_transactions(account_id) == service.get_transactions(account_id)
+
+    lines = "".join(export_ledger(service, "ndjson")).splitlines()
+    assert json.loads(lines[0]) == {"kind": "account", "account_id": "ACC001", "amount": 150.0}
+
+
+def test_import_is_journaled_and_recovered(tmp_path):
+    service = AccountService(journal=Journal(tmp_path, fsync=False))
+    import_stream(service, [CSV], "csv", chunk_size=3)
+    exported = "".join(export_ledger(service, "csv"))
+    service.close()
+
+    recovered = AccountService(journal=Journal(tmp_path, fsync=False))
+    assert "".join(export_ledger(recovered, "csv")) == exported
+    recovered.close()
+
+
+def test_import_into_sqlite(tmp_path):
+    url = f"sqlite:///{tmp_path / 'bulk.db'}"
+    service = AccountService(repository=SqliteAccountRepository(url))
+    service.create_account("ACC000", 500)
+    import_stream(service, [CSV + b"withdraw,ACC000,1.00,2024-03-01T00:00:00\n"], "csv")
+    exported = "".join(export_ledger(service, "csv"))
+    service.close()
+
+    reloaded = AccountService(repository=SqliteAccountRepository(url))
+    assert reloaded.get_balance("ACC000") == 400
+    assert "".join(export_ledger(reloaded, "csv")) == exported
+    reloaded.close()
+
+
+def test_sharded_import_routes_records_to_owners(tmp_path):
+    nodes = [
+        ShardedAccountService(AccountService(), shard_id=i, shards=2, socket_dir=str(tmp_path), authkey=b"test")
+        for i in range(2)
+    ]
+    try:
+        lines = [b"kind,account_id,amount,timestamp"]
+        for i in range(20):
+            lines += [b"account,ACC%03d,1," % i, b"deposit,ACC%03d,2,2024-01-01T00:00:00" % i]
+        lines.append(b"withdraw,ACC007,5,")
+        report = import_stream(nodes[0], [b"\n".join(lines)], "csv")
+
+        assert (report.accounts, report.transactions, report.errors) == (
+            20, 20, [(42, "Insufficient funds: 3.00 < 5.00")]
+        )
+        assert all(node.local.count_accounts() > 0 for node in nodes)
+        assert sum(a["balance"] for a in nodes[1].list_all_accounts()) == 20 * 300
+        exported = "".join(export_ledger(nodes[1], "csv"))
+        assert exported.count("\ndeposit,") == 20
+    finally:
+        for node in nodes:
+            node.close()
+
+
+def test_importer_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        BulkImporter(AccountService(), "xml")
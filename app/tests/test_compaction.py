@@ -0,0 +1,172 @@
+# app/tests/test_compaction.py
+"""
+Tests for tiered history: cold segments and background compaction.
+"""
+
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from app.db.journal import Journal
+from app.db.segments import SegmentStore
+from app.models.ledger import DEPOSIT, WITHDRAW, Ledger
+from app.services.account_service import AccountService
+from app.services.bulk import export_ledger
+from app.services.compaction import Compactor
+
+T0 = 1_700_000_000.0
+
+
+def ledger_rows(n, start=T0):
+    ledger = Ledger()
+    for i in range(n):
+        ledger.record(100 + i % 37, WITHDRAW if i % 3 == 0 else DEPOSIT, start + i * 60.123457)
+    return ledger
+
+
+def freeze(ledger, store, before):
+    rows = ledger.count_before(before)
+    writer = store.writer()
+    writer.add(ledger.hot_columns(0, rows))
+    ledger.freeze(rows, writer.close()[0])
+
+
+def test_frozen_ledger_reads_like_the_original(tmp_path):
+    store = SegmentStore(tmp_path, fsync=False, cache_blocks=1)
+    ledger, original = ledger_rows(1_000), ledger_rows(1_000)
+    freeze(ledger, store, T0 + 300 * 60.123457)
+    freeze(ledger, store, T0 + 700 * 60.123457)
+    ledger.record(5, DEPOSIT, T0 + 10**6)
+    original.record(5, DEPOSIT, T0 + 10**6)
+
+    assert (ledger.base, len(ledger.amounts), len(ledger)) == (700, 301, 1_001)
+    assert ledger == original
+    assert list(ledger) == list(original)
+    assert [ledger.row(i) for i in (0, 299, 300, 699, 700, 1_000)] == [
+        original.row(i) for i in (0, 299, 300, 699, 700, 1_000)
+    ]
+    assert ledger.columns(250, 750) == original.columns(250, 750)
+    for row in (0, 1, 150, 300, 650, 700, 701, 1_001):
+        assert ledger.net_before(row) == original.net_before(row)
+    for ts in (T0 - 1, T0, T0 + 299 * 60.123457, T0 + 500 * 60.2, T0 + 10**6, T0 + 10**7):
+        assert ledger.net_after(ts) == original.net_after(ts)
+    assert ledger.nbytes() < original.nbytes() / 3
+
+
+def test_segment_blocks_round_trip_odd_timestamps(tmp_path):
+    store = SegmentStore(tmp_path, fsync=False)
+    writer = store.writer()
+    ledger = Ledger()
+    for ts in (T0 + 0.1, 1e-7, T0 - 86_400.000001):  # unordered; 1e-7 is not whole microseconds
+        ledger.timestamps.append(ts)
+        ledger.amounts.append(1)
+        ledger.types.append(DEPOSIT)
+    block = writer.add(ledger.hot_columns())
+    [cold] = writer.close()
+    assert cold.columns() == ledger.hot_columns()
+    assert (block.min_ts, block.max_ts, block.net) == (1e-7, T0 + 0.1, 3)
+
+
+def import_history(service, accounts=5, rows=400):
+    records = []
+    for a in range(accounts):
+        account_id = f"ACC{a:03d}"
+        records.append(("account", account_id, 10_000, None))
+        for i in range(rows):
+            kind = "withdraw" if i % 4 == 3 else "deposit"
+            records.append((kind, account_id, 50 + (i * 7) % 200, T0 + i * 3_600))
+    assert service.import_records(records) == []
+
+
+def service_view(service, account_id):
+    at = datetime.fromtimestamp(T0 + 123.5 * 3_600, tz=timezone.utc).replace(tzinfo=None)
+    return (
+        service.get_transactions_page(account_id, limit=50)[0],
+        service.get_transactions_page(account_id, limit=50, order="asc")[0],
+        service.query_transactions(account_id, min_amount=100, max_amount=120),
+        service.query_transactions(account_id, type="withdraw", start=at),
+        service.query_transactions(account_id, end=at, limit=10),
+        service.get_balance_at(account_id, at),
+        service.export_rows(account_id, start=90, limit=30),
+        service.get_statement(account_id, period="week"),
+    )
+
+
+def test_service_history_spans_both_tiers(tmp_path):
+    service = AccountService()
+    import_history(service)
+    before = [service_view(service, f"ACC{a:03d}") for a in range(5)]
+
+    frozen = service.compact(SegmentStore(tmp_path, fsync=False), T0 + 250 * 3_600)
+    assert [block.rows for _, block in frozen] == [250] * 5
+    assert [service_view(service, f"ACC{a:03d}") for a in range(5)] == before
+
+    service.deposit("ACC000", 1)
+    assert service.compact(SegmentStore(tmp_path, fsync=False), T0 + 250 * 3_600) == []
+    assert service.get_transactions_page("ACC000", limit=1)[0][0].amount == 1
+
+
+def test_compaction_is_journaled_by_the_next_snapshot(tmp_path):
+    service = AccountService(journal=Journal(tmp_path, fsync=False))
+    import_history(service)
+    exported = "".join(export_ledger(service, "csv"))
+
+    service.compact(service._journal.segments, T0 + 100 * 3_600)
+    service.snapshot()
+    service.compact(service._journal.segments, T0 + 200 * 3_600)  # no snapshot refers to this one
+    service.deposit("ACC001", 5)
+    exported_live = "".join(export_ledger(service, "csv"))
+    assert len(service._journal.segments.names()) == 2
+    service.close()
+
+    recovered = AccountService(journal=Journal(tmp_path, fsync=False))
+    assert "".join(export_ledger(recovered, "csv")) == exported_live != exported
+    assert recovered.get_account("ACC001").transactions.base == 100
+    assert len(recovered._journal.segments.names()) == 1
+    recovered.close()
+
+
+def test_requests_proceed_while_compacting(tmp_path):
+    service = AccountService()
+    import_history(service, accounts=20, rows=2_000)
+    balances = {a["id"]: a["balance"] for a in service.list_all_accounts()}
+    done = threading.Event()
+
+    def deposit_loop():
+        while not done.is_set():
+            for account_id in balances:
+                service.deposit(account_id, 1)
+                balances[account_id] += 1
+
+    thread = threading.Thread(target=deposit_loop)
+    thread.start()
+    try:
+        compactor = Compactor(service, SegmentStore(tmp_path, fsync=False), cold_after=0, min_rows=10, clock=lambda: T0 + 1_500 * 3_600)
+        result = compactor.run_once()
+    finally:
+        done.set()
+        thread.join()
+
+    assert (result.accounts, result.rows) == (20, 20 * 1_500)
+    assert result.disk_bytes < result.memory_bytes
+    for account_id, balance in balances.items():
+        ledger = service.get_transactions(account_id)
+        assert service.get_balance(account_id) == balance == 10_000 + ledger.net_before(len(ledger))
+
+
+def test_compactor_thread_runs_and_stops(tmp_path):
+    service = AccountService()
+    import_history(service, accounts=1, rows=10)
+    compactor = Compactor(service, SegmentStore(tmp_path, fsync=False), cold_after=0, interval=0.01, min_rows=1)
+    compactor.start()
+    try:
+        for _ in range(500):
+            if compactor.last is not None and compactor.last.rows:
+                break
+            threading.Event().wait(0.01)
+    finally:
+        compactor.close()
+    assert service.get_transactions("ACC000").base == 10
+    with pytest.raises(ValueError):
+        Compactor(service, compactor.segments, cold_after=-1)
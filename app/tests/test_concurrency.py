@@ -0,0 +1,127 @@
+# app/tests/test_concurrency.py
+"""
+Multithreaded stress tests for AccountService locking.
+"""
+
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+from app.exceptions import InsufficientFundsError
+from app.models.ledger import Ledger
+from app.services.account_service import AccountService
+from app.services.locking import LockStripes
+
+ACCOUNTS = 20
+THREADS = 8
+OPS_PER_THREAD = 500
+
+
+def _run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=60)
+        assert not t.is_alive(), "worker deadlocked"
+
+
+@pytest.fixture(autouse=True)
+def widen_race_windows(monkeypatch):
+    # Yield the GIL between Account's balance check and its update, and
+    # switch threads far more often than the default 5ms, so unsynchronized
+    # read-modify-write code would actually interleave during the test
+    record = Ledger.record
+
+    def slow_record(self, *args):
+        time.sleep(0)
+        return record(self, *args)
+
+    monkeypatch.setattr(Ledger, "record", slow_record)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.fixture
+def service():
+    # Few stripes so unrelated accounts share locks too
+    service = AccountService(lock_stripes=4)
+    for i in range(ACCOUNTS):
+        service.create_account(f"ACC-{i}", 1_000)
+    return service
+
+
+def test_random_transfers_conserve_money(service):
+    failures = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(OPS_PER_THREAD):
+            src, dst = rng.sample(range(ACCOUNTS), 2)
+            try:
+                service.transfer(f"ACC-{src}", f"ACC-{dst}", rng.choice([1, 5, 50]))
+            except InsufficientFundsError:
+                failures.append(1)
+
+    _run_threads(worker, THREADS)
+
+    balances = [acc["balance"] for acc in service.list_all_accounts()]
+    assert sum(balances) == ACCOUNTS * 1_000
+    assert min(balances) >= 0
+    transfers = sum(len(service.get_transactions(f"ACC-{i}")) for i in range(ACCOUNTS)) // 2
+    assert transfers == THREADS * OPS_PER_THREAD - len(failures)
+
+
+def test_opposite_transfers_do_not_deadlock(service):
+    def worker(i):
+        src, dst = ("ACC-0", "ACC-1") if i % 2 else ("ACC-1", "ACC-0")
+        for _ in range(OPS_PER_THREAD):
+            try:
+                service.transfer(src, dst, 1)
+            except InsufficientFundsError:
+                pass
+
+    _run_threads(worker, THREADS)
+    assert service.get_balance("ACC-0") + service.get_balance("ACC-1") == 2_000
+
+
+def test_concurrent_deposits_and_withdrawals_are_not_lost(service):
+    def worker(i):
+        for _ in range(OPS_PER_THREAD):
+            service.deposit("ACC-0", 2)
+            service.withdraw("ACC-0", 1)
+
+    _run_threads(worker, THREADS)
+    assert service.get_balance("ACC-0") == 1_000 + THREADS * OPS_PER_THREAD
+    assert len(service.get_transactions("ACC-0")) == 2 * THREADS * OPS_PER_THREAD
+
+
+def test_concurrent_withdrawals_never_overdraw(service):
+    successes = []
+
+    def worker(i):
+        while True:
+            try:
+                service.withdraw("ACC-0", 1)
+            except InsufficientFundsError:
+                return
+            successes.append(1)
+
+    _run_threads(worker, THREADS)
+    assert service.get_balance("ACC-0") == 0
+    assert len(successes) == 1_000
+
+
+def test_lock_stripes_hold_is_order_independent():
+    stripes = LockStripes(8)
+    with stripes.hold("b", "a", "a"):
+        pass
+    with stripes.hold_all():
+        pass
+    with pytest.raises(ValueError):
+        LockStripes(0)
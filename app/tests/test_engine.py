@@ -0,0 +1,110 @@
+# app/tests/test_engine.py
+"""
+Tests for the single-writer ledger engine.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.db.journal import Journal
+from app.exceptions import AccountNotFoundError, InsufficientFundsError
+from app.models.batch import BatchOperation
+from app.services.account_service import AccountService
+from app.services.engine import LedgerEngine
+
+
+def test_concurrent_operations_are_batched_and_answered_in_order(tmp_path):
+    service = AccountService(journal=Journal(tmp_path, fsync=False))
+    service.create_account("A", 1_000)
+    service.create_account("B")
+    engine = LedgerEngine(service, max_batch=64)
+
+    async def scenario():
+        await engine.start()
+        deposits = [engine.deposit("A", 10) for _ in range(200)]
+        balances = await asyncio.gather(*deposits)
+        transfer = await engine.transfer("A", "B", 500)
+        await engine.close()
+        return balances, transfer
+
+    balances, transfer = asyncio.run(scenario())
+    assert sorted(balances) == list(range(1_010, 3_001, 10))
+    assert transfer == 2_500
+    assert engine.operations == 201 and engine.batches < engine.operations
+    service.close()
+
+    recovered = AccountService(journal=Journal(tmp_path, fsync=False))
+    assert (recovered.get_balance("A"), recovered.get_balance("B")) == (2_500, 500)
+    recovered.close()
+
+
+def test_each_future_gets_its_own_error():
+    service = AccountService()
+    service.create_account("A", 100)
+    engine = LedgerEngine(service)
+
+    async def scenario():
+        await engine.start()
+        outcomes = await asyncio.gather(
+            engine.withdraw("A", 60),
+            engine.withdraw("A", 60),
+            engine.deposit("NOPE", 1),
+            engine.transfer("A", "A", 1),
+            engine.deposit("A", 5),
+            return_exceptions=True,
+        )
+        await engine.close()
+        return outcomes
+
+    ok, overdraft, missing, same, deposit = asyncio.run(scenario())
+    assert ok == 40 and deposit == 45
+    assert isinstance(overdraft, InsufficientFundsError)
+    assert isinstance(missing, AccountNotFoundError)
+    assert isinstance(same, ValueError)
+
+
+def test_call_from_threads_and_stopped_engine():
+    service = AccountService()
+    service.create_account("A")
+    engine = LedgerEngine(service)
+
+    async def scenario():
+        await engine.start()
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(None, engine.call, BatchOperation("deposit", "A", 1)) for _ in range(20)
+        ))
+        await engine.close()
+        return results
+
+    assert sorted(asyncio.run(scenario())) == list(range(1, 21))
+    with pytest.raises(RuntimeError):
+        asyncio.run(engine.deposit("A", 1))
+
+
+def test_close_applies_what_is_queued():
+    service = AccountService()
+    service.create_account("A")
+    engine = LedgerEngine(service, max_batch=1)
+    applying = threading.Event()
+    apply_operations = service.apply_operations
+
+    def slow(operations):
+        applying.wait(1)
+        return apply_operations(operations)
+
+    service.apply_operations = slow
+
+    async def scenario():
+        await engine.start()
+        pending = [asyncio.ensure_future(engine.deposit("A", 1)) for _ in range(5)]
+        await asyncio.sleep(0)
+        closing = asyncio.ensure_future(engine.close())
+        applying.set()
+        await closing
+        return await asyncio.gather(*pending)
+
+    assert asyncio.run(scenario()) == [1, 2, 3, 4, 5]
+    assert engine.batches == 5
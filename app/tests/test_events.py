@@ -0,0 +1,155 @@
+# app/tests/test_events.py
+"""
+Tests for the transaction event bus: fan-out, resume and slow consumers.
+"""
+
+import asyncio
+
+import pytest
+
+from app.models.batch import BatchOperation
+from app.services.account_service import AccountService
+from app.services.events import EventBus
+
+
+def drain(subscription):
+    async def go():
+        batch, dropped = await subscription.next_batch(timeout=0.01)
+        return [e.seq for e in batch], dropped
+    return go()
+
+
+def event(account_id, amount=1):
+    return (account_id, "deposit", amount, amount, 1_700_000_000.0, None)
+
+
+def test_subscribers_get_their_accounts_in_sequence_order():
+    async def scenario():
+        bus = EventBus(start=0)
+        everything = bus.subscribe()
+        only_b = bus.subscribe("B")
+        bus.publish([event("A"), event("B")])
+        bus.publish([event("B")])
+        assert await drain(everything) == ([1, 2, 3], 0)
+        assert await drain(only_b) == ([2, 3], 0)
+        assert await drain(only_b) == ([], 0)
+
+        only_b.close()
+        everything.close()
+        assert bus.subscribers() == 0
+    asyncio.run(scenario())
+
+
+def test_resume_from_sequence_and_gap():
+    async def scenario():
+        bus = EventBus(retain=3, start=0)
+        bus.publish([event("A") for _ in range(5)])  # retained: 3, 4, 5
+
+        resumed = bus.subscribe(since=3)
+        assert resumed.missed is None
+        bus.publish([event("A")])
+        assert await drain(resumed) == ([4, 5, 6], 0)
+
+        late = bus.subscribe("A", since=1)
+        assert late.missed == 4  # 2 and 3 are gone
+        assert await drain(late) == ([4, 5, 6], 0)
+    asyncio.run(scenario())
+
+
+def test_resume_from_another_bus_is_a_gap():
+    async def scenario():
+        before_restart = EventBus(start=1_000)
+        before_restart.publish([event("A") for _ in range(3)])  # 1001..1003
+        after_restart = EventBus(retain=2, start=2_000)
+
+        assert after_restart.subscribe(since=1_003).missed == 0  # nothing retained yet
+        after_restart.publish([event("A") for _ in range(3)])  # 2001..2003, keeps 2002, 2003
+        stale = after_restart.subscribe(since=1_003)
+        assert stale.missed == 2_002 and await drain(stale) == ([2_002, 2_003], 0)
+        ahead = after_restart.subscribe("A", since=5_000)
+        assert ahead.missed == 2_002 and await drain(ahead) == ([2_002, 2_003], 0)
+        current = after_restart.subscribe(since=2_003)
+        assert current.missed is None and current.last_seq == 2_003
+
+        # Two workers' buses interleave: neither accepts the other's numbers
+        shard0, shard1 = EventBus(stride=2, offset=0, start=100), EventBus(stride=2, offset=1, start=100)
+        assert [e.seq for e in shard0.publish([event("A"), event("A")])] == [102, 104]
+        assert [e.seq for e in shard1.publish([event("B"), event("B")])] == [103, 105]
+        assert shard0.subscribe(since=103).missed == 102
+        assert shard1.subscribe(since=103).missed is None
+        assert EventBus().last_seq > 1_700_000_000 * 10**6  # starts from the clock
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_policies():
+    async def scenario():
+        dropping = EventBus(queue_size=2, policy="drop", start=0)
+        sub = dropping.subscribe()
+        dropping.publish([event("A") for _ in range(5)])
+        assert await drain(sub) == ([4, 5], 3)
+
+        strict = EventBus(queue_size=2, policy="disconnect")
+        sub = strict.subscribe()
+        strict.publish([event("A") for _ in range(3)])
+        assert sub.overflowed and strict.subscribers() == 0
+        assert await drain(sub) == ([], 0)
+    asyncio.run(scenario())
+
+
+def test_service_publishes_durable_rows_with_balances():
+    async def scenario():
+        bus = EventBus()
+        service = AccountService(events=bus)
+        service.create_account("ACC-E1", 1_000)
+        service.create_account("ACC-E2", 0)
+        sub = bus.subscribe()
+
+        service.deposit("ACC-E1", 500)
+        service.transfer("ACC-E1", "ACC-E2", 300)
+        service.apply_batch([
+            BatchOperation("withdraw", "ACC-E1", 100),
+            BatchOperation("withdraw", "ACC-E1", 100),
+            BatchOperation("withdraw", "ACC-E2", 999),
+        ])
+        batch, _ = await sub.next_batch(timeout=0.01)
+        assert [(e.account_id, e.type, e.amount, e.balance, e.counterparty) for e in batch] == [
+            ("ACC-E1", "deposit", 500, 1_500, None),
+            ("ACC-E1", "withdraw", 300, 1_200, "ACC-E2"),
+            ("ACC-E2", "deposit", 300, 300, "ACC-E1"),
+            ("ACC-E1", "withdraw", 100, 1_100, None),
+            ("ACC-E1", "withdraw", 100, 1_000, None),
+        ]
+    asyncio.run(scenario())
+
+
+def test_account_streams_are_only_served_by_the_owning_worker(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+
+    from app import main
+    from app.core.security import create_access_token
+    from app.services.sharding import ShardedAccountService
+
+    nodes = [
+        ShardedAccountService(AccountService(), shard_id=i, shards=2, socket_dir=str(tmp_path), authkey=b"test")
+        for i in range(2)
+    ]
+    try:
+        node = nodes[0]
+        monkeypatch.setattr(main, "_sharded", True)
+        monkeypatch.setattr(main, "account_service", node)
+        monkeypatch.setattr(main.settings, "SHARD_ID", 0)
+        local, remote = (next(f"EVT{i}" for i in range(100) if node.ring.shard(f"EVT{i}") == shard) for shard in (0, 1))
+        node.create_account(local, owner="johndoe")
+        node.create_account(remote, owner="johndoe")
+        headers = {"Authorization": f"Bearer {create_access_token('johndoe')}"}
+        client = TestClient(main.app)
+        assert client.get(f"/events?account_id={remote}", headers=headers).status_code == 421
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(f"/ws/events?account_id={remote}", headers=headers):
+                pass
+        assert closed.value.code == 1008
+        main._check_subscription(local, main.get_user(main.get_fake_users_db(), "johndoe"))  # served here
+    finally:
+        for node in nodes:
+            node.close()
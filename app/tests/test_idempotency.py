@@ -0,0 +1,126 @@
+# app/tests/test_idempotency.py
+"""
+Tests for the Idempotency-Key store and its backends.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.core.idempotency import (
+    IdempotencyStore, MemoryIdempotencyBackend, SqliteIdempotencyBackend, StoredResponse, fingerprint,
+)
+from app.exceptions import IdempotencyKeyInFlightError, IdempotencyKeyMismatchError
+
+
+class FakeClock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_duplicate_replays_first_response():
+    store = IdempotencyStore()
+    calls = []
+
+    def operation():
+        calls.append(1)
+        return StoredResponse("fp", 200, {"balance": len(calls)})
+
+    assert store.execute("k1", "fp", operation) == (StoredResponse("fp", 200, {"balance": 1}), False)
+    assert store.execute("k1", "fp", operation) == (StoredResponse("fp", 200, {"balance": 1}), True)
+    assert len(calls) == 1
+
+    with pytest.raises(IdempotencyKeyMismatchError):
+        store.execute("k1", "other", operation)
+
+
+def test_concurrent_duplicates_wait_for_the_first_execution():
+    store = IdempotencyStore()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def operation():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return StoredResponse("fp", 200, {"ok": True})
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(store.execute("k", "fp", operation)))
+    first.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(store.execute("k", "fp", operation))) for _ in range(8)]
+    for t in waiters:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in [first, *waiters]:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert sorted(replayed for _, replayed in results) == [False] + [True] * 8
+    assert store.inflight() == 0
+
+
+def test_in_flight_timeout_and_mismatch():
+    store = IdempotencyStore(wait_timeout=0.01)
+    release = threading.Event()
+    owner = threading.Thread(
+        target=store.execute, args=("k", "fp", lambda: release.wait(5) and StoredResponse("fp", 200, None))
+    )
+    owner.start()
+    while not store.inflight():
+        time.sleep(0.001)
+    with pytest.raises(IdempotencyKeyInFlightError):
+        store.execute("k", "fp", lambda: StoredResponse("fp", 200, None))
+    with pytest.raises(IdempotencyKeyMismatchError):
+        store.execute("k", "other", lambda: StoredResponse("other", 200, None))
+    release.set()
+    owner.join(5)
+
+
+def test_failed_execution_is_not_stored():
+    store = IdempotencyStore()
+
+    def boom():
+        raise RuntimeError("transient")
+
+    with pytest.raises(RuntimeError):
+        store.execute("k", "fp", boom)
+    assert store.execute("k", "fp", lambda: StoredResponse("fp", 201, "done")) == (
+        StoredResponse("fp", 201, "done"), False,
+    )
+
+
+def test_memory_backend_ttl_and_lru():
+    clock = FakeClock()
+    backend = MemoryIdempotencyBackend(maxsize=2, clock=clock)
+    a, b, c = (StoredResponse(x, 200, x) for x in "abc")
+    backend.put("a", a, ttl=10)
+    backend.put("b", b, ttl=10)
+    backend.get("a")
+    backend.put("c", c, ttl=10)
+    assert backend.get("b") is None
+    assert backend.get("a") == a
+
+    clock.now += 10
+    assert backend.get("a") is None
+    assert len(backend) == 1
+
+
+def test_sqlite_backend_round_trip(tmp_path):
+    url = f"sqlite:///{tmp_path / 'keys.db'}"
+    backend = SqliteIdempotencyBackend(url, purge_every=1)
+    backend.put("u:k", StoredResponse(fingerprint("deposit:A", {"amount": 500}), 400, "Insufficient funds"), ttl=60)
+    backend.put("u:old", StoredResponse("fp", 200, {}), ttl=-1)
+    backend.close()
+
+    reopened = SqliteIdempotencyBackend(url)
+    stored = reopened.get("u:k")
+    assert stored == StoredResponse(fingerprint("deposit:A", {"amount": 500}), 400, "Insufficient funds")
+    assert reopened.get("u:old") is None
+    reopened.close()
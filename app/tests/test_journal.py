@@ -0,0 +1,153 @@
+# app/tests/test_journal.py
+"""
+Unit tests for the write-ahead log, snapshots and AccountService recovery.
+"""
+
+import base64
+import json
+import sys
+import threading
+from array import array
+
+import pytest
+
+from app.db.journal import Journal
+from app.db.snapshot import SnapshotStore
+from app.db.wal import WriteAheadLog
+from app.exceptions import InsufficientFundsError
+from app.models.batch import BatchOperation
+from app.services.account_service import AccountService
+
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    return tmp_path / "data"
+
+
+def _reopen(journal_dir, **kwargs):
+    return AccountService(journal=Journal(journal_dir, fsync=False, **kwargs))
+
+
+def test_wal_append_commit_replay(tmp_path):
+    wal = WriteAheadLog(tmp_path, fsync=False)
+    lsn1 = wal.append({"op": "a"})
+    lsn2 = wal.append({"op": "b"})
+    assert (lsn1, lsn2) == (1, 2)
+    assert wal.durable_lsn == 0
+    wal.commit(lsn1)
+    # Group commit: the first commit flushed everything buffered so far
+    assert wal.durable_lsn == 2
+    wal.close()
+
+    reopened = WriteAheadLog(tmp_path, fsync=False)
+    assert [e["op"] for e in reopened.replay()] == ["a", "b"]
+    assert reopened.append({"op": "c"}) == 3
+
+
+def test_wal_ignores_torn_tail(tmp_path):
+    wal = WriteAheadLog(tmp_path, fsync=False)
+    wal.append({"op": "a"})
+    wal.close()
+    with open(wal.segments()[-1], "a", encoding="utf-8") as fh:
+        fh.write('{"lsn":2,"op":')
+
+    reopened = WriteAheadLog(tmp_path, fsync=False)
+    assert reopened.last_lsn == 1
+    reopened.append({"op": "b"})
+    reopened.commit()
+    assert [e["lsn"] for e in reopened.replay()] == [1, 2]
+
+
+def test_snapshot_is_due_after_exactly_snapshot_every_concurrent_events(tmp_path):
+    journal = Journal(tmp_path, fsync=False, snapshot_every=8 * 250)
+
+    def record():
+        for i in range(250):
+            journal.record({"op": "deposit", "account": "A", "amount": 1, "ts": float(i)})
+
+    threads = [threading.Thread(target=record) for _ in range(7)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not journal.snapshot_due()
+    record()
+    assert journal.snapshot_due()
+    journal.snapshot([])
+    assert not journal.snapshot_due()
+    journal.close()
+
+
+def test_service_recovers_from_log(journal_dir):
+    service = _reopen(journal_dir)
+    service.create_account("ACC-A", 500)
+    service.create_account("ACC-B", 0)
+    service.deposit("ACC-A", 100)
+    service.withdraw("ACC-A", 50)
+    service.transfer("ACC-A", "ACC-B", 200)
+    service.apply_batch([
+        BatchOperation("deposit", "ACC-B", 5),
+        BatchOperation("withdraw", "ACC-B", 5),
+        BatchOperation("withdraw", "ACC-B", 1000),
+    ])
+    with pytest.raises(InsufficientFundsError):
+        service.withdraw("ACC-B", 1000)
+    expected = service.get_transactions("ACC-A")
+    service.close()
+
+    recovered = _reopen(journal_dir)
+    assert recovered.get_balance("ACC-A") == 350
+    assert recovered.get_balance("ACC-B") == 200
+    assert recovered.get_transactions("ACC-A") == expected
+    assert len(recovered.get_transactions("ACC-B")) == 3
+
+
+def test_snapshot_truncates_log_and_recovers(journal_dir):
+    service = _reopen(journal_dir, snapshot_every=10)
+    service.create_account("ACC-S", 0)
+    for _ in range(25):
+        service.deposit("ACC-S", 2)
+    service.close()
+
+    journal = Journal(journal_dir, fsync=False)
+    # Only the tail after the last snapshot remains to be replayed
+    accounts, events = journal.recover()
+    assert len(list(events)) < 10
+    assert len(journal.wal.segments()) == 1
+
+    recovered = AccountService(journal=journal)
+    assert recovered.get_balance("ACC-S") == 50
+    assert len(recovered.get_transactions("ACC-S")) == 25
+
+
+def test_replays_journals_written_in_major_units(journal_dir):
+    # Events and snapshots from before amounts were int minor units
+    wal = WriteAheadLog(journal_dir / "wal", fsync=False)
+    for event in (
+        {"op": "create", "account": "ACC-OLD", "balance": 10.5},
+        {"op": "deposit", "account": "ACC-OLD", "amount": 0.25, "ts": 1.0},
+    ):
+        wal.append(event)
+    wal.commit()
+    wal.close()
+
+    service = _reopen(journal_dir)
+    assert service.get_balance("ACC-OLD") == 1075
+    assert service.get_transactions("ACC-OLD")[0].amount == 25
+    service.close()
+
+
+def test_reads_float_snapshots(tmp_path):
+    def column(typecode, values):
+        return base64.b64encode(array(typecode, values).tobytes()).decode("ascii")
+
+    with open(tmp_path / f"snapshot-{7:020d}.jsonl", "w", encoding="utf-8") as fh:
+        fh.write(json.dumps({"lsn": 7, "version": 2, "byteorder": sys.byteorder}) + "\n")
+        fh.write(json.dumps({
+            "id": "ACC-V2", "balance": 19.99,
+            "amounts": column("d", [20.0, 0.01]), "types": column("b", [0, 1]), "timestamps": column("d", [1.0, 2.0]),
+        }) + "\n")
+
+    lsn, (account,) = SnapshotStore(tmp_path).load_latest()
+    assert (lsn, account.balance) == (7, 1999)
+    assert [t.amount for t in account.transactions] == [2000, 1]
@@ -0,0 +1,81 @@
+# app/tests/test_ledger.py
+"""
+Unit tests for the columnar transaction ledger.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.models.account import Account
+from app.models.ledger import CHECKPOINT_EVERY, DEPOSIT, WITHDRAW, Ledger
+from app.models.transaction import Transaction, to_epoch
+
+
+def test_record_and_views():
+    ledger = Ledger()
+    ts = to_epoch(datetime(2026, 1, 2, 3, 4, 5, 678901))
+    ledger.record(1000, DEPOSIT, ts)
+    ledger.record(250, WITHDRAW, ts + 1)
+
+    assert len(ledger) == 2
+    assert ledger[0] == Transaction(1000, "deposit", datetime(2026, 1, 2, 3, 4, 5, 678901))
+    assert ledger[-1].type == "withdraw"
+    assert [t.amount for t in ledger] == [1000, 250]
+    assert ledger[1:] == [ledger[1]]
+    with pytest.raises(IndexError):
+        ledger[2]
+
+
+def test_record_validates():
+    ledger = Ledger()
+    with pytest.raises(ValueError):
+        ledger.record(0, DEPOSIT, 0)
+    with pytest.raises(ValueError):
+        ledger.record(1, 7, 0)
+    assert len(ledger) == 0
+
+
+def test_list_compatibility():
+    txs = [Transaction(5, "deposit"), Transaction(1, "withdraw")]
+    account = Account(id="ACC-L", balance=4, transactions=txs)
+    assert isinstance(account.transactions, Ledger)
+    assert account.transactions == txs
+    assert Ledger() == []
+
+
+def test_compact_storage():
+    ledger = Ledger()
+    for i in range(1000):
+        ledger.record(1, DEPOSIT, float(i))
+    # 8 (amount) + 1 (type) + 8 (timestamp) bytes per row
+    assert ledger.nbytes() == 17 * 1000
+
+
+def test_checkpointed_net_flow():
+    ledger = Ledger()
+    for i in range(CHECKPOINT_EVERY * 3 + 5):
+        ledger.record(2 if i % 4 else 1, WITHDRAW if i % 4 == 0 else DEPOSIT, float(i))
+    assert len(ledger.checkpoints) == 4
+
+    def net(row):
+        return sum(t.amount if t.type == "deposit" else -t.amount for t in ledger[:row])
+
+    for row in (0, 1, CHECKPOINT_EVERY, CHECKPOINT_EVERY + 7, len(ledger)):
+        assert ledger.net_before(row) == net(row)
+    assert ledger.net_after(float(CHECKPOINT_EVERY * 2)) == net(len(ledger)) - net(CHECKPOINT_EVERY * 2 + 1)
+    assert ledger.net_after(1e12) == 0
+
+    # Loaded ledgers build their checkpoints on first use
+    loaded = Ledger.from_columns(ledger.amounts, ledger.types, ledger.timestamps)
+    assert loaded.net_before(len(loaded)) == ledger.net_before(len(ledger))
+    assert loaded.checkpoints == ledger.checkpoints
+
+
+def test_net_after_out_of_order():
+    ledger = Ledger()
+    ledger.record(5, DEPOSIT, 10)
+    ledger.record(3, DEPOSIT, 5)
+    ledger.record(1, WITHDRAW, 20)
+    assert not ledger.ordered
+    assert ledger.net_after(7) == 4
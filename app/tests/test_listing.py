@@ -0,0 +1,118 @@
+# app/tests/test_listing.py
+"""
+Tests for the cached account listing and the response helpers.
+"""
+
+import threading
+from typing import List
+
+import pytest
+
+from app.api.responses import adapter, etag, etag_matches, render
+from app.exceptions import InsufficientFundsError
+from app.schemas.account import AccountOut, BalanceOut
+from app.services.account_service import AccountService
+from app.services.listing import AccountListing
+from app.services.sharding import ShardedAccountService
+
+
+def listing_for(service):
+    return AccountListing(service, adapter(List[AccountOut]).dump_json, etag)
+
+
+def test_snapshot_is_reused_until_accounts_change():
+    service = AccountService()
+    service.create_account("ACC-001", 1_000)
+    listing = listing_for(service)
+
+    first = listing.snapshot()
+    assert listing.snapshot() is first
+    assert first.body == b'[{"id":"ACC-001","balance":10.0}]'
+
+    service.deposit("ACC-001", 1)
+    second = listing.snapshot()
+    assert second.accounts == [{"id": "ACC-001", "balance": 1_001}]
+    assert second.etag != first.etag
+
+    service.create_account("ACC-002")
+    assert [a["id"] for a in listing.snapshot().accounts] == ["ACC-001", "ACC-002"]
+    assert listing.rebuilds == 3
+
+    with pytest.raises(InsufficientFundsError):
+        service.withdraw("ACC-002", 1)
+    assert listing.snapshot().version == service.accounts_version()
+    assert listing.rebuilds == 3  # a rejected write changes nothing
+
+
+def test_import_and_transfer_invalidate_the_snapshot():
+    service = AccountService()
+    service.create_account("ACC-001", 500)
+    service.create_account("ACC-002")
+    listing = listing_for(service)
+    listing.snapshot()
+
+    service.transfer("ACC-001", "ACC-002", 200)
+    assert listing.snapshot().accounts[1]["balance"] == 200
+    service.import_records([("account", "ACC-003", 7, None)])
+    assert len(listing.snapshot().accounts) == 3
+
+
+def test_concurrent_readers_share_one_rebuild():
+    service = AccountService()
+    for i in range(1_000):
+        service.create_account(f"ACC{i:04d}", i)
+    listing = listing_for(service)
+    barrier = threading.Barrier(8)
+    seen = []
+
+    def read():
+        barrier.wait()
+        seen.append(listing.snapshot())
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert listing.rebuilds == 1
+    assert len({id(s) for s in seen}) == 1
+
+
+def test_sharded_version_covers_every_shard(tmp_path):
+    nodes = [
+        ShardedAccountService(AccountService(), shard_id=i, shards=2, socket_dir=str(tmp_path), authkey=b"test")
+        for i in range(2)
+    ]
+    try:
+        for i in range(10):
+            nodes[0].create_account(f"ACC{i:03d}", 100)
+        listing = listing_for(nodes[0])
+        before = listing.snapshot()
+        remote = nodes[1].local.list_all_accounts()[0]["id"]  # owned by the other shard
+        nodes[1].deposit(remote, 1)
+        after = listing.snapshot()
+        assert after is not before
+        assert sum(a["balance"] for a in after.accounts) == 10 * 100 + 1
+    finally:
+        for node in nodes:
+            node.close()
+
+
+def test_etag_matching():
+    tag = etag(b"[]")
+    assert etag_matches(tag, tag)
+    assert etag_matches(f'"other", W/{tag}', tag)
+    assert etag_matches("*", tag)
+    assert not etag_matches(None, tag)
+    assert not etag_matches('"other"', tag)
+
+
+def test_render_keeps_injected_headers():
+    from fastapi import Response
+
+    injected = Response()
+    injected.headers["Idempotent-Replayed"] = "true"
+    rendered = render(BalanceOut, {"balance": 12.5}, response=injected)
+    assert rendered.body == b'{"balance":12.5}'
+    assert rendered.headers["Idempotent-Replayed"] == "true"
+    assert rendered.headers["content-type"] == "application/json"
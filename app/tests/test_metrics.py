@@ -0,0 +1,76 @@
+# app/tests/test_metrics.py
+"""
+Tests for the Prometheus-style metrics primitives and service counters.
+"""
+
+import pytest
+
+from app.core.metrics import Registry, instrumented
+from app.exceptions import InsufficientFundsError
+from app.services.account_service import OPERATION_ERRORS, OPERATION_SECONDS, TRANSACTIONS, AccountService
+
+
+def test_counter_and_gauge_render():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    registry.gauge("queue_depth", "Depth", lambda: 3)
+    requests.inc("/a")
+    requests.inc("/a", amount=2)
+    requests.inc('/"b"')
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'requests_total{route="/\\"b\\""} 1' in text
+    assert "queue_depth 3" in text
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "again")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        latency.observe(value, "x")
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{op="x",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{op="x",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{op="x",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{op="x"} 4' in lines
+    assert 'latency_seconds_sum{op="x"} 5.65' in lines
+
+
+def test_instrumented_counts_calls_and_errors():
+    registry = Registry()
+    latency = registry.histogram("op_seconds", "Latency", ("op",))
+    errors = registry.counter("op_errors_total", "Errors", ("op", "exception"))
+
+    @instrumented(latency, errors, "divide")
+    def divide(a, b):
+        return a / b
+
+    assert divide(4, 2) == 2
+    with pytest.raises(ZeroDivisionError):
+        divide(1, 0)
+    assert latency.labels("divide").counts[-1] + sum(latency.labels("divide").counts[:-1]) == 2
+    assert errors.value("divide", "ZeroDivisionError") == 1
+
+
+def test_service_operations_are_counted():
+    service = AccountService()
+    deposits = TRANSACTIONS.value("deposit")
+    overdrafts = OPERATION_ERRORS.value("withdraw", "InsufficientFundsError")
+    transfers = sum(OPERATION_SECONDS.labels("transfer").counts)
+
+    service.create_account("ACC-M1", 10)
+    service.create_account("ACC-M2", 0)
+    service.deposit("ACC-M1", 5)
+    service.transfer("ACC-M1", "ACC-M2", 1)
+    with pytest.raises(InsufficientFundsError):
+        service.withdraw("ACC-M2", 100)
+
+    assert TRANSACTIONS.value("deposit") == deposits + 2
+    assert OPERATION_ERRORS.value("withdraw", "InsufficientFundsError") == overdrafts + 1
+    assert sum(OPERATION_SECONDS.labels("transfer").counts) == transfers + 1
+    assert service.count_accounts() == 2
@@ -0,0 +1,90 @@
+# app/tests/test_money.py
+"""
+Unit tests for fixed-point money conversion.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from app.models import money
+from app.models.money import format_major, to_major, to_minor
+
+
+@pytest.fixture
+def scale():
+    previous = money.SCALE
+    yield money.set_scale
+    money.set_scale(previous)
+
+
+def test_to_minor_is_exact():
+    assert to_minor(12.34) == 1234
+    assert to_minor("0.1") == 10
+    assert to_minor(0.1) + to_minor(0.2) == to_minor(0.3)
+    assert to_minor(Decimal("1e3")) == 100_000
+    assert to_minor(7) == 700
+
+
+@pytest.mark.parametrize("value", [0.001, "1.234", "abc", float("nan"), None, True])
+def test_to_minor_rejects(value):
+    with pytest.raises(ValueError):
+        to_minor(value)
+
+
+def test_to_major_and_format():
+    assert to_major(1234) == 12.34
+    assert format_major(1234) == "12.34"
+    assert format_major(-5) == "-0.05"
+
+
+def test_scale_is_configurable(scale):
+    scale(3)
+    assert to_minor("1.005") == 1005
+    assert format_major(1005) == "1.005"
+    scale(0)
+    with pytest.raises(ValueError):
+        to_minor("1.5")
+    with pytest.raises(ValueError):
+        scale(12)
+
+
+def test_amounts_and_balances_stay_within_int64():
+    from app.models.batch import BatchOperation
+    from app.services.account_service import AccountService
+
+    largest = format_major(money.MAX_MINOR)  # "92233720368547758.07"
+    assert to_minor(largest) == money.MAX_MINOR == to_minor(Decimal(largest))
+    for value in ["92233720368547758.08", 1e20, Decimal("-1e20")]:
+        with pytest.raises(ValueError, match="too large"):
+            to_minor(value)
+
+    service = AccountService()
+    service.create_account("BIG", money.MAX_MINOR - 10)
+    service.create_account("SRC", 100)
+    service.deposit("BIG", 10)
+    with pytest.raises(ValueError, match="exceed"):
+        service.deposit("BIG", 1)
+    with pytest.raises(ValueError, match="exceed"):
+        service.transfer("SRC", "BIG", 1)
+    results = service.apply_batch([BatchOperation("transfer", "SRC", 5, "BIG"), BatchOperation("withdraw", "SRC", 5)])
+    assert [r.ok for r in results] == [False, True] and "exceed" in results[0].error
+    assert service.apply_batch([BatchOperation("deposit", "BIG", 1)], atomic=True)[0].error.startswith("Balance of BIG")
+    assert service.import_records([("deposit", "BIG", 1, None)]) == [(0, f"Balance would exceed the maximum of {largest}")]
+    assert (service.get_balance("BIG"), service.get_balance("SRC")) == (money.MAX_MINOR, 95)
+    assert len(service.get_transactions("SRC")) == 1  # no withdrawal left behind by the failed transfers
+
+
+def test_oversized_amounts_are_rejected_by_the_api():
+    from fastapi.testclient import TestClient
+
+    from app import main
+    from app.core.security import create_access_token
+
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {create_access_token('johndoe')}"}
+    assert client.post("/accounts", json={"id": "HUGE1", "initial_balance": 1e20}, headers=headers).status_code == 422
+    assert client.post("/accounts", json={"id": "HUGE1", "initial_balance": 9e16}, headers=headers).status_code == 201
+    assert client.post("/accounts/HUGE1/deposit", json={"amount": 1e20}, headers=headers).status_code == 422
+    assert client.post("/accounts/HUGE1/deposit", json={"amount": 3e15}, headers=headers).status_code == 400
+    assert client.get("/reports/summary", headers=headers).status_code == 200
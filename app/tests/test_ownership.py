@@ -0,0 +1,191 @@
+# app/tests/test_ownership.py
+"""
+Tests for account ownership: the owner index, its persistence and the
+per-user scoping of the API.
+"""
+
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.journal import Journal
+from app.exceptions import AccountNotFoundError
+from app.repositories.sqlite_repository import SqliteAccountRepository
+from app.services.account_service import AccountService
+from app.services.bulk import export_ledger, import_stream
+
+
+def test_owner_index_lists_only_owned_accounts():
+    service = AccountService()
+    service.create_account("A1", 100, owner="ann")
+    service.create_account("B1", 5, owner="bob")
+    service.create_account("A2", owner="ann")
+    service.create_account("OPEN")
+    service.import_records([("account", "IMP", 7, None)])
+    service.deposit("A2", 30)
+
+    assert service.list_owned_accounts("ann") == [{"id": "A1", "balance": 100}, {"id": "A2", "balance": 30}]
+    assert service.list_owned_accounts("bob") == [{"id": "B1", "balance": 5}]
+    assert service.list_owned_accounts("carol") == []
+    assert (service.owner_of("A1"), service.owner_of("OPEN"), service.owner_of("IMP")) == ("ann", None, None)
+    with pytest.raises(AccountNotFoundError):
+        service.owner_of("NOPE")
+
+
+@pytest.mark.parametrize("snapshot_every", [0, 2])
+def test_owners_survive_a_restart(tmp_path, snapshot_every):
+    service = AccountService(journal=Journal(tmp_path, fsync=False, snapshot_every=snapshot_every))
+    service.create_account("A1", 100, owner="ann")
+    service.create_account("OPEN")
+    service.create_account("A2", owner="ann")
+    service.close()
+
+    recovered = AccountService(journal=Journal(tmp_path, fsync=False))
+    assert [a["id"] for a in recovered.list_owned_accounts("ann")] == ["A1", "A2"]
+    assert recovered.owner_of("OPEN") is None
+    recovered.close()
+
+
+@pytest.mark.parametrize("format", ["csv", "ndjson"])
+def test_export_and_import_keep_owners(format):
+    service = AccountService()
+    service.create_account("ANN1", 100, owner="ann")
+    service.create_account("OPEN", 5)
+    service.deposit("ANN1", 7)
+    exported = "".join(export_ledger(service, format))
+
+    copy = AccountService()
+    report = import_stream(copy, [exported.encode()], format)
+    assert (report.accounts, report.transactions, report.rejected) == (2, 1, 0)
+    assert copy.list_owned_accounts("ann") == [{"id": "ANN1", "balance": 107}]
+    assert copy.owner_of("OPEN") is None
+    assert "".join(export_ledger(copy, format)) == exported
+
+    bad = import_stream(AccountService(), [b"kind,account_id,amount,timestamp,owner\ndeposit,ANN1,1,,ann\n"], "csv")
+    assert bad.errors == [(2, "owner is only allowed on account rows")]
+
+
+def test_sqlite_owner_column_and_migration(tmp_path):
+    path = tmp_path / "v2.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE accounts (id TEXT PRIMARY KEY, balance INTEGER NOT NULL);
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY, account_id TEXT NOT NULL REFERENCES accounts(id),
+            amount INTEGER NOT NULL, type TEXT NOT NULL, timestamp REAL NOT NULL
+        );
+        INSERT INTO accounts VALUES ('OLD', 500);
+        PRAGMA user_version = 2;
+    """)
+    conn.commit()
+    conn.close()
+
+    service = AccountService(repository=SqliteAccountRepository(f"sqlite:///{path}"))
+    service.create_account("A1", 10, owner="ann")
+    service.create_account("A2", owner="ann")
+    service.deposit("A2", 4)
+    service.close()
+
+    reopened = AccountService(repository=SqliteAccountRepository(f"sqlite:///{path}"))
+    assert reopened.list_owned_accounts("ann") == [{"id": "A1", "balance": 10}, {"id": "A2", "balance": 4}]
+    assert reopened.owner_of("A1") == "ann" and reopened.owner_of("OLD") is None
+    reopened.close()
+
+
+def test_accounts_are_scoped_to_their_owner():
+    from app import main
+    from app.core.security import create_access_token
+
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {create_access_token('johndoe')}"}
+    for i in range(3):
+        assert client.post("/accounts", json={"id": f"OWN{i}", "initial_balance": 10}, headers=headers).status_code == 201
+    main.account_service.create_account("THEIRS", 1_000, owner="someone-else")
+    main.account_service.create_account("SHARED", 1_000)
+
+    mine = client.get("/accounts", headers=headers)
+    ids = [a["id"] for a in mine.json()]
+    assert ids[-3:] == ["OWN0", "OWN1", "OWN2"] and "THEIRS" not in ids and "SHARED" not in ids
+    assert mine.headers["X-Total-Count"] == str(len(ids))
+    assert client.get("/accounts", headers={**headers, "If-None-Match": mine.headers["ETag"]}).status_code == 304
+    page = client.get("/accounts", params={"offset": len(ids) - 3, "limit": 2}, headers=headers)
+    assert [a["id"] for a in page.json()] == ["OWN0", "OWN1"] and 'rel="next"' in page.headers["Link"]
+
+    for method, path, body in [
+        ("get", "/accounts/THEIRS", None),
+        ("get", "/accounts/THEIRS/balance", None),
+        ("get", "/accounts/THEIRS/statement", None),
+        ("post", "/accounts/THEIRS/withdraw", {"amount": 1}),
+        ("post", "/accounts/THEIRS/transfer", {"to_account_id": "OWN0", "amount": 1}),
+        ("get", "/accounts/THEIRS/schedules", None),
+        ("get", "/events?account_id=THEIRS", None),
+    ]:
+        assert client.request(method, path, json=body, headers=headers).status_code == 404, path
+    batch = {"operations": [
+        {"op": "deposit", "account_id": "OWN0", "amount": 1},
+        {"op": "withdraw", "account_id": "THEIRS", "amount": 1},
+        {"op": "deposit", "account_id": "NOPE9", "amount": 1},
+        {"op": "transfer", "account_id": "OWN1", "amount": 2, "to_account_id": "THEIRS"},
+    ]}
+    best_effort = client.post("/accounts/batch", json=batch, headers=headers).json()
+    assert (best_effort["applied"], best_effort["failed"]) == (2, 2)
+    assert [(r["index"], r["ok"], r["balance"]) for r in best_effort["results"]] == [
+        (0, True, 11.0), (1, False, None), (2, False, None), (3, True, 8.0)
+    ]
+    assert best_effort["results"][1]["error"] == "Account THEIRS not found"
+    atomic = client.post("/accounts/batch", json={**batch, "mode": "atomic"}, headers=headers).json()
+    assert atomic["applied"] == 0 and atomic["results"][0]["error"] == "Batch aborted"
+    assert main.account_service.get_balance("OWN0") == 1_100
+    assert client.post("/accounts/OWN0/transfer", json={"to_account_id": "THEIRS", "amount": 1}, headers=headers).status_code == 200
+    assert client.get("/accounts/SHARED", headers=headers).status_code == 200
+    assert main.account_service.get_balance("THEIRS") == 1_000 + 200 + 100  # 2.00 batched, 1.00 transferred
+
+    everything = [a["id"] for a in client.get("/admin/accounts", headers=headers).json()]
+    assert {"OWN0", "THEIRS", "SHARED"} <= set(everything)
+
+
+def test_summary_covers_only_the_callers_accounts():
+    from app import main
+    from app.core.security import create_access_token
+
+    main.account_service.create_account("SUMJOHN", 500, owner="johndoe")
+    main.account_service.create_account("SUMALICE", 300, owner="alice")
+    main.account_service.withdraw("SUMJOHN", 123)
+    main.account_service.deposit("SUMALICE", 7)
+    client = TestClient(main.app)
+    main.set_user_disabled("alice", False)
+    try:
+        headers = {"Authorization": f"Bearer {create_access_token('alice')}"}
+        summary = client.get("/reports/summary", headers=headers).json()
+        assert summary["closing_balance"] == 3.07 and summary["total_out"] == 0
+        assert [m["account_id"] for m in summary["top_movements"]] == ["SUMALICE"]
+        assert client.get("/reports/summary", params={"scope": "all"}, headers=headers).status_code == 403
+    finally:
+        main.set_user_disabled("alice", True)
+
+    admin = {"Authorization": f"Bearer {create_access_token('johndoe')}"}
+    everything = client.get("/reports/summary", params={"scope": "all", "top": 1000}, headers=admin).json()
+    assert {"SUMJOHN", "SUMALICE"} <= {m["account_id"] for m in everything["top_movements"]}
+
+
+def test_admin_endpoints_need_an_admin():
+    from app import main
+    from app.core.security import create_access_token
+
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {create_access_token('alice')}"}
+    main.set_user_disabled("alice", False)
+    try:
+        assert client.get("/admin/accounts", headers=headers).status_code == 403
+        assert client.get("/admin/audit", headers=headers).status_code == 403
+        assert client.get("/export", headers=headers).status_code == 403
+        main.account_service.create_account("JOHN1", 500, owner="johndoe")
+        steal = b"kind,account_id,amount,timestamp\nwithdraw,JOHN1,4.00,\naccount,MINE1,0,,alice\n"
+        assert client.post("/import", params={"format": "csv"}, content=steal, headers=headers).status_code == 403
+        assert main.account_service.get_balance("JOHN1") == 500
+        assert client.post("/accounts", json={"id": "ALICE1"}, headers=headers).status_code == 201
+        owned = [a["id"] for a in client.get("/accounts", headers=headers).json()]
+        assert owned[-1] == "ALICE1" and "JOHN1" not in owned
+    finally:
+        main.set_user_disabled("alice", True)
@@ -0,0 +1,102 @@
+# app/tests/test_reporting.py
+"""
+Tests for vectorized statements and portfolio summaries.
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from app.models.transaction import from_epoch
+from app.services.account_service import AccountService
+
+DAY = 86_400
+MONDAY = 1_700_438_400  # 2023-11-20 00:00 UTC
+
+
+@pytest.fixture
+def service(monkeypatch):
+    clock = {"now": MONDAY}
+    monkeypatch.setattr(time, "time", lambda: clock["now"])
+    svc = AccountService()
+    svc.clock = clock
+    return svc
+
+
+def at(service, ts):
+    service.clock["now"] = ts
+
+
+def test_statement_totals_flows_and_balances(service):
+    service.create_account("ACC-S", 100)
+    at(service, MONDAY + 3_600)
+    service.deposit("ACC-S", 50)           # 150
+    at(service, MONDAY + DAY + 3_600)
+    service.withdraw("ACC-S", 120)         # 30
+    at(service, MONDAY + 8 * DAY)
+    service.deposit("ACC-S", 10)           # 40
+
+    st = service.get_statement("ACC-S")
+    assert (st.count, st.total_in, st.total_out, st.net_flow) == (3, 60, 120, -60)
+    assert (st.opening_balance, st.closing_balance) == (100, 40)
+    assert (st.min_balance, st.max_balance) == (30, 150)
+    assert [(b.start, b.inflow, b.outflow, b.count) for b in st.flows] == [
+        (datetime(2023, 11, 20), 50, 0, 1),
+        (datetime(2023, 11, 21), 0, 120, 1),
+        (datetime(2023, 11, 28), 10, 0, 1),
+    ]
+    weekly = service.get_statement("ACC-S", period="week")
+    assert [(b.start, b.net) for b in weekly.flows] == [
+        (datetime(2023, 11, 20), -70), (datetime(2023, 11, 27), 10),
+    ]
+    assert [b.start for b in service.get_statement("ACC-S", period="month").flows] == [datetime(2023, 11, 1)]
+    assert [(m.amount, m.type) for m in service.get_statement("ACC-S", top=2).top_movements] == [
+        (120, "withdraw"), (50, "deposit"),
+    ]
+
+
+def test_statement_window_and_time_weighted_average(service):
+    service.create_account("ACC-W", 0)
+    at(service, MONDAY + 10)
+    service.deposit("ACC-W", 100)
+    at(service, MONDAY + 20)
+    service.deposit("ACC-W", 100)
+    at(service, MONDAY + 30)
+    service.withdraw("ACC-W", 200)
+
+    # [0, 40]: 0 for 10s, 100 for 10s, 200 for 10s, 0 for 10s
+    st = service.get_statement("ACC-W", start=from_epoch(MONDAY), end=from_epoch(MONDAY + 40))
+    assert st.average_balance == pytest.approx(75)
+
+    window = service.get_statement("ACC-W", start=from_epoch(MONDAY + 15), end=from_epoch(MONDAY + 30))
+    assert (window.count, window.opening_balance, window.closing_balance) == (2, 100, 0)
+    assert (window.min_balance, window.max_balance) == (0, 200)
+
+    empty = service.get_statement("ACC-W", start=from_epoch(MONDAY + 100))
+    assert (empty.count, empty.flows, empty.top_movements) == (0, [], [])
+    assert empty.opening_balance == empty.closing_balance == 0
+
+
+def test_statement_validation(service):
+    service.create_account("ACC-V", 0)
+    with pytest.raises(ValueError):
+        service.get_statement("ACC-V", period="year")
+    with pytest.raises(ValueError):
+        service.get_statement("ACC-V", start=from_epoch(MONDAY + 1), end=from_epoch(MONDAY))
+
+
+def test_summary_spans_all_accounts(service):
+    service.create_account("ACC-1", 100)
+    service.create_account("ACC-2", 0)
+    at(service, MONDAY + 60)
+    service.transfer("ACC-1", "ACC-2", 40)
+    at(service, MONDAY + 120)
+    service.deposit("ACC-2", 500)
+
+    summary = service.get_summary(top=1)
+    assert summary.account_id is None and summary.accounts == 2
+    assert (summary.count, summary.total_in, summary.total_out) == (3, 540, 40)
+    assert (summary.opening_balance, summary.closing_balance) == (100, 600)
+    assert summary.min_balance == 100  # a transfer leaves the total unchanged
+    assert [(m.account_id, m.amount) for m in summary.top_movements] == [("ACC-2", 500)]
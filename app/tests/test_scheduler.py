@@ -0,0 +1,155 @@
+# app/tests/test_scheduler.py
+"""
+Tests for scheduled and recurring transfers.
+"""
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.exceptions import AccountNotFoundError, ScheduleNotFoundError
+from app.services.account_service import AccountService
+from app.services.scheduler import TransferScheduler
+
+T0 = 1_700_000_000.0
+DAY = 86_400.0
+
+
+def new_service(balance=1_000):
+    service = AccountService()
+    service.create_account("A", balance)
+    service.create_account("B")
+    return service
+
+
+def test_one_off_and_recurring_runs():
+    service = new_service()
+    scheduler = TransferScheduler(service, clock=lambda: T0)
+    once = scheduler.create("A", "B", 100, start=T0 + 10)
+    rent = scheduler.create("A", "B", 50, start=T0, interval=DAY, count=3)
+
+    assert scheduler.run_due(T0) == 1
+    assert scheduler.run_due(T0 + 10) == 1
+    assert once.finished and once.runs == 1 and scheduler.get(once.id) is once
+    assert [s.id for s in scheduler.list("A")] == [rent.id]
+
+    assert scheduler.run_due(T0 + 3 * DAY) == 1  # two missed days fire once
+    assert (rent.runs, rent.remaining, rent.next_run) == (2, 1, T0 + 4 * DAY)
+    assert scheduler.run_due(T0 + 4 * DAY) == 1
+    assert rent.finished and rent.runs == 3 and scheduler.pending() == 0
+    assert service.get_balance("B") == 100 + 3 * 50
+
+
+def test_failed_runs_are_recorded_and_recurring_continues():
+    service = new_service(balance=30)
+    scheduler = TransferScheduler(service, clock=lambda: T0)
+    schedule = scheduler.create("A", "B", 20, start=T0, interval=60)
+    for minute in range(3):
+        scheduler.run_due(T0 + minute * 60)
+    assert (schedule.runs, schedule.failures) == (3, 2)
+    assert schedule.last_error.startswith("Insufficient funds")
+    service.deposit("A", 100)
+    scheduler.run_due(T0 + 180)
+    assert schedule.last_error is None and service.get_balance("B") == 40
+
+    with pytest.raises(AccountNotFoundError):
+        scheduler.create("A", "NOPE", 1)
+    for bad in ({"amount": 0}, {"to": "A"}, {"interval": 0.5}, {"count": 2}):
+        with pytest.raises(ValueError):
+            scheduler.create("A", bad.get("to", "B"), bad.get("amount", 1), interval=bad.get("interval"), count=bad.get("count"))
+
+
+def test_due_transfers_fire_in_batches():
+    service = new_service(balance=10_000)
+    scheduler = TransferScheduler(service, max_batch=10, clock=lambda: T0)
+    calls = []
+    apply_batch = service.apply_batch
+    service.apply_batch = lambda operations, atomic=False: calls.append(len(operations)) or apply_batch(operations, atomic)
+    for i in range(25):
+        scheduler.create("A", "B", 1, start=T0 + i % 5)
+    scheduler.create("A", "B", 1, start=T0 + 100)
+    assert scheduler.run_due(T0 + 5) == 25
+    assert calls == [10, 10, 5] and service.get_balance("B") == 25
+    assert scheduler.next_due() == T0 + 100
+
+
+def test_cancel_and_stale_entries():
+    service = new_service()
+    scheduler = TransferScheduler(service, clock=lambda: T0)
+    schedules = [scheduler.create("A", "B", 1, start=T0 + i) for i in range(3_000)]
+    for schedule in schedules[:2_000]:
+        scheduler.cancel(schedule.id)
+    assert len(scheduler._heap) < 3_000 and scheduler.pending() == 1_000
+    with pytest.raises(ScheduleNotFoundError):
+        scheduler.cancel(schedules[0].id)
+    with pytest.raises(ScheduleNotFoundError):
+        scheduler.get(schedules[0].id)
+    assert scheduler.run_due(T0 + 3_000) == 1_000
+    assert service.get_balance("B") == 1_000
+
+
+def test_schedules_survive_a_restart(tmp_path):
+    service = new_service()
+    scheduler = TransferScheduler(service, directory=tmp_path, fsync=False, compact_every=5, clock=lambda: T0)
+    rent = scheduler.create("A", "B", 10, start=T0, interval=DAY)
+    once = scheduler.create("A", "B", 5, start=T0 + 1)
+    dropped = scheduler.create("A", "B", 7, start=T0 + 2)
+    for i in range(10):
+        scheduler.create("A", "B", 1, start=T0 + DAY * 10 + i)
+    scheduler.cancel(dropped.id)
+    scheduler.run_due(T0 + 1)
+    scheduler.close()
+    assert len(list(tmp_path.glob("wal-*.log"))) == 1  # compacted
+
+    restarted = TransferScheduler(service, directory=tmp_path, fsync=False, clock=lambda: T0)
+    assert restarted.pending() == 11
+    assert restarted.get(rent.id).next_run == T0 + DAY and restarted.get(rent.id).runs == 1
+    assert restarted.get(once.id).finished
+    with pytest.raises(ScheduleNotFoundError):
+        restarted.get(dropped.id)
+    assert restarted.run_due(T0 + DAY) == 1
+    restarted.close()
+
+
+def test_dispatcher_thread_fires_when_due():
+    service = new_service()
+    scheduler = TransferScheduler(service)
+    scheduler.start()
+    try:
+        scheduler.create("A", "B", 1, start=time.time() + 3_600)  # the thread sleeps until this one...
+        scheduler.create("A", "B", 5, start=time.time() + 0.05)   # ...and is woken up for this one
+        for _ in range(200):
+            if service.get_balance("B") == 5:
+                break
+            threading.Event().wait(0.01)
+    finally:
+        scheduler.close()
+    assert service.get_balance("B") == 5 and scheduler.pending() == 1
+
+
+def test_schedule_endpoints():
+    from app import main
+    from app.core.security import create_access_token
+
+    main.account_service.create_account("SCHED01", 10_000)
+    main.account_service.create_account("SCHED02")
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {create_access_token('johndoe')}"}
+    body = {"to_account_id": "SCHED02", "amount": 12.5, "start_at": "2030-01-01T09:00:00", "every_seconds": 3600, "count": 4}
+    created = client.post("/accounts/SCHED01/schedules", json=body, headers=headers)
+    assert created.status_code == 201
+    schedule = created.json()
+    assert (schedule["amount"], schedule["next_run"], schedule["remaining"]) == (12.5, "2030-01-01T09:00:00", 4)
+
+    listed = client.get("/accounts/SCHED01/schedules", headers=headers).json()
+    assert [s["id"] for s in listed] == [schedule["id"]]
+    assert client.get(f"/schedules/{schedule['id']}", headers=headers).json() == schedule
+    assert client.post("/accounts/SCHED01/schedules", json={**body, "to_account_id": "NOPE1"}, headers=headers).status_code == 404
+    assert client.post("/accounts/SCHED01/schedules", json={**body, "every_seconds": None}, headers=headers).status_code == 400
+    assert client.get("/accounts/NOPE1/schedules", headers=headers).status_code == 404
+
+    assert client.delete(f"/schedules/{schedule['id']}", headers=headers).status_code == 204
+    assert client.delete(f"/schedules/{schedule['id']}", headers=headers).status_code == 404
+    assert client.get("/accounts/SCHED01/schedules", headers=headers).json() == []
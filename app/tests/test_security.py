@@ -0,0 +1,130 @@
+# app/tests/test_security.py
+"""
+Tests for password hashing off the event loop: the bounded PasswordHasher
+pool, its busy path and the lazily seeded demo users.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.core.security import PasswordHasher, get_password_hash
+from app.exceptions import PasswordHasherBusyError
+
+
+@pytest.fixture
+def blocking_hash(monkeypatch):
+    """Make verify_password wait until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def verify(plain_password, hashed_password):
+        started.set()
+        release.wait(5)
+        return plain_password == hashed_password
+
+    monkeypatch.setattr(security, "verify_password", verify)
+    yield started, release
+    release.set()
+
+
+def test_verify_runs_on_the_pool(monkeypatch):
+    hasher = PasswordHasher(workers=2, max_pending=4)
+    hashed = get_password_hash("secret123")
+    threads = []
+    verify = security.verify_password
+
+    def record(plain_password, hashed_password):
+        threads.append(threading.current_thread().name)
+        return verify(plain_password, hashed_password)
+
+    monkeypatch.setattr(security, "verify_password", record)
+
+    async def scenario():
+        return await asyncio.gather(hasher.verify("secret123", hashed), hasher.verify("wrong", hashed))
+
+    try:
+        assert asyncio.run(scenario()) == [True, False]
+    finally:
+        hasher.shutdown()
+    assert len(threads) == 2 and all(name.startswith("bcrypt") for name in threads)
+    assert hasher._pending == 0
+
+
+def test_busy_pool_fails_fast(blocking_hash):
+    started, release = blocking_hash
+    hasher = PasswordHasher(workers=1, max_pending=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(hasher.verify("x", "x"))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        with pytest.raises(PasswordHasherBusyError):
+            await hasher.verify("y", "y")
+        release.set()
+        return await first
+
+    try:
+        assert asyncio.run(scenario()) is True
+    finally:
+        hasher.shutdown()
+    assert hasher._pending == 0
+
+
+def test_login_answers_503_while_the_pool_is_busy(blocking_hash, monkeypatch):
+    from app import main
+
+    started, release = blocking_hash
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    monkeypatch.setattr(main, "password_hasher", hasher)
+    main.get_fake_users_db()  # seed before the hash is made to block
+    holder = threading.Thread(target=lambda: asyncio.run(hasher.verify("x", "x")))
+    holder.start()
+    try:
+        assert started.wait(5)
+        response = TestClient(main.app).post("/token", data={"username": "johndoe", "password": "secret123"})
+        assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        holder.join()
+        hasher.shutdown()
+
+
+def test_seeded_user_logs_in_on_first_use(monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "_fake_users_db", None)  # as right after startup
+    client = TestClient(main.app)
+    response = client.post("/token", data={"username": "johndoe", "password": "secret123"})
+    assert response.status_code == 200 and response.json()["token_type"] == "bearer"
+    assert main._fake_users_db is not None
+    token = response.json()["access_token"]
+    assert client.get("/accounts", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    assert client.post("/token", data={"username": "johndoe", "password": "nope"}).status_code == 401
+
+
+def test_cold_token_lookup_seeds_users_off_the_event_loop(monkeypatch):
+    from app import main
+    from app.core.security import create_access_token
+
+    on_loop = []
+
+    def hash_password(password):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(password)
+        except RuntimeError:
+            pass
+        return "hashed"
+
+    monkeypatch.setattr(main, "_fake_users_db", None)
+    monkeypatch.setattr(main, "get_password_hash", hash_password)
+    main.user_cache.invalidate("johndoe")
+    try:
+        headers = {"Authorization": f"Bearer {create_access_token('johndoe')}"}
+        assert TestClient(main.app).get("/accounts", headers=headers).status_code == 200
+        assert main._fake_users_db is not None and on_loop == []
+    finally:
+        main.user_cache.invalidate("johndoe")
@@ -0,0 +1,244 @@
+# app/tests/test_sharding.py
+"""
+Tests for consistent hashing, request forwarding and cross-shard 2PC.
+
+Two ``ShardedAccountService`` instances in one process stand in for two
+workers; they still talk over real Unix sockets.
+"""
+
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from app.db.journal import Journal
+from app.exceptions import AccountNotFoundError, DuplicateAccountError, InsufficientFundsError, ShardUnavailableError
+from app.models.batch import BatchOperation
+from app.services.account_service import AccountService
+from app.services.shard_rpc import ShardClient, ShardServer
+from app.services.sharding import HashRing, ShardedAccountService
+
+
+@pytest.fixture
+def shards(tmp_path):
+    nodes = [
+        ShardedAccountService(AccountService(), shard_id=i, shards=2, socket_dir=str(tmp_path), authkey=b"test")
+        for i in range(2)
+    ]
+    yield nodes
+    for node in nodes:
+        node.close()
+
+
+def ids_on(ring, shard, count, prefix="ACC"):
+    found, i = [], 0
+    while len(found) < count:
+        if ring.shard(f"{prefix}{i}") == shard:
+            found.append(f"{prefix}{i}")
+        i += 1
+    return found
+
+
+def test_hash_ring_is_balanced_and_stable():
+    ring = HashRing(4)
+    owners = Counter(ring.shard(f"ACC{i}") for i in range(20_000))
+    assert set(owners) == {0, 1, 2, 3}
+    assert min(owners.values()) > 20_000 / 4 * 0.6
+
+    # Growing the ring moves only the keys the new shard takes over
+    grown = HashRing(5)
+    moved = [i for i in range(20_000) if grown.shard(f"ACC{i}") != ring.shard(f"ACC{i}")]
+    assert all(grown.shard(f"ACC{i}") == 4 for i in moved)
+
+
+def test_server_forgets_closed_connections(tmp_path):
+    server = ShardServer(str(tmp_path / "rpc.sock"), lambda method, *args: (method, args), b"test")
+    try:
+        for _ in range(5):
+            client = ShardClient(server.address, b"test")
+            assert client.call("echo", 1) == ("echo", (1,))
+            client.close()
+        deadline = time.monotonic() + 5
+        while server._connections and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not server._connections
+    finally:
+        server.close()
+
+
+def test_requests_are_forwarded_to_the_owner(shards):
+    a, b = shards
+    (remote,) = ids_on(a.ring, 1, 1)
+    account = a.create_account(remote, 1_000)
+    assert account.balance == 1_000
+    assert remote not in a.local._accounts and remote in b.local._accounts
+
+    assert a.deposit(remote, 500).balance == 1_500
+    with pytest.raises(InsufficientFundsError):
+        a.withdraw(remote, 10_000)
+    with pytest.raises(DuplicateAccountError):
+        a.create_account(remote)
+    with pytest.raises(AccountNotFoundError):
+        a.get_account("MISSING-ACCOUNT")
+
+    page, cursor = a.get_transactions_page(remote, limit=10)
+    assert [t.amount for t in page] == [500] and cursor is None
+    assert [len(chunk) for chunk in a.iter_transactions(remote, chunk_size=1)] == [1]
+    assert a.count_accounts() == b.count_accounts() == 1
+
+
+def test_cross_shard_transfer_commits_both_legs(shards):
+    a, b = shards
+    (left,), (right,) = ids_on(a.ring, 0, 1), ids_on(a.ring, 1, 1)
+    b.create_account(left, 1_000)
+    b.create_account(right, 0)
+
+    b.transfer(left, right, 400)
+    assert a.get_balance(left) == 600 and a.get_balance(right) == 400
+
+    with pytest.raises(InsufficientFundsError):
+        b.transfer(left, right, 700)
+    with pytest.raises(AccountNotFoundError):
+        b.transfer(left, "MISSING-ACCOUNT-X", 1)
+    assert a.get_balance(left) == 600
+    assert not a.local._holds and not a.local._prepared
+
+
+def test_prepared_funds_are_reserved(shards):
+    a, _ = shards
+    (left,) = ids_on(a.ring, 0, 1)
+    a.create_account(left, 1_000)
+
+    assert a.local.prepare("tx1", [(left, -800, 0)]) is None
+    with pytest.raises(InsufficientFundsError):
+        a.withdraw(left, 300)
+    tag, error = a.local.prepare("tx2", [(left, -300, "second")])
+    assert tag == "second" and isinstance(error, InsufficientFundsError)
+
+    a.local.abort("tx1")
+    assert a.withdraw(left, 300).balance == 700
+    assert a.local.commit("tx1", 1.0) == []
+
+
+def test_atomic_cross_shard_batch(shards):
+    a, _ = shards
+    (left,), (right,) = ids_on(a.ring, 0, 1), ids_on(a.ring, 1, 1)
+    a.create_account(left, 100)
+    a.create_account(right, 0)
+
+    ok = a.apply_batch([
+        BatchOperation("transfer", left, 100, right),
+        BatchOperation("withdraw", right, 60),
+        BatchOperation("deposit", left, 5),
+    ], atomic=True)
+    assert [(r.ok, r.balance) for r in ok] == [(True, 0), (True, 40), (True, 5)]
+
+    failed = a.apply_batch([
+        BatchOperation("deposit", left, 1),
+        BatchOperation("withdraw", right, 41),
+    ], atomic=True)
+    assert [r.ok for r in failed] == [False, False]
+    assert failed[1].error.startswith("Insufficient funds") and failed[0].error == "Batch aborted"
+    assert a.get_balance(left) == 5 and a.get_balance(right) == 40
+
+    best_effort = a.apply_batch([
+        BatchOperation("withdraw", right, 41),
+        BatchOperation("transfer", right, 40, left),
+    ])
+    assert [r.ok for r in best_effort] == [False, True]
+    assert a.get_balance(left) == 45
+
+
+def test_concurrent_cross_shard_transfers_conserve_money(shards):
+    a, b = shards
+    left, right = ids_on(a.ring, 0, 4), ids_on(a.ring, 1, 4)
+    for account_id in left + right:
+        a.create_account(account_id, 1_000)
+
+    def worker(node, sources, targets):
+        for i in range(200):
+            try:
+                node.transfer(sources[i % 4], targets[(i + 1) % 4], 7)
+            except InsufficientFundsError:
+                pass
+
+    threads = [
+        threading.Thread(target=worker, args=(node, src, dst))
+        for node in (a, b) for src, dst in ((left, right), (right, left))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(balance["balance"] for balance in a.list_all_accounts()) == 8_000
+    assert all(account.balance >= 0 for node in shards for account in node.local._accounts.all())
+
+
+@pytest.mark.parametrize("snapshot", [False, True])
+def test_prepares_and_decisions_survive_a_restart(tmp_path, snapshot):
+    service = AccountService(journal=Journal(tmp_path, fsync=False))
+    service.create_account("LEFT", 1_000)
+    assert service.prepare("1-tx", [("LEFT", -800, 0)]) is None
+    assert service.decide("0-tx", [1, 2], 123.0)
+    service.committed("0-tx", 1)
+    if snapshot:
+        service.snapshot()
+    service.close()
+
+    recovered = AccountService(journal=Journal(tmp_path, fsync=False))
+    assert recovered.in_doubt(float("inf")) == ["1-tx"]
+    with pytest.raises(InsufficientFundsError):
+        recovered.withdraw("LEFT", 300)
+    assert recovered.decision("0-tx") == 123.0
+    (undelivered,) = recovered.undelivered(float("inf"))
+    assert undelivered[0] == "0-tx" and 2 in undelivered[1]  # acknowledgements before "done" may be re-sent
+    assert recovered.commit("1-tx", 124.0) == [200]
+    for shard in (1, 2):
+        recovered.committed("0-tx", shard)
+    recovered.close()
+
+    settled = AccountService(journal=Journal(tmp_path, fsync=False))
+    assert settled.get_balance("LEFT") == 200
+    assert not settled._holds and not settled.in_doubt(float("inf")) and not settled.undelivered(float("inf"))
+    settled.close()
+
+
+def test_unconfirmed_commit_raises_and_is_redelivered(shards, monkeypatch):
+    a, b = shards
+    (left,), (right,) = ids_on(a.ring, 0, 1), ids_on(a.ring, 1, 1)
+    a.create_account(left, 100)
+    a.create_account(right, 0)
+
+    def unreachable(txid, timestamp):
+        raise ShardUnavailableError("down")
+
+    monkeypatch.setattr(b.local, "commit", unreachable)
+    with pytest.raises(ShardUnavailableError, match="committed but not confirmed"):
+        a.transfer(left, right, 40)
+    assert a.get_balance(left) == 60 and a.get_balance(right) == 0 and b.local._holds == {}
+
+    monkeypatch.undo()
+    a.resolve_after = 0
+    a.resolve()
+    assert a.get_balance(right) == 40 and not b.local.in_doubt(float("inf"))
+    assert not a.local.undelivered(float("inf"))
+
+    monkeypatch.setattr(b.local, "commit", lambda txid, timestamp: [])  # forgot the prepare
+    with pytest.raises(ShardUnavailableError, match="no longer had transaction"):
+        a.transfer(left, right, 1)
+
+
+def test_orphaned_prepares_are_aborted(shards):
+    a, b = shards
+    (right,) = ids_on(a.ring, 1, 1)
+    a.create_account(right, 100)
+    assert b.local.prepare("0-orphan", [(right, -100, 0)]) is None  # its coordinator (a) never decides
+
+    b.resolve()
+    assert b.local.in_doubt(float("inf")) == ["0-orphan"]  # not old enough yet
+    b.resolve_after = 0
+    b.resolve()
+    assert not b.local.in_doubt(float("inf")) and b.withdraw(right, 100).balance == 0
+    assert not a.local.decide("0-orphan", [1], 1.0)  # presumed aborted: too late to commit
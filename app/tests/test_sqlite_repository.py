@@ -0,0 +1,123 @@
+# app/tests/test_sqlite_repository.py
+"""
+Unit tests for the SQLite account repository behind AccountService.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from app.db.journal import Journal
+from app.exceptions import DuplicateAccountError, InsufficientFundsError
+from app.repositories.sqlite_repository import SqliteAccountRepository
+from app.services.account_service import AccountService
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture
+def service(db_url):
+    service = AccountService(repository=SqliteAccountRepository(db_url))
+    yield service
+    service.close()
+
+
+def test_operations_persist_across_instances(db_url, service):
+    service.create_account("ACC-A", 500)
+    service.create_account("ACC-B", 0)
+    service.deposit("ACC-A", 100)
+    service.transfer("ACC-A", "ACC-B", 250)
+    with pytest.raises(InsufficientFundsError):
+        service.withdraw("ACC-B", 1000)
+    service.close()
+
+    reopened = AccountService(repository=SqliteAccountRepository(db_url))
+    try:
+        assert reopened.get_balance("ACC-A") == 350
+        assert reopened.get_balance("ACC-B") == 250
+        assert [t.type for t in reopened.get_transactions("ACC-A")] == ["deposit", "withdraw"]
+        assert reopened.list_all_accounts() == [
+            {"id": "ACC-A", "balance": 350},
+            {"id": "ACC-B", "balance": 250},
+        ]
+    finally:
+        reopened.close()
+
+
+def test_restart_reads_the_database_and_refuses_a_journal(db_url, service, tmp_path):
+    service.create_account("A1", 100)
+    service.deposit("A1", 5)
+    service.close()
+
+    with pytest.raises(ValueError):
+        AccountService(journal=Journal(tmp_path / "wal", fsync=False), repository=SqliteAccountRepository(db_url))
+    reopened = AccountService(repository=SqliteAccountRepository(db_url))
+    try:
+        assert reopened.get_balance("A1") == 105
+        assert [t.amount for t in reopened.get_transactions("A1")] == [5]
+    finally:
+        reopened.close()
+
+
+def test_duplicate_account(service):
+    service.create_account("ACC-DUP", 0)
+    with pytest.raises(DuplicateAccountError):
+        service.create_account("ACC-DUP", 0)
+
+
+def test_in_memory_url(tmp_path):
+    service = AccountService(repository=SqliteAccountRepository("sqlite://"))
+    service.create_account("ACC-MEM", 10)
+    assert service.get_balance("ACC-MEM") == 10
+    service.close()
+
+
+def test_concurrent_writes_are_batched(service):
+    ids = [f"ACC-{i}" for i in range(16)]
+    for account_id in ids:
+        service.create_account(account_id, 0)
+    commits_before = service._accounts.commits
+
+    def worker(account_id):
+        for _ in range(50):
+            service.deposit(account_id, 1)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(balance for _, balance in service._accounts.summaries()) == 16 * 50
+    # 800 writes shared fewer commits than one per call
+    assert service._accounts.commits - commits_before < 16 * 50
+
+
+def test_migrates_real_columns_to_minor_units(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE accounts (id TEXT PRIMARY KEY, balance REAL NOT NULL);
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY, account_id TEXT NOT NULL REFERENCES accounts(id),
+            amount REAL NOT NULL, type TEXT NOT NULL, timestamp REAL NOT NULL
+        );
+        INSERT INTO accounts VALUES ('ACC-L', 12.3);
+        INSERT INTO transactions (account_id, amount, type, timestamp) VALUES ('ACC-L', 12.3, 'deposit', 1.0);
+    """)
+    conn.commit()
+    conn.close()
+
+    service = AccountService(repository=SqliteAccountRepository(f"sqlite:///{path}"))
+    assert service.get_balance("ACC-L") == 1230
+    assert service.get_transactions("ACC-L")[0].amount == 1230
+    service.deposit("ACC-L", 5)
+    service.close()
+
+    reopened = AccountService(repository=SqliteAccountRepository(f"sqlite:///{path}"))
+    assert reopened.get_balance("ACC-L") == 1235
+    reopened.close()
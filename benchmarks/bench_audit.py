@@ -0,0 +1,84 @@
+# benchmarks/bench_audit.py
+"""
+Incremental ledger audit vs. a full recompute.
+
+Imports ``--accounts`` accounts with ``--rows`` transactions each and
+attaches an ``Auditor`` (its first run baselines every account). Then,
+``--rounds`` times, applies ``--new`` random deposits/withdrawals/transfers
+and runs the audit incrementally; finally runs a full audit over all
+history. Reports the time per run, rows read and time per new row.
+
+Usage:
+    python -m benchmarks.bench_audit --accounts 10000 --rows 1000 --new 10000
+"""
+
+import argparse
+import random
+import time
+
+from app.models.batch import BatchOperation
+from app.services.account_service import AccountService
+from app.services.audit import Auditor
+
+
+def load(service: AccountService, accounts: int, rows: int) -> None:
+    now = time.time()
+    for a in range(accounts):
+        account_id = f"AUD{a:07d}"
+        records = [("account", account_id, 10_000_000, None)]
+        records += [
+            ("withdraw" if i % 4 == 3 else "deposit", account_id, 100 + (i * 7919) % 5_000, now - rows + i)
+            for i in range(rows)
+        ]
+        errors = service.import_records(records)
+        assert not errors, errors[:3]
+
+
+def traffic(service: AccountService, accounts: int, ops: int, rng: random.Random) -> None:
+    batch = []
+    for _ in range(ops):
+        source = f"AUD{rng.randrange(accounts):07d}"
+        roll = rng.random()
+        if roll < 0.4:
+            batch.append(BatchOperation("deposit", source, rng.randint(1, 1_000)))
+        elif roll < 0.6:
+            batch.append(BatchOperation("withdraw", source, rng.randint(1, 100)))
+        else:
+            target = f"AUD{rng.randrange(accounts):07d}"
+            if target != source:
+                batch.append(BatchOperation("transfer", source, rng.randint(1, 100), target))
+    service.apply_batch(batch)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--rows", type=int, default=1_000, help="historical transactions per account")
+    parser.add_argument("--new", type=int, default=10_000, help="operations between audits")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    service = AccountService()
+    load(service, args.accounts, args.rows)
+    auditor = Auditor(service)
+    baseline = auditor.run()
+    print(f"{args.accounts:,} accounts x {args.rows:,} rows; {args.new:,} operations between audits")
+    print(f"  {'run':<14} {'ms':>10} {'accounts':>10} {'rows':>12} {'µs/row':>8} {'drifts':>7}")
+
+    def show(name, report):
+        per_row = report.seconds / max(report.rows, 1) * 1e6
+        print(
+            f"  {name:<14} {report.seconds * 1e3:>10,.1f} {report.accounts:>10,} {report.rows:>12,} "
+            f"{per_row:>8.2f} {len(report.drifts):>7}"
+        )
+
+    show("baseline", baseline)
+    rng = random.Random(7)
+    for i in range(args.rounds):
+        traffic(service, args.accounts, args.new, rng)
+        show(f"incremental {i + 1}", auditor.run())
+    show("full", auditor.run(full=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/bench_bulk.py
+"""
+Bulk import/export throughput vs. one service call per record.
+
+Generates ``--accounts`` accounts with ``--rows`` transactions each as CSV
+and NDJSON, then times
+
+  * per-call:  ``create_account``/``deposit``/``withdraw`` per record (the
+               fastest an API client could go, without any HTTP) on a
+               sample of the accounts, scaled to the full input;
+  * import:    ``BulkImporter`` over the bytes in 1 MiB blocks;
+  * export:    ``export_ledger`` of everything that was imported.
+
+Usage:
+    python -m benchmarks.bench_bulk --accounts 10000 --rows 100
+    python -m benchmarks.bench_bulk --wal-dir /tmp/bulk-wal   # with the journal
+"""
+
+import argparse
+import random
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from app.db.journal import Journal
+from app.services.account_service import AccountService
+from app.services.bulk import CSV_HEADER, export_ledger, import_stream
+
+BLOCK = 1 << 20
+
+
+def generate(accounts: int, rows: int, seed: int = 7) -> List[tuple]:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    records = []
+    for a in range(accounts):
+        account_id = f"ACC{a:07d}"
+        balance = 1_000_000
+        records.append(("account", account_id, balance, None))
+        for i in range(rows):
+            amount = rng.randint(1, 10_000)
+            kind = "deposit" if rng.random() < 0.6 or amount > balance else "withdraw"
+            balance += amount if kind == "deposit" else -amount
+            records.append((kind, account_id, amount, start + timedelta(minutes=i)))
+    return records
+
+
+def to_text(records: List[tuple], format: str) -> bytes:
+    lines = [CSV_HEADER] if format == "csv" else []
+    for kind, account_id, amount, ts in records:
+        amount_text = f"{amount // 100}.{amount % 100:02d}"
+        if format == "csv":
+            lines.append(f"{kind},{account_id},{amount_text},{ts.isoformat() if ts else ''}")
+        elif ts is None:
+            lines.append(f'{{"kind":"{kind}","account_id":"{account_id}","amount":{amount_text}}}')
+        else:
+            lines.append(f'{{"kind":"{kind}","account_id":"{account_id}","amount":{amount_text},"timestamp":"{ts.isoformat()}"}}')
+    return ("\n".join(lines) + "\n").encode()
+
+
+def blocks(data: bytes) -> Iterator[bytes]:
+    for i in range(0, len(data), BLOCK):
+        yield data[i:i + BLOCK]
+
+
+def new_service(wal_dir: Optional[str]) -> AccountService:
+    if wal_dir is None:
+        return AccountService()
+    shutil.rmtree(wal_dir, ignore_errors=True)
+    return AccountService(journal=Journal(wal_dir, fsync=True))
+
+
+def per_call(records: List[tuple], wal_dir: Optional[str]) -> float:
+    service = new_service(wal_dir)
+    start = time.perf_counter()
+    for kind, account_id, amount, _ in records:
+        if kind == "account":
+            service.create_account(account_id, amount)
+        elif kind == "deposit":
+            service.deposit(account_id, amount)
+        else:
+            service.withdraw(account_id, amount)
+    elapsed = time.perf_counter() - start
+    service.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--rows", type=int, default=100, help="transactions per account")
+    parser.add_argument("--sample", type=int, default=200, help="accounts loaded one call at a time")
+    parser.add_argument("--wal-dir", help="journal to this directory (fsync on) instead of memory only")
+    args = parser.parse_args()
+
+    records = generate(args.accounts, args.rows)
+    total = len(records)
+    print(f"{args.accounts:,} accounts, {total:,} records, journal: {args.wal_dir or 'off'}")
+
+    sample = records[:min(args.sample, args.accounts) * (args.rows + 1)]
+    elapsed = per_call(sample, args.wal_dir) * total / len(sample)
+    print(f"{'per-call (est.)':>16} {elapsed:>8.2f}s {total / elapsed:>12,.0f} rows/s")
+
+    for format in ("csv", "ndjson"):
+        data = to_text(records, format)
+        service = new_service(args.wal_dir)
+        start = time.perf_counter()
+        report = import_stream(service, blocks(data), format)
+        elapsed = time.perf_counter() - start
+        assert report.rejected == 0, report.errors
+        print(f"{'import ' + format:>16} {elapsed:>8.2f}s {total / elapsed:>12,.0f} rows/s  ({len(data) / 1e6:.0f} MB)")
+
+        start = time.perf_counter()
+        size = sum(len(block) for block in export_ledger(service, format))
+        elapsed = time.perf_counter() - start
+        print(f"{'export ' + format:>16} {elapsed:>8.2f}s {total / elapsed:>12,.0f} rows/s  ({size / 1e6:.0f} MB)")
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
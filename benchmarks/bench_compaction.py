@@ -0,0 +1,119 @@
+# benchmarks/bench_compaction.py
+"""
+Tiered history: resident memory, segment size and read latency by tier.
+
+Imports ``--accounts`` accounts with ``--rows`` transactions each, spread
+evenly over the last ``--days`` days, then compacts everything older than
+``--cold-days`` and reports
+
+  * hot column bytes before/after and the compressed segment bytes;
+  * how long the compaction took, and how many deposits other threads
+    completed meanwhile (requests are not blocked);
+  * the latency of a newest-first page, an oldest-first page (cold,
+    first read and cached), an amount-range query and a point-in-time
+    balance, before vs. after.
+
+Usage:
+    python -m benchmarks.bench_compaction --accounts 1000 --rows 10000
+"""
+
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from app.db.segments import SegmentStore
+from app.services.account_service import AccountService
+from app.services.compaction import Compactor
+
+DAY = 86_400
+
+
+def load(service: AccountService, accounts: int, rows: int, days: int, now: float) -> None:
+    step = days * DAY / rows
+    for a in range(accounts):
+        account_id = f"ACC{a:07d}"
+        records = [("account", account_id, 10_000_000, None)]
+        records += [
+            ("withdraw" if i % 4 == 3 else "deposit", account_id, 100 + (i * 7919) % 5_000, now - days * DAY + i * step)
+            for i in range(rows)
+        ]
+        errors = service.import_records(records)
+        assert not errors, errors[:3]
+
+
+def hot_bytes(service: AccountService) -> int:
+    return sum(service.get_transactions(a["id"]).nbytes() for a in service.list_all_accounts())
+
+
+def timed(fn, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def reads(service: AccountService, account_id: str, now: float) -> dict:
+    middle = datetime.fromtimestamp(now - 45 * DAY)
+    return {
+        "page newest": lambda: service.get_transactions_page(account_id, limit=100),
+        "page oldest": lambda: service.get_transactions_page(account_id, limit=100, order="asc"),
+        "amount range": lambda: service.query_transactions(account_id, min_amount=1_000, max_amount=1_010),
+        "balance at": lambda: service.get_balance_at(account_id, middle),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--rows", type=int, default=10_000, help="transactions per account")
+    parser.add_argument("--days", type=int, default=365, help="history spread over this many days")
+    parser.add_argument("--cold-days", type=int, default=30, help="rows older than this go cold")
+    args = parser.parse_args()
+
+    now = time.time()
+    service = AccountService()
+    load(service, args.accounts, args.rows, args.days, now)
+    account_id = "ACC0000000"
+    print(f"{args.accounts:,} accounts x {args.rows:,} rows over {args.days} days; cold after {args.cold_days} days")
+
+    before = {name: timed(fn) for name, fn in reads(service, account_id, now).items()}
+    resident = hot_bytes(service)
+
+    directory = tempfile.mkdtemp(prefix="bench-cold-")
+    segments = SegmentStore(directory, fsync=False)
+    stop = threading.Event()
+    deposits = [0]
+
+    def writer() -> None:
+        i = 0
+        while not stop.is_set():
+            service.deposit(f"ACC{i % args.accounts:07d}", 1)
+            deposits[0] += 1
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        result = Compactor(service, segments, cold_after=args.cold_days * DAY, min_rows=1).run_once()
+    finally:
+        stop.set()
+        thread.join()
+
+    first_cold = timed(reads(service, account_id, now)["page oldest"], repeat=1)
+    after = {name: timed(fn) for name, fn in reads(service, account_id, now).items()}
+    print(f"  hot columns      {resident / 2**20:10,.1f} MiB -> {hot_bytes(service) / 2**20:,.1f} MiB")
+    print(f"  segments on disk {segments.disk_bytes() / 2**20:10,.1f} MiB ({result.rows:,} rows)")
+    print(f"  compaction       {result.seconds:10.2f} s, {deposits[0]:,} deposits served meanwhile")
+    print(f"  {'read':<16} {'before µs':>10} {'after µs':>10}")
+    for name in before:
+        print(f"  {name:<16} {before[name]:>10,.1f} {after[name]:>10,.1f}")
+    print(f"  {'page oldest (1st)':<16} {'':>10} {first_cold:>10,.1f}")
+    segments.close()
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
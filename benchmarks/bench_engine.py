@@ -0,0 +1,169 @@
+# benchmarks/bench_engine.py
+"""
+Direct service calls vs. the single-writer ledger engine, many clients.
+
+``--clients`` concurrent clients each run deposits, withdrawals and
+transfers over ``--accounts`` accounts (``--ops`` in total), against
+
+  * service: ``AccountService`` called through the threadpool
+    (``run_in_threadpool``, like the endpoints do) vs. awaited
+    ``LedgerEngine`` futures;
+  * http: the FastAPI app in-process (``httpx.ASGITransport``) with the
+    engine off vs. on.
+
+and reports operations/s, p50/p99 latency and, for the engine, the mean
+micro-batch size. ``--wal-dir`` journals every operation with fsync, as
+in production; without it state is memory only.
+
+Usage:
+    python -m benchmarks.bench_engine --clients 1000 --ops 50000
+    python -m benchmarks.bench_engine --clients 2000 --wal-dir /tmp/engine-wal
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.db.journal import Journal
+from app.models.batch import BatchOperation
+from app.services.account_service import AccountService
+from app.services.engine import LedgerEngine
+from benchmarks.suite import measure_async
+
+
+def workload(accounts: int, ops: int, seed: int = 3) -> Tuple[List[str], List[BatchOperation]]:
+    rng = random.Random(seed)
+    ids = [f"ENG{i:07d}" for i in range(accounts)]
+    operations = []
+    for _ in range(ops + 1_000):
+        roll = rng.random()
+        source = rng.choice(ids)
+        if roll < 0.5:
+            operations.append(BatchOperation("deposit", source, rng.randint(1, 1_000)))
+        elif roll < 0.8:
+            operations.append(BatchOperation("withdraw", source, rng.randint(1, 100)))
+        else:
+            target = rng.choice(ids)
+            while target == source:
+                target = rng.choice(ids)
+            operations.append(BatchOperation("transfer", source, rng.randint(1, 100), target))
+    return ids, operations
+
+
+def new_service(ids: List[str], wal_dir: Optional[str], label: str) -> AccountService:
+    journal = None
+    if wal_dir:
+        shutil.rmtree(f"{wal_dir}/{label}", ignore_errors=True)
+        journal = Journal(f"{wal_dir}/{label}", fsync=True, snapshot_every=0)
+    service = AccountService(journal=journal)
+    service.import_records([("account", account_id, 10_000_000, None) for account_id in ids])
+    return service
+
+
+def direct_call(service: AccountService, op: BatchOperation) -> None:
+    if op.op == "deposit":
+        service.deposit(op.account_id, op.amount)
+    elif op.op == "withdraw":
+        service.withdraw(op.account_id, op.amount)
+    else:
+        service.transfer(op.account_id, op.to_account_id, op.amount)
+
+
+def report(name: str, result: dict, engine: Optional[LedgerEngine] = None) -> None:
+    batch = f"{engine.operations / max(engine.batches, 1):>8.1f}" if engine else f"{'-':>8}"
+    print(
+        f"{name:<16} {result['ops_per_sec']:>12,.0f} {result['p50_us'] / 1e3:>9.2f} "
+        f"{result['p99_us'] / 1e3:>9.2f} {batch}"
+    )
+
+
+async def service_level(args, ids: List[str], operations: List[BatchOperation]) -> None:
+    service = new_service(ids, args.wal_dir, "direct")
+
+    async def direct(i: int) -> None:
+        await run_in_threadpool(direct_call, service, operations[i])
+
+    report("service direct", await measure_async(direct, args.ops, args.clients, warmup=100))
+    service.close()
+
+    service = new_service(ids, args.wal_dir, "engine")
+    engine = LedgerEngine(service, max_batch=args.max_batch)
+    await engine.start()
+
+    async def queued(i: int) -> None:
+        try:
+            await engine.submit(operations[i])
+        except Exception:
+            pass  # overdrafts count as served, as they do for direct calls
+
+    report("service engine", await measure_async(queued, args.ops, args.clients, warmup=100), engine)
+    await engine.close()
+    service.close()
+
+
+async def http_level(args, ids: List[str], operations: List[BatchOperation]) -> None:
+    import httpx
+
+    from app import main
+    from app.core.security import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token('johndoe')}"}
+    for mode in ("direct", "engine"):
+        service = new_service(ids, args.wal_dir, f"http-{mode}")
+        main.account_service = service
+        engine = None
+        if mode == "engine":
+            engine = main.ledger_engine = LedgerEngine(service, max_batch=args.max_batch)
+            await engine.start()
+        else:
+            main.ledger_engine = None
+
+        transport = httpx.ASGITransport(app=main.app)
+        limits = httpx.Limits(max_connections=None)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, limits=limits) as client:
+            def call(op: BatchOperation) -> Callable[[], Awaitable]:
+                if op.op == "transfer":
+                    body = {"amount": op.amount / 100, "to_account_id": op.to_account_id}
+                else:
+                    body = {"amount": op.amount / 100}
+                return lambda: client.post(f"/accounts/{op.account_id}/{op.op}", json=body)
+
+            async def request(i: int) -> None:
+                response = await call(operations[i])()
+                if response.status_code not in (200, 400):
+                    response.raise_for_status()
+
+            ops = args.ops // 5
+            report(f"http {mode}", await measure_async(request, ops, args.clients, warmup=100), engine)
+        if engine is not None:
+            await engine.close()
+        main.ledger_engine = None
+        service.close()
+
+
+async def run(args) -> None:
+    ids, operations = workload(args.accounts, args.ops)
+    print(f"{args.clients:,} clients, {args.accounts:,} accounts, journal: {args.wal_dir or 'off'}")
+    print(f"{'mode':<16} {'ops/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'batch':>8}")
+    await service_level(args, ids, operations)
+    if not args.skip_http:
+        await http_level(args, ids, operations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=1_000)
+    parser.add_argument("--ops", type=int, default=50_000, help="operations per service run (http runs a fifth)")
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--max-batch", type=int, default=1_024)
+    parser.add_argument("--wal-dir", help="journal with fsync to this directory")
+    parser.add_argument("--skip-http", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_ledger_memory.py
+"""
+Memory per transaction: list of frozen dataclasses vs columnar Ledger.
+
+The "objects" layout reproduces the original storage (a non-slotted frozen
+dataclass with a float, a str and a datetime per row, kept in a list).
+Memory is measured with tracemalloc while the rows are alive.
+
+Usage:
+    python -m benchmarks.bench_ledger_memory --rows 10000000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.models.ledger import DEPOSIT, WITHDRAW, Ledger
+from app.models.transaction import from_epoch
+
+
+@dataclass(frozen=True)
+class LegacyTransaction:
+    amount: float
+    type: str
+    timestamp: datetime
+
+
+def build_objects(rows: int, start: float) -> list:
+    return [
+        LegacyTransaction(float(i % 1000) + 0.25, "withdraw" if i % 3 else "deposit", from_epoch(start + i))
+        for i in range(rows)
+    ]
+
+
+def build_ledger(rows: int, start: float) -> Ledger:
+    ledger = Ledger()
+    record = ledger.record
+    for i in range(rows):
+        record((i % 1000) * 100 + 25, WITHDRAW if i % 3 else DEPOSIT, start + i)
+    return ledger
+
+
+def measure(build, rows: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    data = build(rows, time.time())
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    gc.collect()
+    return used
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    objects = measure(build_objects, args.rows)
+    ledger = measure(build_ledger, args.rows)
+    print(f"{args.rows:,} transactions")
+    print(f"  list of dataclasses {objects / 2**20:10,.1f} MiB  {objects / args.rows:6.1f} B/row")
+    print(f"  columnar Ledger     {ledger / 2**20:10,.1f} MiB  {ledger / args.rows:6.1f} B/row")
+    print(f"  reduction           {objects / ledger:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_money.py
+"""
+Money representations: float vs Decimal vs int minor units.
+
+For N random amounts with two decimals, times
+
+  * apply:  ``balance += amount`` one by one (the deposit path);
+  * sum:    totalling a ledger column (``sum`` / ``math.fsum`` for floats,
+            ``sum`` over a Decimal list, NumPy over the int64 column);
+
+and checks each result against the exact total.
+
+Usage:
+    python -m benchmarks.bench_money --rows 2000000
+"""
+
+import argparse
+import random
+import time
+from array import array
+from decimal import Decimal
+
+import numpy as np
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def apply(amounts, zero):
+    balance = zero
+    for amount in amounts:
+        balance += amount
+    return balance
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    cents = [rng.randint(1, 1_000_000) for _ in range(args.rows)]
+    exact = sum(cents)
+    as_float = [c / 100 for c in cents]
+    as_decimal = [Decimal(c).scaleb(-2) for c in cents]
+    as_int = array("q", cents)
+    column = np.frombuffer(as_int, dtype=np.int64)
+
+    print(f"{args.rows:,} amounts, exact total {Decimal(exact).scaleb(-2)}")
+    print(f"{'':<8} {'apply':>10} {'sum':>10}   exact?")
+    for label, values, zero, total in (
+        ("float", as_float, 0.0, lambda: sum(as_float)),
+        ("Decimal", as_decimal, Decimal(0), lambda: sum(as_decimal, Decimal(0))),
+        ("int", cents, 0, lambda: int(column.sum())),
+    ):
+        balance, t_apply = timed(lambda: apply(values, zero))
+        summed, t_sum = timed(total)
+        to_cents = (lambda v: v) if label == "int" else (lambda v: v * 100)
+        ok = to_cents(balance) == exact and to_cents(summed) == exact
+        print(f"{label:<8} {t_apply * 1000:8.1f}ms {t_sum * 1000:8.1f}ms   {'yes' if ok else 'NO (drift)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_ownership.py
+"""
+Per-user account listing and ownership checks: owner index vs. full scan.
+
+Creates ``--accounts`` accounts spread over ``--users`` owners (each
+account goes to a random user, so owners hold ~accounts/users each),
+then, for random users, times ``list_owned_accounts`` (the owner index
+behind ``GET /accounts``) against filtering every account by owner (what
+a "my accounts" view cost before), and times ``owner_of`` (the check in
+front of every account endpoint). ``--backend sqlite`` runs the same on
+the SQLite repository.
+
+Usage:
+    python -m benchmarks.bench_ownership --accounts 1000000 --users 100000
+    python -m benchmarks.bench_ownership --accounts 200000 --users 20000 --backend sqlite
+"""
+
+import argparse
+import random
+import resource
+import time
+from typing import Callable, List
+
+from app.repositories.account_repository import build_repository
+from app.services.account_service import AccountService
+
+
+def percentile(values: List[float], q: float) -> float:
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def timed(fn: Callable[[], object], runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=10_000, help="timed owner-index listings and owner checks")
+    parser.add_argument("--scans", type=int, default=5, help="timed full-scan listings")
+    parser.add_argument("--backend", choices=("memory", "sqlite"), default="memory")
+    args = parser.parse_args()
+
+    service = AccountService(repository=build_repository(args.backend, "sqlite://"))
+    rng = random.Random(5)
+    users = [f"user{u:06d}" for u in range(args.users)]
+    started = time.perf_counter()
+    for a in range(args.accounts):
+        service.create_account(f"OWN{a:08d}", 1_000, owner=rng.choice(users))
+    created = time.perf_counter() - started
+    print(f"{args.accounts:,} accounts, {args.users:,} users ({args.accounts / args.users:,.1f} accounts each), "
+          f"{args.backend} backend")
+    print(f"  create           {args.accounts / created:>12,.0f} accounts/s")
+
+    def full_scan():
+        owner = rng.choice(users)
+        return [{"id": acc.id, "balance": acc.balance} for acc in service._accounts.all() if acc.owner == owner]
+
+    ids = [f"OWN{rng.randrange(args.accounts):08d}" for _ in range(args.lookups)]
+    rows = [
+        ("list (full scan)", timed(full_scan, args.scans)),
+        ("list (owner index)", timed(lambda: service.list_owned_accounts(rng.choice(users)), args.lookups)),
+        ("owner check", timed(lambda: service.owner_of(ids[rng.randrange(len(ids))]), args.lookups)),
+    ]
+    print(f"  {'':<20} {'p50 µs':>12} {'p99 µs':>12} {'max µs':>12}")
+    for name, samples in rows:
+        print(f"  {name:<20} {percentile(samples, 0.5):>12,.1f} {percentile(samples, 0.99):>12,.1f} "
+              f"{samples[-1]:>12,.1f}")
+    print(f"  max RSS          {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:>12,.0f} MiB")
+    service.close()
+
+
+if __name__ == "__main__":
+    main()
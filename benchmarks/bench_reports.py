@@ -0,0 +1,78 @@
+# benchmarks/bench_reports.py
+"""
+Account statement and portfolio summary: NumPy vs a Python loop.
+
+Builds ACCOUNTS accounts holding ROWS transactions in total (one per
+second) and times
+
+  * loop:   daily flows, min/max balance and top-10 by iterating the
+            ``Transaction`` rows, as reporting code did before;
+  * numpy:  ``AccountService.get_statement`` / ``get_summary``.
+
+Usage:
+    python -m benchmarks.bench_reports --rows 2000000 --accounts 100
+"""
+
+import argparse
+import heapq
+import random
+import time
+from collections import defaultdict
+
+from app.services import reporting  # noqa: F401  (keep the NumPy import out of the timings)
+from app.services.account_service import AccountService
+
+
+def loop_statement(account) -> tuple:
+    flows = defaultdict(lambda: [0, 0])
+    running = account.balance - sum(t.amount if t.type == "deposit" else -t.amount for t in account.transactions)
+    low = high = running
+    for t in account.transactions:
+        signed = t.amount if t.type == "deposit" else -t.amount
+        flows[t.timestamp.date()][0 if signed > 0 else 1] += t.amount
+        running += signed
+        low, high = min(low, running), max(high, running)
+    top = heapq.nlargest(10, account.transactions, key=lambda t: t.amount)
+    return flows, low, high, top
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--accounts", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    service = AccountService()
+    accounts = [service.create_account(f"ACC{i:05d}", 100_000_000) for i in range(args.accounts)]
+    ts = 1_700_000_000.0
+    for i in range(args.rows):
+        account = accounts[i % args.accounts]
+        amount = rng.randint(100, 50_000)
+        if rng.random() < 0.5:
+            account.deposit(amount, ts + i)
+        else:
+            account.withdraw(amount, ts + i)
+    big = accounts[0]
+    print(f"{args.rows:,} transactions over {args.accounts} accounts ({len(big.transactions):,} in {big.id})")
+
+    t0 = time.perf_counter()
+    loop_statement(big)
+    loop_one = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    service.get_statement(big.id)
+    numpy_one = time.perf_counter() - t0
+    print(f"  statement  loop {loop_one * 1000:9.1f} ms   numpy {numpy_one * 1000:8.1f} ms  ({loop_one / numpy_one:.0f}x)")
+
+    t0 = time.perf_counter()
+    for account in accounts:
+        loop_statement(account)
+    loop_all = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    service.get_summary(period="week")
+    numpy_all = time.perf_counter() - t0
+    print(f"  summary    loop {loop_all * 1000:9.1f} ms   numpy {numpy_all * 1000:8.1f} ms  ({loop_all / numpy_all:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_repository.py
+"""
+Write throughput of the account repositories under concurrent requests.
+
+Each thread plays the role of a FastAPI threadpool worker making deposits
+on its own account. Compares the in-memory backend, SQLite with batched
+commits, and SQLite forced to one commit per call (max_batch=1).
+
+Usage:
+    python -m benchmarks.bench_repository --threads 16 --ops 2000
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from app.repositories.account_repository import InMemoryAccountRepository
+from app.repositories.sqlite_repository import SqliteAccountRepository
+from app.services.account_service import AccountService
+
+
+def run(service: AccountService, threads: int, ops: int) -> float:
+    ids = [f"ACC{i:04d}" for i in range(threads)]
+    for account_id in ids:
+        service.create_account(account_id, 0)
+
+    def worker(account_id: str) -> None:
+        for _ in range(ops):
+            service.deposit(account_id, 100)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in ids]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=2_000, help="deposits per thread")
+    args = parser.parse_args()
+    total = args.threads * args.ops
+
+    print(f"{args.threads} threads x {args.ops:,} deposits")
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            "memory": lambda: InMemoryAccountRepository(),
+            "sqlite batched": lambda: SqliteAccountRepository(
+                f"sqlite:///{os.path.join(directory, 'batched.db')}"
+            ),
+            "sqlite 1/commit": lambda: SqliteAccountRepository(
+                f"sqlite:///{os.path.join(directory, 'single.db')}", max_batch=1
+            ),
+        }
+        for label, factory in backends.items():
+            repository = factory()
+            service = AccountService(repository=repository)
+            elapsed = run(service, args.threads, args.ops)
+            commits = getattr(repository, "commits", None)
+            extra = f"   {commits:,} commits" if commits is not None else ""
+            print(f"  {label:<16} {total / elapsed:12,.0f} ops/s{extra}")
+            service.close()
+
+
+if __name__ == "__main__":
+    main()
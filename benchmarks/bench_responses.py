@@ -0,0 +1,124 @@
+# benchmarks/bench_responses.py
+"""
+Response serialization and the cached account listing, before vs. after.
+
+Loads ``--accounts`` accounts into the app's service, then drives the
+FastAPI app in-process (``httpx.ASGITransport``) and reports requests/s
+and p50/p99 latency for
+
+  * ``GET /accounts`` rebuilt from ``list_all_accounts`` and validated
+    against ``List[Dict[str, Any]]`` per call (the old handler, mounted
+    under ``/legacy`` for the comparison), vs. the snapshot endpoint
+    (``GET /admin/accounts`` since listings are per user) with
+    no change in between, after a deposit (one rebuild), with a matching
+    ``If-None-Match`` (304), and one 100-account page;
+  * ``GET /accounts/{id}`` and ``POST /accounts/{id}/deposit`` with the
+    old ``Dict``-typed response models vs. the rendered typed ones.
+
+Usage:
+    python -m benchmarks.bench_responses --accounts 100000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from fastapi import Depends
+
+from benchmarks.suite import measure_async
+
+
+def mount_legacy(main) -> None:
+    """The handlers as they were before typed responses and the listing snapshot."""
+    from app.models.money import to_major
+
+    auth = Depends(main.get_current_active_user)
+
+    @main.app.get("/legacy/accounts", response_model=List[Dict[str, Any]])
+    def legacy_list(current_user=auth):
+        return [{"id": a["id"], "balance": to_major(a["balance"])} for a in main.account_service.list_all_accounts()]
+
+    @main.app.get("/legacy/accounts/{account_id}", response_model=Dict[str, Any])
+    def legacy_get(account_id: str, current_user=auth):
+        acc = main.account_service.get_account(account_id)
+        page, next_cursor = main.account_service.get_transactions_page(account_id, limit=100)
+        return {
+            "id": acc.id,
+            "balance": to_major(acc.balance),
+            "transactions": [
+                {"amount": to_major(t.amount), "type": t.type, "timestamp": t.timestamp.isoformat()} for t in page
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    @main.app.post("/legacy/accounts/{account_id}/deposit", response_model=Dict[str, float])
+    def legacy_deposit(account_id: str, req: main.DepositRequest, current_user=auth):
+        return {"balance": to_major(main.account_service.deposit(account_id, req.amount).balance)}
+
+
+async def run(args) -> None:
+    import httpx
+
+    from app import main
+    from app.core.security import create_access_token
+
+    mount_legacy(main)
+    service = main.account_service
+    ids = [f"LIST{i:07d}" for i in range(args.accounts)]
+    for account_id in ids:
+        service.create_account(account_id, 1_000_000)
+    for i in range(50):
+        service.deposit(ids[0], 100 + i)
+
+    headers = {"Authorization": f"Bearer {create_access_token('johndoe')}"}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=120) as client:
+        etag = (await client.get("/admin/accounts")).headers["ETag"]
+
+        def get(path: str, **kwargs: Any) -> Callable[[int], Awaitable[None]]:
+            async def call(i: int) -> None:
+                (await client.get(path, **kwargs)).raise_for_status()
+            return call
+
+        async def after_deposit(i: int) -> None:
+            service.deposit(ids[i % len(ids)], 1)
+            (await client.get("/admin/accounts")).raise_for_status()
+
+        def deposit(prefix: str) -> Callable[[int], Awaitable[None]]:
+            async def call(i: int) -> None:
+                r = await client.post(f"{prefix}/accounts/{ids[i % len(ids)]}/deposit", json={"amount": 1})
+                r.raise_for_status()
+            return call
+
+        list_ops = args.list_requests
+        scenarios = [
+            ("list (before)", get("/legacy/accounts"), list_ops, 1),
+            ("list cached", get("/admin/accounts"), list_ops * 10, 1),
+            ("list after write", after_deposit, list_ops, 1),
+            ("list 304", get("/admin/accounts", headers={"If-None-Match": etag}), list_ops * 10, 1),
+            ("list page of 100", get("/admin/accounts", params={"offset": 5_000, "limit": 100}), 2_000, 8),
+            ("get_account (before)", get(f"/legacy/accounts/{ids[0]}"), 2_000, 8),
+            ("get_account", get(f"/accounts/{ids[0]}"), 2_000, 8),
+            ("deposit (before)", deposit("/legacy"), 2_000, 8),
+            ("deposit", deposit(""), 2_000, 8),
+        ]
+        print(f"{args.accounts:,} accounts")
+        print(f"{'scenario':<22} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+        for name, fn, ops, concurrency in scenarios:
+            result = await measure_async(fn, ops, concurrency, warmup=2)
+            print(f"{name:<22} {result['ops_per_sec']:>10,.1f} {result['p50_us'] / 1e3:>9.2f} {result['p99_us'] / 1e3:>9.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--list-requests", type=int, default=20, help="full-list requests per uncached scenario")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    asyncio.run(run(args))
+    print(f"done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
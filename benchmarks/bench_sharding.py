@@ -0,0 +1,158 @@
+# benchmarks/bench_sharding.py
+"""
+HTTP throughput of the sharded deployment with 1, 2, 4 and 8 workers.
+
+For each worker count the API is started with ``app.serve`` on a local
+port, accounts are created, and client processes (each running
+``--concurrency`` async httpx clients) drive a mix of deposits and
+transfers between random accounts for ``--duration`` seconds. With N
+workers about (N-1)/N of the requests touch an account owned by another
+worker (one IPC hop), and cross-shard transfers pay a two-phase commit.
+
+Throughput can only scale up to the number of cores: run it on a machine
+with at least as many cores as workers, plus some for the clients.
+
+Usage:
+    python -m benchmarks.bench_sharding --workers 1 2 4 8 --duration 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import tempfile
+import time
+from typing import List, Tuple
+
+from app.serve import start_workers, stop_workers
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(base_url: str, timeout: float = 60.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                if (await client.get("/metrics")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("workers did not start")
+            await asyncio.sleep(0.2)
+
+
+async def _create_accounts(base_url: str, token: str, ids: List[str]) -> None:
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers) as client:
+        for start in range(0, len(ids), 64):
+            responses = await asyncio.gather(*(
+                client.post("/accounts", json={"id": account_id, "initial_balance": 1_000_000})
+                for account_id in ids[start:start + 64]
+            ))
+            for r in responses:
+                r.raise_for_status()
+
+
+def client_process(
+    base_url: str, token: str, ids: List[str], concurrency: int, duration: float, transfer_ratio: float, seed: int
+) -> Tuple[int, int, List[float]]:
+    """Returns (ok, failed, latencies) of one client process."""
+    import httpx
+
+    async def run() -> Tuple[int, int, List[float]]:
+        rng = random.Random(seed)
+        latencies: List[float] = []
+        failed = 0
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        headers = {"Authorization": f"Bearer {token}"}
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+            stop = time.perf_counter() + duration
+
+            async def worker() -> None:
+                nonlocal failed
+                while time.perf_counter() < stop:
+                    if rng.random() < transfer_ratio:
+                        source, target = rng.sample(ids, 2)
+                        request = client.post(f"/accounts/{source}/transfer", json={"to_account_id": target, "amount": 1})
+                    else:
+                        request = client.post(f"/accounts/{rng.choice(ids)}/deposit", json={"amount": 1})
+                    t = time.perf_counter()
+                    response = await request
+                    latencies.append(time.perf_counter() - t)
+                    if response.status_code != 200:
+                        failed += 1
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return len(latencies) - failed, failed, latencies
+
+    return asyncio.run(run())
+
+
+def bench(workers: int, args, token: str) -> Tuple[float, float, float, int]:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as socket_dir:
+        os.environ["SHARD_SOCKET_DIR"] = socket_dir  # inherited by the spawned workers
+        os.environ["IDEMPOTENCY_BACKEND"] = "sqlite"  # required with several workers
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(socket_dir, 'keys.db')}"
+        sock, processes = start_workers(workers, port=port)
+        try:
+            asyncio.run(_wait_ready(base_url))
+            ids = [f"BENCH{i:06d}" for i in range(args.accounts)]
+            asyncio.run(_create_accounts(base_url, token, ids))
+
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(args.clients) as pool:
+                start = time.perf_counter()
+                outcomes = pool.starmap(client_process, [
+                    (base_url, token, ids, args.concurrency, args.duration, args.transfers, seed)
+                    for seed in range(args.clients)
+                ])
+                wall = time.perf_counter() - start
+        finally:
+            stop_workers(processes)
+            sock.close()
+
+    ok = sum(o[0] for o in outcomes)
+    failed = sum(o[1] for o in outcomes)
+    latencies = sorted(latency for o in outcomes for latency in o[2])
+    p50 = latencies[len(latencies) // 2] * 1e3 if latencies else 0.0
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3 if latencies else 0.0
+    return ok / wall, p50, p99, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent requests per client process")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--transfers", type=float, default=0.3, help="fraction of requests that are transfers")
+    args = parser.parse_args()
+
+    from app.core.security import create_access_token
+
+    token = create_access_token("johndoe")
+    print(f"{os.cpu_count()} cores, {args.clients} client processes x {args.concurrency} concurrent requests, "
+          f"{args.transfers:.0%} transfers")
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        rate, p50, p99, failed = bench(workers, args, token)
+        print(f"{workers:>7} {rate:>10.0f} {p50:>8.1f} {p99:>8.1f} {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
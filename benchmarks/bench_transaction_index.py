@@ -0,0 +1,80 @@
+# benchmarks/bench_transaction_index.py
+"""
+Indexed transaction queries vs the original linear scan.
+
+Builds one account with N transactions and runs random narrow amount-range
+and time-window queries three ways:
+
+  * scan:    the original ``[tx for tx in transactions if ...]`` over row objects
+  * columns: the same filter over the raw ledger columns
+  * indexed: ``AccountService.query_transactions`` (bisect on the indexes)
+
+Usage:
+    python -m benchmarks.bench_transaction_index --rows 1000000 --queries 200
+"""
+
+import argparse
+import random
+import time
+
+from app.models.transaction import from_epoch
+from app.services.account_service import AccountService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    service = AccountService()
+    account = service.create_account("ACC-BENCH", 0)
+    start_ts = 1_700_000_000.0
+    for i in range(args.rows):
+        account.deposit(rng.randint(100, 1_000_000), start_ts + i)
+
+    # Narrow ranges: roughly 0.1% of rows each
+    amount_ranges = [(lo, lo + 1_000) for lo in (rng.randint(100, 999_000) for _ in range(args.queries))]
+    time_ranges = [
+        (start_ts + s, start_ts + s + args.rows // 1000)
+        for s in (rng.randrange(args.rows) for _ in range(args.queries))
+    ]
+    ledger = account.transactions
+
+    def scan():
+        for lo, hi in amount_ranges:
+            [tx for tx in ledger if lo <= tx.amount <= hi]
+
+    def columns():
+        for lo, hi in amount_ranges:
+            [i for i, a in enumerate(ledger.amounts) if lo <= a <= hi]
+        for lo, hi in time_ranges:
+            [i for i, t in enumerate(ledger.timestamps) if lo <= t <= hi]
+
+    def indexed():
+        for lo, hi in amount_ranges:
+            service.query_transactions("ACC-BENCH", min_amount=lo, max_amount=hi)
+        for lo, hi in time_ranges:
+            service.query_transactions("ACC-BENCH", start=from_epoch(lo), end=from_epoch(hi))
+
+    t0 = time.perf_counter()
+    service.query_transactions("ACC-BENCH", min_amount=0, max_amount=0)
+    build = time.perf_counter() - t0
+    print(f"{args.rows:,} transactions, index build {build * 1000:.0f} ms")
+
+    for label, fn, count in (
+        ("scan (objects)", scan, len(amount_ranges)),
+        ("scan (columns)", columns, len(amount_ranges) + len(time_ranges)),
+        ("indexed", indexed, len(amount_ranges) + len(time_ranges)),
+    ):
+        if label == "scan (objects)" and args.rows > 2_000_000:
+            continue  # minutes per query at this size
+        t0 = time.perf_counter()
+        fn()
+        per_query = (time.perf_counter() - t0) / count
+        print(f"  {label:<16} {per_query * 1000:10.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# benchmarks/suite.py
+"""
+Latency/throughput suite for the service and HTTP layers, with baselines.
+
+Scenarios (all in-process, nothing listens on a port):
+
+  * service.*: ``AccountService`` called directly: create, deposit,
+    withdraw, transfer, history page and indexed search at scale;
+  * http.*:    the FastAPI ``app`` driven through ``httpx.ASGITransport``
+    by concurrent clients, once with a real bearer token (``auth``: JWT
+    check + user lookup) and once with the auth dependency overridden
+    (``noauth``), so the cost of each layer is visible.
+
+Every scenario reports ops/sec and p50/p99 latency. ``--save`` writes the
+results as a JSON baseline; when a baseline exists, the run is compared
+against it and the process exits with status 1 if any scenario's p50 or
+p99 grew, or its ops/sec dropped, by more than ``--threshold`` (a
+fraction, default 0.25). Baselines are machine-specific: record them on
+the machine that runs the comparison.
+
+Usage:
+    python -m benchmarks.suite --save                 # record a baseline
+    python -m benchmarks.suite                        # compare with it
+    python -m benchmarks.suite --only service --scale 5 --threshold 0.1
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.account_service import AccountService
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "baseline.json")
+METRICS = ("ops_per_sec", "p50_us", "p99_us")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: List[float], wall: float) -> Dict[str, float]:
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / wall if wall > 0 else 0.0,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+    }
+
+
+def measure(fn: Callable[[int], Any], ops: int, warmup: int = 100) -> Dict[str, float]:
+    """Call ``fn(i)`` ``ops`` times on this thread, timing each call."""
+    for i in range(warmup):
+        fn(i)
+    clock = time.perf_counter
+    latencies = []
+    start = clock()
+    for i in range(ops):
+        t = clock()
+        fn(i)
+        latencies.append(clock() - t)
+    return summarize(latencies, clock() - start)
+
+
+async def measure_async(fn: Callable[[int], Any], ops: int, concurrency: int, warmup: int = 50) -> Dict[str, float]:
+    """Run ``await fn(i)`` ``ops`` times from ``concurrency`` concurrent workers."""
+    for i in range(warmup):
+        await fn(i)
+    clock = time.perf_counter
+    latencies: List[float] = []
+    counter = itertools.count()
+
+    async def worker() -> None:
+        while True:
+            i = next(counter)
+            if i >= ops:
+                return
+            t = clock()
+            await fn(i)
+            latencies.append(clock() - t)
+
+    start = clock()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, clock() - start)
+
+
+# ─────────────────────────────────────────────────────────────
+# Service layer
+# ─────────────────────────────────────────────────────────────
+def service_scenarios(scale: float) -> Dict[str, Dict[str, float]]:
+    n = max(1, int(20_000 * scale))
+    rng = random.Random(1)
+    service = AccountService()
+    results = {}
+
+    ids = [f"SVC{i:07d}" for i in range(n + 100)]
+    results["service.create_account"] = measure(lambda i: service.create_account(ids[i], 100_000_000), n, warmup=0)
+    accounts = ids[:n]
+    picks = [rng.choice(accounts) for _ in range(n + 100)]
+    pairs = [tuple(rng.sample(accounts, 2)) if n > 1 else (accounts[0], ids[-1]) for _ in range(n + 100)]
+
+    results["service.deposit"] = measure(lambda i: service.deposit(picks[i], 1_000), n)
+    results["service.withdraw"] = measure(lambda i: service.withdraw(picks[i], 100), n)
+    results["service.transfer"] = measure(lambda i: service.transfer(*pairs[i], 100), n)
+
+    # One long history for the read paths
+    hot = service.create_account("SVCHOT", 0)
+    for i in range(n * 5):
+        hot.deposit(rng.randint(100, 1_000_000), 1_700_000_000.0 + i)
+    bounds = [rng.randint(100, 999_000) for _ in range(n + 100)]
+    results["service.history_page"] = measure(lambda i: service.get_transactions_page("SVCHOT", limit=100), n)
+    results["service.search"] = measure(
+        lambda i: service.query_transactions("SVCHOT", min_amount=bounds[i], max_amount=bounds[i] + 1_000), n
+    )
+    return results
+
+
+# ─────────────────────────────────────────────────────────────
+# HTTP layer (ASGI, in-process)
+# ─────────────────────────────────────────────────────────────
+async def http_scenarios(scale: float, concurrency: int) -> Dict[str, Dict[str, float]]:
+    import httpx
+
+    from app import main
+    from app.core.security import create_access_token
+    from app.schemas.user import User
+
+    n = max(1, int(2_000 * scale))
+    results = {}
+    # Seed users off the measured path (bcrypt) and mint a token directly
+    await asyncio.get_running_loop().run_in_executor(None, main.get_fake_users_db)
+    token = create_access_token("johndoe")
+    transport = httpx.ASGITransport(app=main.app)
+
+    for mode in ("auth", "noauth"):
+        if mode == "noauth":
+            user = User(username="bench", disabled=False)
+            main.app.dependency_overrides[main.get_current_active_user] = lambda: user
+        headers = {"Authorization": f"Bearer {token}"} if mode == "auth" else {}
+        prefix = f"HTTP{mode.upper()[:2]}"
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            ids = [f"{prefix}{i:07d}" for i in range(n + 50)]
+
+            async def create(i: int) -> None:
+                r = await client.post("/accounts", json={"id": ids[i], "initial_balance": 1_000.0})
+                r.raise_for_status()
+
+            async def deposit(i: int) -> None:
+                r = await client.post(f"/accounts/{ids[i % n]}/deposit", json={"amount": 5.0})
+                r.raise_for_status()
+
+            async def read(i: int) -> None:
+                r = await client.get(f"/accounts/{ids[i % n]}", params={"limit": 20})
+                r.raise_for_status()
+
+            results[f"http.{mode}.create_account"] = await measure_async(create, n, concurrency, warmup=0)
+            results[f"http.{mode}.deposit"] = await measure_async(deposit, n, concurrency)
+            results[f"http.{mode}.get_account"] = await measure_async(read, n, concurrency)
+        main.app.dependency_overrides.clear()
+    return results
+
+
+# ─────────────────────────────────────────────────────────────
+# Baselines
+# ─────────────────────────────────────────────────────────────
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Describe every metric that regressed by more than ``threshold``."""
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        now = current.get(name)
+        if now is None:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            # Throughput regresses downwards, latency upwards
+            change = (old - new) / old if metric == "ops_per_sec" else (new - old) / old
+            if change > threshold:
+                regressions.append(f"{name} {metric}: {old:.1f} -> {new:.1f} ({change:+.0%} worse)")
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, report: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def print_table(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]]) -> None:
+    print(f"{'scenario':<30} {'ops/s':>10} {'p50 us':>10} {'p99 us':>10}   vs baseline (ops/s, p99)")
+    for name, r in results.items():
+        line = f"{name:<30} {r['ops_per_sec']:>10.0f} {r['p50_us']:>10.1f} {r['p99_us']:>10.1f}"
+        base = (baseline or {}).get(name)
+        if base:
+            line += f"   {r['ops_per_sec'] / base['ops_per_sec'] - 1:+6.0%} {r['p99_us'] / base['p99_us'] - 1:+6.0%}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", choices=("service", "http"), help="run one layer only")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the operation counts")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent HTTP clients")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression, as a fraction")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    if args.only in (None, "service"):
+        results.update(service_scenarios(args.scale))
+    if args.only in (None, "http"):
+        results.update(asyncio.run(http_scenarios(args.scale, args.concurrency)))
+
+    stored = load_baseline(args.baseline)
+    baseline = stored["results"] if stored else None
+    print_table(results, baseline)
+
+    if args.save:
+        save_baseline(args.baseline, {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "scale": args.scale,
+            "concurrency": args.concurrency,
+            "results": results,
+        })
+        print(f"baseline saved to {args.baseline}")
+        return
+    if baseline is None:
+        print(f"no baseline at {args.baseline} (run with --save to record one)")
+        return
+    if stored.get("scale") != args.scale:
+        print(f"warning: baseline was recorded with --scale {stored.get('scale')}")
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print(f"no regression above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()